@@ -0,0 +1,68 @@
+# Benchmark: serial province scraping vs the shared async fetch engine
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_fetch_engine
+import argparse
+import asyncio
+import os
+import time
+
+from src.main import CanadianProvincialBillsScraper
+from src.utils.fetcher import AsyncFetcher
+from src.utils.sinks import JsonLinesSink
+from benchmarks.stub_sites import PROVINCES, point_scraper_at, start_sites, stop_sites
+
+# Simulated server latency per legislature, in seconds per request
+LATENCIES = {
+    'ontario': 0.20,
+    'bc': 0.15,
+    'alberta': 0.25,
+    'quebec': 0.05,
+    'saskatchewan': 0.30,
+    'manitoba': 0.10,
+}
+
+
+def build_scraper(sites):
+    scraper = CanadianProvincialBillsScraper(AsyncFetcher(), sink=JsonLinesSink(os.devnull))
+    for province, site in sites.items():
+        point_scraper_at(province, scraper.scrapers[province], site.url)
+    return scraper
+
+
+async def run_serial(sites):
+    """One province after another, which is how the blocking scrapers behaved"""
+    scraper = build_scraper(sites)
+    start = time.perf_counter()
+    for province in PROVINCES:
+        stats = await scraper.scrape_all_provinces([province])
+    return time.perf_counter() - start, stats['total_bills']
+
+
+async def run_concurrent(sites):
+    """All provinces at once through scrape_all_provinces"""
+    scraper = build_scraper(sites)
+    start = time.perf_counter()
+    stats = await scraper.scrape_all_provinces()
+    return time.perf_counter() - start, stats['total_bills']
+
+
+async def main(n_bills):
+    sites = await start_sites(LATENCIES, n_bills)
+    try:
+        serial_time, serial_bills = await run_serial(sites)
+        concurrent_time, concurrent_bills = await run_concurrent(sites)
+    finally:
+        await stop_sites(sites)
+
+    print("\nFetch engine benchmark")
+    print(f"  serial:     {serial_time:6.2f}s  ({serial_bills} bills)")
+    print(f"  concurrent: {concurrent_time:6.2f}s  ({concurrent_bills} bills)")
+    print(f"  speedup:    {serial_time / concurrent_time:6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serial vs concurrent province scraping')
+    parser.add_argument('--bills', type=int, default=20, help='bills per stub legislature')
+    args = parser.parse_args()
+    asyncio.run(main(args.bills))
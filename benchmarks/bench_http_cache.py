@@ -0,0 +1,55 @@
+# Benchmark: cold run vs revalidated run through the on-disk HTTP cache
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_http_cache
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from src.main import CanadianProvincialBillsScraper
+from src.utils.fetcher import AsyncFetcher
+from src.utils.sinks import JsonLinesSink
+from src.utils.http_cache import HttpCache
+from benchmarks.stub_sites import point_scraper_at, start_sites
+
+
+async def run_once(sites, cache_dir):
+    scraper = CanadianProvincialBillsScraper(AsyncFetcher(cache=HttpCache(cache_dir)), sink=JsonLinesSink(os.devnull))
+    for province, site in sites.items():
+        point_scraper_at(province, scraper.scrapers[province], site.url)
+
+    bytes_before = sum(site.bytes_sent for site in sites.values())
+    start = time.perf_counter()
+    stats = await scraper.scrape_all_provinces()
+    elapsed = time.perf_counter() - start
+    bytes_sent = sum(site.bytes_sent for site in sites.values()) - bytes_before
+    return elapsed, stats['total_bills'], bytes_sent, scraper.fetcher.cache.get_stats()
+
+
+async def main(n_bills, latency):
+    sites = await start_sites({}, n_bills)
+    for site in sites.values():
+        site.latency = latency
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = await run_once(sites, cache_dir)
+            warm = await run_once(sites, cache_dir)
+    finally:
+        for site in sites.values():
+            await site.stop()
+
+    print("\nHTTP cache benchmark")
+    for label, (elapsed, bills, bytes_sent, stats) in (('cold', cold), ('warm', warm)):
+        print(f"  {label}: {elapsed:6.2f}s  {bills} bills  {bytes_sent:>9} bytes downloaded  "
+              f"{stats['hits']} hits / {stats['misses']} misses")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Cold vs revalidated scrape through the HTTP cache')
+    parser.add_argument('--bills', type=int, default=50, help='bills per stub legislature')
+    parser.add_argument('--latency', type=float, default=0.02, help='stub server latency in seconds')
+    args = parser.parse_args()
+    asyncio.run(main(args.bills, args.latency))
@@ -0,0 +1,64 @@
+# Benchmark: detail crawl spread over 1, 2 and 4 queue workers
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_job_queue
+#
+# Uses the in-process fake Redis, and each worker gets its own fetcher (and
+# so its own per-host limits), the way separate worker containers would.
+import argparse
+import asyncio
+import os
+import time
+
+from src.main import CanadianProvincialBillsScraper, build_scrapers
+from src.utils.fetcher import AsyncFetcher
+from src.utils.job_queue import InMemoryRedis, JobQueue, run_worker
+from src.utils.sinks import JsonLinesSink
+from benchmarks.stub_sites import StubLegislature, point_scraper_at
+
+
+async def run(site, n_workers):
+    redis = InMemoryRedis()
+    orchestrator = CanadianProvincialBillsScraper(AsyncFetcher(), sink=JsonLinesSink(os.devnull))
+    point_scraper_at('quebec', orchestrator.scrapers['quebec'], site.url)
+
+    fetchers = [AsyncFetcher() for _ in range(n_workers)]
+    workers = []
+    for fetcher in fetchers:
+        scrapers = build_scrapers(fetcher)
+        point_scraper_at('quebec', scrapers['quebec'], site.url)
+        workers.append(asyncio.create_task(run_worker(JobQueue(redis), scrapers, slots=4, poll_interval=0.05)))
+
+    start = time.perf_counter()
+    stats = await orchestrator.scrape_distributed(JobQueue(redis), ['quebec'])
+    elapsed = time.perf_counter() - start
+
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    for fetcher in fetchers:
+        await fetcher.close()
+    return elapsed, stats['total_bills']
+
+
+async def main(n_bills, latency):
+    site = await StubLegislature('quebec', n_bills, latency).start()
+    results = []
+    try:
+        for n_workers in (1, 2, 4):
+            results.append((n_workers, *await run(site, n_workers)))
+    finally:
+        await site.stop()
+
+    print(f"\nJob queue benchmark (Quebec listing + {n_bills} detail jobs, {latency * 1000:.0f} ms per request)")
+    baseline = results[0][1]
+    for n_workers, elapsed, bills in results:
+        print(f"  {n_workers} worker(s): {elapsed:6.2f}s  ({bills} bills, {baseline / elapsed:4.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Detail crawl throughput by number of queue workers')
+    parser.add_argument('--bills', type=int, default=60, help='bills on the stub Quebec listing')
+    parser.add_argument('--latency', type=float, default=0.1, help='stub server latency in seconds')
+    args = parser.parse_args()
+    asyncio.run(main(args.bills, args.latency))
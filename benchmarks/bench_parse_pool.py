@@ -0,0 +1,91 @@
+# Benchmark: parsing on the event loop vs a ParsePool of 1..N worker processes
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_parse_pool
+#
+# Parses a stream of synthetic detail and listing pages and reports pages/sec
+# and the worst event-loop stall seen by a ticker task meanwhile. Throughput
+# scales with the cores available. On a single core the workers compete with
+# the event loop for the CPU and the pool only adds pickling overhead.
+import argparse
+import asyncio
+import os
+import time
+
+from src.scrapers.table import parse_listing
+from src.utils.detail_stage import parse_readings_page
+from src.utils.parse_pool import ParsePool
+from benchmarks.stub_sites import detail_html, listing_html
+
+
+def build_pages(n_pages):
+    """Mostly detail pages with a listing every tenth page, like a detail crawl"""
+    listing = listing_html('alberta', 200).encode('utf-8')
+    return [
+        (parse_listing, listing, 'alberta') if n % 10 == 0
+        else (parse_readings_page, detail_html(n).encode('utf-8'))
+        for n in range(n_pages)
+    ]
+
+
+async def worst_stall(stop, interval=0.001):
+    """Longest gap between ticks of a task that wants to run every ``interval`` seconds"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def inline(pages):
+    for parse, content, *args in pages:
+        parsed = parse(content, *args)
+        if not isinstance(parsed, dict):
+            list(parsed)
+        # A scraper yields to the loop between pages
+        await asyncio.sleep(0)
+
+
+async def pooled(pool, pages):
+    await asyncio.gather(*(pool.run(parse, content, *args) for parse, content, *args in pages))
+
+
+async def measure(run, pages):
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(worst_stall(stop))
+    start = time.perf_counter()
+    await run(pages)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return len(pages) / elapsed, await ticker
+
+
+def main(n_pages, batch_size, max_workers):
+    pages = build_pages(n_pages)
+    print(f"\nParse pool benchmark ({n_pages} pages, batch size {batch_size}, {os.cpu_count()} CPUs)")
+    print(f"  {'parser':<14} {'pages/s':>9} {'worst loop stall':>17}")
+
+    rate, stall = asyncio.run(measure(inline, pages))
+    print(f"  {'event loop':<14} {rate:9.0f} {stall * 1000:15.1f}ms")
+
+    workers = 1
+    while workers <= max_workers:
+        pool = ParsePool(workers, batch_size)
+        try:
+            # Warm the workers up so process start-up isn't counted
+            asyncio.run(measure(lambda p: pooled(pool, p), pages[:workers * batch_size]))
+            rate, stall = asyncio.run(measure(lambda p: pooled(pool, p), pages))
+        finally:
+            pool.close()
+        print(f"  {f'{workers} worker(s)':<14} {rate:9.0f} {stall * 1000:15.1f}ms")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Event-loop parsing vs a process parse pool')
+    parser.add_argument('--pages', type=int, default=2000, help='pages to parse')
+    parser.add_argument('--batch-size', type=int, default=16, help='pages per worker batch')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='largest pool to try')
+    args = parser.parse_args()
+    main(args.pages, args.batch_size, args.max_workers)
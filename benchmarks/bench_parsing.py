@@ -0,0 +1,159 @@
+# Benchmark: BeautifulSoup html.parser vs the lxml parsing in the scrapers
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_parsing
+#
+# Needs BeautifulSoup for the baseline: pip install .[bench]
+#
+# Pages are read from benchmarks/fixtures/<province>/ when recorded fixtures
+# exist and synthesised from the stub site templates otherwise.
+import argparse
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from src.scrapers import specs  # noqa: F401  (registers the province specs)
+from src.scrapers.table import parse_listing
+from src.utils.detail_stage import parse_readings_page
+from benchmarks.stub_sites import PROVINCES, detail_html, listing_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+SOURCE_URL = 'https://example.org/bills'
+
+
+def load_page(province, name, synthesise):
+    path = os.path.join(FIXTURES_DIR, province, name)
+    if os.path.exists(path):
+        with open(path, 'rb') as fh:
+            return fh.read()
+    return synthesise().encode('utf-8')
+
+
+# Baselines: the BeautifulSoup code the scrapers used before switching to lxml
+
+def bs4_ontario(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    rows = soup.find_all('tr', class_='bill-row') or soup.select('table tbody tr')
+    bills = []
+    for row in rows:
+        bill_number = row.find('td', class_='bill-number') or row.select('td')[0]
+        title = row.find('td', class_='title') or row.select('td')[1]
+        status = row.find('td', class_='status') or row.select('td')[2]
+        bills.append({'bill_number': bill_number.text.strip(), 'title': title.text.strip(),
+                      'status': status.text.strip()})
+    return bills
+
+
+def bs4_bc(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    table = soup.find('table', class_='bills') or soup.find('table')
+    bills = []
+    for row in table.find_all('tr')[1:]:
+        cells = row.find_all('td')
+        if len(cells) >= 3:
+            bills.append({'bill_number': cells[0].text.strip(), 'title': cells[1].text.strip(),
+                          'member': cells[2].text.strip(),
+                          'status': cells[3].text.strip() if len(cells) > 3 else ''})
+    return bills
+
+
+def bs4_alberta(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    bills = []
+    for session in soup.find_all('div', class_='legislature-session') or soup.find_all('h3'):
+        table = session.find_next('table')
+        for row in table.find_all('tr')[1:]:
+            cells = row.find_all('td')
+            if len(cells) >= 4:
+                link = cells[0].find('a')
+                bills.append({'session': session.text.strip(), 'bill_number': cells[0].text.strip(),
+                              'title': cells[1].text.strip(), 'sponsor': cells[2].text.strip(),
+                              'status': cells[3].text.strip(), 'bill_url': link.get('href') if link else ''})
+    return bills
+
+
+def bs4_linked_rows(content):
+    """Quebec, Saskatchewan and Manitoba listings"""
+    soup = BeautifulSoup(content, 'html.parser')
+    container = soup.find('div', class_='bills-list') or soup.find('table') or soup.find('section', class_='bills')
+    bills = []
+    for item in container.find_all('tr') or container.find_all('div', class_='bill-item'):
+        link = item.find('a')
+        if link:
+            status = item.find('td', class_='status') or item.find('span', class_='status')
+            sponsor = item.find('td', class_='sponsor') or item.find('span', class_='sponsor')
+            bills.append({'title': link.text.strip(), 'bill_url': link.get('href'),
+                          'status': status.text.strip() if status else '',
+                          'sponsor': sponsor.text.strip() if sponsor else ''})
+    return bills
+
+
+def bs4_readings(content):
+    soup = BeautifulSoup(content, 'html.parser')
+    readings = []
+    section = soup.find('section', class_='readings') or soup.find('div', class_='bill-stages')
+    if section:
+        for reading in section.find_all('div', class_='reading'):
+            readings.append({
+                'stage': reading.find('span', class_='stage').text if reading.find('span', class_='stage') else '',
+                'date': reading.find('span', class_='date').text if reading.find('span', class_='date') else ''
+            })
+    return readings
+
+
+PARSERS = {
+    'ontario': (bs4_ontario, lambda c: list(parse_listing(c, 'ontario', SOURCE_URL))),
+    'bc': (bs4_bc, lambda c: list(parse_listing(c, 'bc'))),
+    'alberta': (bs4_alberta, lambda c: list(parse_listing(c, 'alberta'))),
+    'quebec': (bs4_linked_rows, lambda c: list(parse_listing(c, 'quebec', '', 'en'))),
+    'saskatchewan': (bs4_linked_rows, lambda c: list(parse_listing(c, 'saskatchewan', SOURCE_URL))),
+    'manitoba': (bs4_linked_rows, lambda c: list(parse_listing(c, 'manitoba', SOURCE_URL))),
+}
+
+
+def throughput(parse, content, seconds):
+    """Pages parsed per second over roughly the given duration"""
+    pages = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        parse(content)
+        pages += 1
+    return pages / (time.perf_counter() - start)
+
+
+def same_records(baseline, optimised):
+    """Check the lxml parser returns the same fields as the BeautifulSoup baseline"""
+    if len(baseline) != len(optimised):
+        return False
+    return all(
+        all(str(new.get(field, '')) == str(old[field] or '') for field in old)
+        for old, new in zip(baseline, optimised)
+    )
+
+
+def main(n_bills, seconds):
+    print(f"\nParse throughput (pages/sec, {n_bills}-bill synthetic pages unless recorded)")
+    print(f"  {'page':<22} {'bs4':>9} {'lxml':>9} {'speedup':>8}  match")
+
+    for province in PROVINCES:
+        content = load_page(province, 'listing.html', lambda: listing_html(province, n_bills))
+        baseline, optimised = PARSERS[province]
+        before = throughput(baseline, content, seconds)
+        after = throughput(optimised, content, seconds)
+        match = same_records(baseline(content), optimised(content))
+        print(f"  {province + ' listing':<22} {before:9.1f} {after:9.1f} {after / before:7.1f}x  {match}")
+
+    content = load_page('ontario', 'detail.html', lambda: detail_html(4))
+    before = throughput(bs4_readings, content, seconds)
+    after = throughput(parse_readings_page, content, seconds)
+    match = bs4_readings(content) == parse_readings_page(content)['readings']
+    print(f"  {'detail (readings)':<22} {before:9.1f} {after:9.1f} {after / before:7.1f}x  {match}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='BeautifulSoup vs lxml parse throughput')
+    parser.add_argument('--bills', type=int, default=200, help='bills per synthetic listing page')
+    parser.add_argument('--seconds', type=float, default=1.0, help='time spent on each measurement')
+    args = parser.parse_args()
+    main(args.bills, args.seconds)
@@ -0,0 +1,62 @@
+# Benchmark: fixed-rate fetching vs the adaptive per-host rate limiter
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_rate_limit
+#
+# A stub legislature throttles anything above its capacity with 429 +
+# Retry-After and fails a fraction of requests with 500, so the run shows how
+# many pages each strategy gets through, how often it was throttled and how
+# long it took.
+import argparse
+import asyncio
+import time
+
+from src.utils.fetcher import AsyncFetcher
+from src.utils.rate_limit import RateLimiter
+from benchmarks.stub_sites import StubLegislature
+
+STRATEGIES = {
+    # Everything at once, no pacing and no retries: what a naive burst of detail fetches does
+    'burst': lambda: RateLimiter(rate=1000, burst=1000, concurrency=16, max_concurrency=16,
+                                 adaptive=False, max_attempts=1),
+    'adaptive': lambda: RateLimiter(max_concurrency=16),
+}
+
+
+async def run(strategy, pages, latency, capacity, error_rate):
+    site = await StubLegislature('ontario', pages, latency, error_rate=error_rate, capacity=capacity).start()
+    limiter = STRATEGIES[strategy]()
+    try:
+        async with AsyncFetcher(per_host_limit=16, limiter=limiter) as fetcher:
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(fetcher.get(f"{site.url}/detail/{n}") for n in range(1, pages + 1)),
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - start
+    finally:
+        await site.stop()
+
+    ok = sum(1 for r in responses if not isinstance(r, Exception) and r.status_code == 200)
+    host = next(iter(limiter.get_stats().values()))
+    return elapsed, ok, site.throttled, site.errors, host
+
+
+async def main(pages, latency, capacity, error_rate):
+    print(f"\nRate limiter benchmark ({pages} pages, server capacity {capacity} req/s, "
+          f"{error_rate:.0%} injected 500s)")
+    print(f"  {'strategy':<10} {'time':>7} {'ok':>5} {'429s':>5} {'500s':>5} {'retries':>8} {'final rate':>11}")
+    for strategy in STRATEGIES:
+        elapsed, ok, throttled, errors, host = await run(strategy, pages, latency, capacity, error_rate)
+        print(f"  {strategy:<10} {elapsed:6.2f}s {ok:5d} {throttled:5d} {errors:5d} "
+              f"{host['retries']:8d} {host['rate']:11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fixed-rate vs adaptive per-host fetching')
+    parser.add_argument('--pages', type=int, default=100, help='detail pages to fetch')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub server latency in seconds')
+    parser.add_argument('--capacity', type=int, default=20, help='requests per second before the stub throttles')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='fraction of requests answered with 500')
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.latency, args.capacity, args.error_rate))
@@ -0,0 +1,87 @@
+# Benchmark: memory of per-row bill dicts vs slotted bill records
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_records
+#     python -m benchmarks.bench_records --bills 500000
+#
+# Parses synthetic listing pages for every province through the table
+# engine, which builds BillRecords with interned values and one scrape
+# timestamp per page. The baseline rebuilds the same bills the way the
+# scrapers used to: a dict per row, fresh strings for every value parsed
+# from the page and a datetime.now().isoformat() per row. Reports the
+# memory the bills hold (tracemalloc) and the cost of converting them to
+# Arrow at the output boundary.
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.scrapers import specs  # noqa: F401  (registers the province specs)
+from src.scrapers.table import parse_listing
+from src.utils.records import FIELDS, to_arrow
+from benchmarks.stub_sites import PROVINCES, listing_html
+
+SOURCE_URL = 'https://example.org/bills'
+# Values the old scrapers passed in as shared constants rather than parsing per row
+SHARED = ('province', 'source_url')
+
+
+def fresh(value):
+    """A new copy of a string, as text extracted from each row used to be"""
+    return (value + '.')[:-1] if type(value) is str and value else value
+
+
+def parse_records(n_bills, page_size):
+    pages = {province: listing_html(province, page_size).encode('utf-8') for province in PROVINCES}
+    bills = []
+    while len(bills) < n_bills:
+        for province, page in pages.items():
+            bills.extend(parse_listing(page, province, SOURCE_URL))
+    del bills[n_bills:]
+    return bills
+
+
+def legacy_dicts(records):
+    bills = []
+    for record in records:
+        bill = {name: value if name in SHARED else fresh(value) for name, value in record.items()}
+        bill['scraped_date'] = datetime.now().isoformat()
+        bills.append(bill)
+    return bills
+
+
+def measure(build):
+    """Build bills under tracemalloc; returns the bills and the bytes still held by them"""
+    gc.collect()
+    tracemalloc.start()
+    bills = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return bills, held
+
+
+def arrow_seconds(bills):
+    start = time.perf_counter()
+    to_arrow(bills, FIELDS)
+    return time.perf_counter() - start
+
+
+def main(n_bills, page_size):
+    records, records_bytes = measure(lambda: parse_records(n_bills, page_size))
+    dicts, dicts_bytes = measure(lambda: legacy_dicts(records))
+
+    print(f"\nBill record memory ({n_bills} bills, {page_size}-bill pages)")
+    print(f"  {'representation':<26} {'MB':>8} {'bytes/bill':>11} {'to Arrow':>9}")
+    for name, bills, held in (('dict per row', dicts, dicts_bytes), ('BillRecord', records, records_bytes)):
+        print(f"  {name:<26} {held / 1e6:8.1f} {held / n_bills:11.0f} {arrow_seconds(bills):8.2f}s")
+    print(f"  saving: {1 - records_bytes / dicts_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Memory of per-row bill dicts vs slotted bill records')
+    parser.add_argument('--bills', type=int, default=200000, help='bills to hold in memory')
+    parser.add_argument('--page-size', type=int, default=200, help='bills per synthetic listing page')
+    args = parser.parse_args()
+    main(args.bills, args.page_size)
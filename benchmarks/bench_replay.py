@@ -0,0 +1,157 @@
+# Benchmark: a full CanadianProvincialBillsScraper run against recorded fixtures
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_replay
+#     python -m benchmarks.bench_replay --fixtures live --latency 0.2 --runs 5
+#     python -m benchmarks.bench_replay --history
+#
+# The fixtures are served by a replay server in a child process, with a
+# fixed latency per request. Each run reports wall time, pages/sec, total
+# parse time and this process's peak RSS. Results are appended to
+# benchmarks/results/replay.jsonl together with the git commit, so a change
+# can be compared with the runs before it.
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from src.utils.fetcher import AsyncFetcher
+from src.utils.metrics import RunMetrics
+from benchmarks.fixtures import FixtureSet, fast_limiter, isolated_scraper, start_replay_process
+
+RESULTS_PATH = os.path.join(os.path.dirname(__file__), 'results', 'replay.jsonl')
+
+
+def git_revision():
+    """Short commit hash of the tree being measured, marked '+dirty' with uncommitted changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('+dirty' if dirty else '')
+
+
+async def run_once(rewrite, polite):
+    """One full scrape through the replay server; returns wall time, bills and the run's metrics"""
+    metrics = RunMetrics()
+    fetcher = AsyncFetcher(rewrite=rewrite, metrics=metrics, limiter=None if polite else fast_limiter())
+    with tempfile.TemporaryDirectory() as state_dir:
+        scraper = isolated_scraper(fetcher, state_dir)
+        start = time.perf_counter()
+        stats = await scraper.scrape_all_provinces()
+        wall = time.perf_counter() - start
+    return wall, stats['total_bills'], metrics
+
+
+def summarise(runs):
+    """Median figures over the runs, plus per-province scrape times of the median run"""
+    walls = [wall for wall, _, _ in runs]
+    median_run = sorted(runs, key=lambda run: run[0])[len(runs) // 2]
+    wall, bills, metrics = median_run
+
+    pages = sum(value for (name, labels), value in metrics.counters.items()
+                if name == 'requests' and dict(labels).get('status') == '200')
+    parse = sum(h.sum for (name, _), h in metrics.histograms.items() if name == 'parse_seconds')
+    provinces = {dict(labels)['province']: round(h.sum, 3)
+                 for (name, labels), h in metrics.histograms.items() if name == 'scrape_seconds'}
+    return {
+        'wall_seconds': round(statistics.median(walls), 3),
+        'wall_min': round(min(walls), 3),
+        'wall_max': round(max(walls), 3),
+        'bills': bills,
+        'pages': pages,
+        'pages_per_sec': round(pages / wall, 1),
+        'parse_seconds': round(parse, 4),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'province_seconds': dict(sorted(provinces.items())),
+    }
+
+
+def save_result(result):
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'a', encoding='utf-8') as fh:
+        fh.write(json.dumps(result) + '\n')
+
+
+def show_history(fixtures, latency, limit=15):
+    """Print earlier results for the same fixtures and latency, with the change from the run before"""
+    if not os.path.exists(RESULTS_PATH):
+        print(f"No results yet in {RESULTS_PATH}")
+        return
+    with open(RESULTS_PATH, encoding='utf-8') as fh:
+        results = [json.loads(line) for line in fh if line.strip()]
+    results = [r for r in results if r['fixtures'] == fixtures and r['latency'] == latency][-limit:]
+
+    print(f"\nReplay history ({fixtures}, {latency * 1000:.0f} ms latency)")
+    print(f"  {'commit':<14} {'date':<19} {'wall':>8} {'change':>7} {'pages/s':>8} {'parse':>8} {'RSS MB':>7}")
+    previous = None
+    for r in results:
+        change = f"{(r['wall_seconds'] / previous - 1) * 100:+.1f}%" if previous else ''
+        print(f"  {r['commit']:<14} {r['date'][:19]:<19} {r['wall_seconds']:7.3f}s {change:>7} "
+              f"{r['pages_per_sec']:8.1f} {r['parse_seconds']:7.3f}s {r['peak_rss_mb']:7.1f}")
+        previous = r['wall_seconds']
+
+
+async def main(fixtures_name, latency, jitter, runs, polite, save):
+    fixtures = FixtureSet(fixtures_name)
+    if not fixtures.responses:
+        raise SystemExit(f"No fixtures in {fixtures.path}; record some with python -m benchmarks.record_fixtures")
+
+    process, rewrite = start_replay_process(fixtures_name, latency, jitter)
+    try:
+        results = [await run_once(rewrite, polite) for _ in range(runs)]
+    finally:
+        process.terminate()
+        process.join()
+
+    result = {
+        'commit': git_revision(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'fixtures': fixtures_name,
+        'latency': latency,
+        'jitter': jitter,
+        'polite': polite,
+        'runs': runs,
+        **summarise(results),
+    }
+
+    print(f"\nReplay benchmark ({fixtures_name} fixtures, {fixtures.meta.get('source', '')}, "
+          f"{latency * 1000:.0f} ms latency, {runs} runs)")
+    print(f"  wall:       {result['wall_seconds']:6.3f}s median ({result['wall_min']:.3f}s - {result['wall_max']:.3f}s)")
+    print(f"  bills:      {result['bills']}")
+    print(f"  pages/sec:  {result['pages_per_sec']:6.1f}  ({result['pages']} pages)")
+    print(f"  parse time: {result['parse_seconds']:6.3f}s")
+    print(f"  peak RSS:   {result['peak_rss_mb']:6.1f} MB")
+    print(f"  slowest province: {max(result['province_seconds'].items(), key=lambda item: item[1])}")
+
+    if save:
+        save_result(result)
+        print(f"  saved to {RESULTS_PATH} as {result['commit']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay recorded legislature responses through a full scrape')
+    parser.add_argument('--fixtures', default='stub', help='fixture set under benchmarks/fixtures')
+    parser.add_argument('--latency', type=float, default=0.05, help='replay server latency per request, in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random latency of up to this many seconds')
+    parser.add_argument('--runs', type=int, default=3, help='scrapes to run; the median is reported')
+    parser.add_argument('--polite', action='store_true', help='keep the production per-host rate limits')
+    parser.add_argument('--no-save', action='store_true', help="don't append the result to the results file")
+    parser.add_argument('--history', action='store_true', help='show stored results instead of running')
+    args = parser.parse_args()
+
+    if args.history:
+        show_history(args.fixtures, args.latency)
+    else:
+        asyncio.run(main(args.fixtures, args.latency, args.jitter, args.runs, args.polite, not args.no_save))
@@ -0,0 +1,151 @@
+# Benchmark: dashboard searches over the FTS5 search index vs scanning the CSV output
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_search
+#     python -m benchmarks.bench_search --bills 1000000
+#
+# Generates a synthetic bill history (provinces, sessions, statuses, titles
+# drawn from a legislative vocabulary, bilingual Quebec titles), writes it
+# to a CSV file the way --output csv does and indexes it with SearchIndex.
+# Reports the time to build the index, to re-index an unchanged run and to
+# re-index a run where a few statuses changed, then the latency of a mix of
+# dashboard queries (text, facet filters, both) with facet counts, answered
+# by the index and by reading every CSV row.
+import argparse
+import csv
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+from src.utils.search_index import FACETS, SearchIndex, match_expression
+from src.utils.sinks import BILL_FIELDS
+
+PROVINCES = ['Ontario', 'British Columbia', 'Alberta', 'Quebec', 'Saskatchewan', 'Manitoba']
+STATUSES = ['First Reading', 'Second Reading', 'Committee', 'Third Reading', 'Royal Assent']
+SUBJECTS = [
+    'climate', 'energy', 'housing', 'health', 'education', 'labour', 'transit', 'water', 'forestry', 'mining',
+    'taxation', 'pensions', 'elections', 'police', 'courts', 'childcare', 'agriculture', 'fisheries', 'tourism',
+    'insurance', 'privacy', 'cannabis', 'wildfire', 'tenancy', 'municipal', 'indigenous', 'veterans', 'seniors',
+]
+FORMS = ['An Act respecting', 'An Act to amend the', 'An Act to establish the', 'Statutes Amendment Act']
+NOUNS = ['Protection', 'Reform', 'Accountability', 'Modernization', 'Safety', 'Fairness', 'Recovery', 'Standards']
+SUJETS = ['climat', 'énergie', 'logement', 'santé', 'éducation', 'travail', 'transport', 'eau', 'forêts', 'mines']
+
+QUERIES = [
+    ('text', 'climate', {}),
+    ('text, rare', 'wildfire recovery', {}),
+    ('prefix', 'hous', {}),
+    ('French title', 'énergie', {}),
+    ('facet', '', {'province': ['Ontario']}),
+    ('facets', '', {'province': ['Quebec'], 'status': ['Royal Assent']}),
+    ('text + facet', 'health', {'province': ['Alberta'], 'status': ['Committee']}),
+]
+
+
+def generate(n_bills, seed):
+    rng = random.Random(seed)
+    bills = []
+    for n in range(n_bills):
+        province = PROVINCES[n % len(PROVINCES)]
+        subject = rng.choice(SUBJECTS)
+        bill = {
+            'province': province,
+            'session': f"{rng.randint(30, 44)}-{rng.randint(1, 3)}",
+            'bill_number': str(n // len(PROVINCES) + 1),
+            'title': f"{rng.choice(FORMS)} {subject.title()} {rng.choice(NOUNS)} Act",
+            'sponsor': f"Member {rng.randint(1, 400)}",
+            'status': rng.choice(STATUSES),
+            'scraped_date': '2026-01-01T00:00:00',
+        }
+        if province == 'Quebec':
+            bill['title_en'] = bill['title']
+            bill['title_fr'] = f"Loi sur {rng.choice(SUJETS)} et {rng.choice(SUJETS)}"
+        bills.append(bill)
+    return bills
+
+
+def write_csv(bills, path):
+    with open(path, 'w', encoding='utf-8', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=BILL_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(bills)
+
+
+def scan_csv(path, query, filters, limit=20):
+    """What answering a dashboard query takes without an index: read every row"""
+    words = [word.casefold() for word in query.split()]
+    total = 0
+    page = []
+    facets = {facet: Counter() for facet in FACETS}
+    with open(path, encoding='utf-8', newline='') as fh:
+        for row in csv.DictReader(fh):
+            text = f"{row['bill_number']} {row['title']} {row['title_fr']} {row['sponsor']}".casefold()
+            if not all(word in text for word in words):
+                continue
+            selected = {facet: not values or row[facet] in values for facet, values in filters.items()}
+            for facet in FACETS:
+                if all(ok for other, ok in selected.items() if other != facet):
+                    facets[facet][row[facet]] += 1
+            if all(selected.values()):
+                total += 1
+                if len(page) < limit:
+                    page.append(row)
+    return total, page, facets
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(n_bills, batch_size, repeats, seed):
+    bills = generate(n_bills, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'bills.csv')
+        write_csv(bills, csv_path)
+        index = SearchIndex(os.path.join(directory, 'search_index.db'))
+
+        def index_run(run):
+            for start in range(0, len(run), batch_size):
+                index.write(run[start:start + batch_size])
+
+        build, _ = timed(index_run, bills)
+        unchanged, _ = timed(index_run, [dict(bill, scraped_date='2026-01-02T00:00:00') for bill in bills])
+        rng = random.Random(seed + 1)
+        changed = [
+            dict(bill, status=rng.choice(STATUSES), scraped_date='2026-01-03T00:00:00') if rng.random() < 0.01 else bill
+            for bill in bills
+        ]
+        update, _ = timed(index_run, changed)
+
+        print(f"\nSearch benchmark ({n_bills} bills, CSV {os.path.getsize(csv_path) / 1e6:.0f} MB, "
+              f"index {os.path.getsize(index.path) / 1e6:.0f} MB)")
+        print(f"  index build {build:.1f}s, re-index unchanged run {unchanged:.1f}s, "
+              f"re-index with 1% changed {update:.1f}s")
+        print(f"  {'query':<14} {'hits':>8} {'index p50':>10} {'index p95':>10} {'CSV scan':>9}")
+        for name, query, filters in QUERIES:
+            latencies = []
+            for _ in range(repeats):
+                seconds, result = timed(index.search, query, filters)
+                latencies.append(seconds)
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            # The scan matches substrings rather than words, so only a prefix query can differ in hits
+            scan, _ = timed(scan_csv, csv_path, query if match_expression(query) else '', filters)
+            print(f"  {name:<14} {result['total']:8d} {statistics.median(latencies) * 1000:8.1f}ms "
+                  f"{p95 * 1000:8.1f}ms {scan:8.2f}s")
+        index.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='FTS5 search index vs scanning the CSV output')
+    parser.add_argument('--bills', type=int, default=200000, help='bills in the synthetic history')
+    parser.add_argument('--batch-size', type=int, default=500, help='bills per index write, as the pipeline batches')
+    parser.add_argument('--repeats', type=int, default=20, help='times each query is run against the index')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the synthetic history')
+    args = parser.parse_args()
+    main(args.bills, args.batch_size, args.repeats, args.seed)
@@ -0,0 +1,99 @@
+# Benchmark: fixed cron schedules vs watch mode's adaptive polling
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_watch
+#     python -m benchmarks.bench_watch --weeks 26 --changes-per-hour 2
+#
+# Simulates a legislature over a number of weeks on a virtual clock: bills
+# change at random while the house sits (Monday to Thursday, 9:00 to 18:00,
+# three weeks out of five) and never during recess. Each schedule polls the
+# listing, and a change counts as seen at the first poll after it. Reports
+# polls, full downloads (polls that found a change; the rest are 304s
+# through the HTTP cache) and how stale the output was when a change landed.
+import argparse
+import random
+import statistics
+
+from src.utils.poll_schedule import PollSchedule
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+
+def sitting(t):
+    """Whether the house is sitting at t seconds after a Monday midnight"""
+    week, in_week = divmod(t, WEEK)
+    day, in_day = divmod(in_week, DAY)
+    return week % 5 < 3 and day < 4 and 9 * HOUR <= in_day < 18 * HOUR
+
+
+def change_times(weeks, per_hour, seed):
+    """Times of listing changes: a Poisson process while the house sits"""
+    rng = random.Random(seed)
+    times = []
+    t = 0.0
+    while t < weeks * WEEK:
+        t += rng.expovariate(per_hour / HOUR)
+        if sitting(t):
+            times.append(t)
+    return times
+
+
+def simulate(next_delay, changes, duration):
+    """Poll with ``next_delay(found_changes)`` until ``duration``; returns polls, downloads and staleness"""
+    polls = downloads = 0
+    staleness = []
+    pending = 0
+    t = 0.0
+    while t < duration:
+        found = []
+        while pending < len(changes) and changes[pending] <= t:
+            found.append(changes[pending])
+            pending += 1
+        polls += 1
+        if found:
+            downloads += 1
+            staleness.extend(t - change for change in found)
+        t += next_delay(t, len(found))
+    return polls, downloads, staleness
+
+
+def fixed(interval):
+    return lambda t, found: interval
+
+
+def adaptive(min_interval, max_interval):
+    schedule = PollSchedule(path=None, min_interval=min_interval, max_interval=max_interval)
+    return lambda t, found: schedule.record('province', found, now=t)
+
+
+def main(weeks, per_hour, min_interval, max_interval, seed):
+    changes = change_times(weeks, per_hour, seed)
+    duration = weeks * WEEK
+    schedules = [
+        ('cron every 15 min', fixed(15 * 60)),
+        ('cron every hour', fixed(HOUR)),
+        ('cron every 6 hours', fixed(6 * HOUR)),
+        (f'adaptive {min_interval / 60:.0f} min - {max_interval / HOUR:.0f} h', adaptive(min_interval, max_interval)),
+    ]
+
+    print(f"\nWatch benchmark ({weeks} weeks, {len(changes)} changes while sitting, "
+          f"{per_hour:g} per sitting hour)")
+    print(f"  {'schedule':<24} {'polls':>7} {'downloads':>10} {'mean stale':>11} {'p95 stale':>10}")
+    for name, next_delay in schedules:
+        polls, downloads, staleness = simulate(next_delay, changes, duration)
+        p95 = sorted(staleness)[int(len(staleness) * 0.95)] if staleness else 0
+        mean = statistics.mean(staleness) if staleness else 0
+        print(f"  {name:<24} {polls:7d} {downloads:10d} {mean / 60:9.1f}m {p95 / 60:9.1f}m")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fixed cron schedules vs adaptive watch-mode polling')
+    parser.add_argument('--weeks', type=int, default=15, help='simulated weeks')
+    parser.add_argument('--changes-per-hour', type=float, default=1.0, help='listing changes per sitting hour')
+    parser.add_argument('--min-interval', type=float, default=300, help='adaptive schedule floor, in seconds')
+    parser.add_argument('--max-interval', type=float, default=6 * HOUR, help='adaptive schedule ceiling, in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the change times')
+    args = parser.parse_args()
+    main(args.weeks, args.changes_per_hour, args.min_interval, args.max_interval, args.seed)
@@ -0,0 +1,205 @@
+# Recorded legislature responses and a local server that replays them
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from multidict import CIMultiDict
+
+from src.main import CanadianProvincialBillsScraper
+from src.utils.endpoints import EndpointCache
+from src.utils.fetcher import AsyncFetcher
+from src.utils.pdf_pages import PdfPageCache
+from src.utils.rate_limit import RateLimiter
+from src.utils.sinks import JsonLinesSink
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Response headers worth replaying; the rest describe the original server, not the page
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def fast_limiter(concurrency=4):
+    """A fixed, generous per-host limit, so recording from stubs and replays aren't paced like live sites"""
+    return RateLimiter(rate=1000, burst=1000, concurrency=concurrency, max_concurrency=concurrency, adaptive=False)
+
+
+def isolated_scraper(fetcher, state_dir):
+    """Orchestrator writing to /dev/null whose on-disk scraper state lives under ``state_dir``
+
+    A remembered BC feed endpoint or cached PDF pages from an earlier run
+    would otherwise change which requests a run makes.
+    """
+    scraper = CanadianProvincialBillsScraper(fetcher, sink=JsonLinesSink(os.devnull))
+    scraper.scrapers['bc'].endpoints = EndpointCache(os.path.join(state_dir, 'endpoints.json'))
+    scraper.scrapers['saskatchewan'].progress_pages = PdfPageCache(os.path.join(state_dir, 'progress_pages.json'))
+    return scraper
+
+
+class FixtureSet:
+    """Responses recorded from the legislature sites, keyed by the URL the scraper requested
+
+    A set is a directory with an ``index.json`` (URL -> status, headers and
+    body file) and a ``bodies/`` directory of raw response bodies.
+    """
+
+    def __init__(self, name, directory=FIXTURES_DIR):
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self.meta = {}
+        self.responses = {}
+
+        index_path = os.path.join(self.path, 'index.json')
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as fh:
+                index = json.load(fh)
+            self.meta = index['meta']
+            self.responses = index['responses']
+
+    def add(self, url, status, headers, body):
+        entry = self.responses.get(url, {})
+        # A probe records no body; never let it replace a recorded GET of the same URL
+        if body or 'body' not in entry:
+            entry = {
+                'status': status,
+                'headers': {name: headers[name] for name in KEPT_HEADERS if name in headers},
+                'body': hashlib.sha256(url.encode('utf-8')).hexdigest()[:16] if body else None,
+            }
+            self.responses[url] = entry
+            if body:
+                os.makedirs(os.path.join(self.path, 'bodies'), exist_ok=True)
+                with open(os.path.join(self.path, 'bodies', entry['body']), 'wb') as fh:
+                    fh.write(body)
+
+    def body(self, url):
+        entry = self.responses[url]
+        if not entry['body']:
+            return b''
+        with open(os.path.join(self.path, 'bodies', entry['body']), 'rb') as fh:
+            return fh.read()
+
+    def save(self, **meta):
+        self.meta.update(meta)
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'index.json'), 'w', encoding='utf-8') as fh:
+            json.dump({'meta': self.meta, 'responses': self.responses}, fh, indent=1, sort_keys=True)
+
+
+class RecordingFetcher(AsyncFetcher):
+    """AsyncFetcher that writes every response it receives into a FixtureSet"""
+
+    def __init__(self, fixtures, **kwargs):
+        super().__init__(**kwargs)
+        self.fixtures = fixtures
+
+    async def _send(self, url, headers=None, timeout=None):
+        status, response_headers, final_url, content = await super()._send(url, headers, timeout)
+        self.fixtures.add(url, status, response_headers, content)
+        return status, response_headers, final_url, content
+
+    async def probe(self, url, timeout=None):
+        response = await super().probe(url, timeout)
+        self.fixtures.add(url, response.status_code, response.headers, b'')
+        return response
+
+    async def stream(self, url, chunk_size=64 * 1024, timeout=None):
+        chunks = []
+        try:
+            async for chunk in super().stream(url, chunk_size, timeout):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            if chunks:
+                # Streamed feeds are probed first, which recorded their headers
+                headers = self.fixtures.responses.get(url, {}).get('headers') or {'Content-Type': 'application/xml'}
+                self.fixtures.add(url, 200, CIMultiDict(headers), b''.join(chunks))
+
+
+def replay_path(url):
+    """Path on the replay server standing for an original URL: /<scheme>/<host>/<path>?<query>"""
+    parts = urlsplit(url)
+    path = f"/{parts.scheme}/{parts.netloc}{parts.path}"
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+class ReplayServer:
+    """Serve a FixtureSet over HTTP with a configurable latency per request
+
+    Point an AsyncFetcher at it with ``rewrite=server.rewrite``. URLs that
+    were never recorded get a 404, as a missing page would.
+    """
+
+    def __init__(self, fixtures, latency=0.05, jitter=0.0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.misses = 0
+        self.url = None
+        self._runner = None
+        self._bodies = {}
+
+    def rewrite(self, url):
+        return self.url + replay_path(url)
+
+    async def handle(self, request):
+        self.requests += 1
+        # The raw path is still percent-encoded exactly as in the recorded URL
+        scheme, _, rest = request.rel_url.raw_path.lstrip('/').partition('/')
+        query = request.rel_url.raw_query_string
+        url = f"{scheme}://{rest}" + (f"?{query}" if query else '')
+
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        entry = self.fixtures.responses.get(url)
+        if entry is None:
+            self.misses += 1
+            raise web.HTTPNotFound()
+        if url not in self._bodies:
+            self._bodies[url] = self.fixtures.body(url)
+
+        headers = dict(entry['headers'])
+        if headers.get('ETag') and request.headers.get('If-None-Match') == headers['ETag']:
+            return web.Response(status=304, headers={'ETag': headers['ETag']})
+        return web.Response(status=entry['status'], body=self._bodies[url], headers=headers)
+
+    async def start(self, port=0):
+        app = web.Application()
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', port)
+        await site.start()
+        self.url = f"http://127.0.0.1:{self._runner.addresses[0][1]}"
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def _serve_forever(name, latency, jitter, ready):
+    async def serve():
+        server = await ReplayServer(FixtureSet(name), latency, jitter).start()
+        ready.put(server.url)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def start_replay_process(name, latency=0.05, jitter=0.0):
+    """Run a ReplayServer in a child process so it doesn't count towards the benchmark's CPU or RSS
+
+    Returns (process, rewrite); terminate the process when done.
+    """
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_forever, args=(name, latency, jitter, ready), daemon=True)
+    process.start()
+    base_url = ready.get(timeout=30)
+    return process, lambda url: base_url + replay_path(url)
@@ -0,0 +1,88 @@
+# Record legislature responses into a fixture set for the replay benchmark
+#
+# Run from the repository root:
+#     python -m benchmarks.record_fixtures --name live
+#     python -m benchmarks.record_fixtures --from-stubs --name stub --bills 200
+#
+# The first form scrapes the six live legislature sites (network access
+# needed) and saves every response under benchmarks/fixtures/live. The second
+# records the local stub sites under the real sites' URLs instead, which is how
+# the committed 'stub' set was made.
+import argparse
+import asyncio
+import os
+import platform
+import shutil
+import tempfile
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from benchmarks.fixtures import FixtureSet, RecordingFetcher, fast_limiter, isolated_scraper
+from benchmarks.stub_sites import start_sites, stop_sites
+
+
+def listing_urls(province, scraper):
+    """The listing URLs a scraper requests first; the stub serves its listing for these"""
+    if province == 'alberta':
+        return [scraper.bills_db_url]
+    if province == 'quebec':
+        return [scraper.base_url_en, scraper.base_url_fr]
+    return [scraper.base_url]
+
+
+def stub_rewrite(scrapers, sites):
+    """Send each legislature's listing URLs to its stub's listing, and any other URL on that host to the same path"""
+    listings = {}
+    hosts = {}
+    for province, site in sites.items():
+        for url in listing_urls(province, scrapers[province]):
+            listings[url] = f"{site.url}/listing"
+            hosts[urlsplit(url).netloc] = site.url
+
+    def rewrite(url):
+        if url in listings:
+            return listings[url]
+        parts = urlsplit(url)
+        return hosts[parts.netloc] + parts.path + (f"?{parts.query}" if parts.query else '')
+
+    return rewrite
+
+
+async def record(name, from_stubs, n_bills):
+    fixtures = FixtureSet(name)
+    if os.path.exists(fixtures.path):
+        # A new recording replaces the whole set, stale bodies included
+        shutil.rmtree(fixtures.path)
+        fixtures = FixtureSet(name)
+    sites = await start_sites({}, n_bills) if from_stubs else None
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        if from_stubs:
+            fetcher = RecordingFetcher(fixtures, limiter=fast_limiter())
+            scraper = isolated_scraper(fetcher, state_dir)
+            fetcher.rewrite = stub_rewrite(scraper.scrapers, sites)
+        else:
+            scraper = isolated_scraper(RecordingFetcher(fixtures), state_dir)
+        try:
+            stats = await scraper.scrape_all_provinces()
+        finally:
+            if sites is not None:
+                await stop_sites(sites)
+
+    fixtures.save(
+        source=f"stub sites, {n_bills} bills each" if from_stubs else 'live legislature sites',
+        recorded_at=datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        bills=stats['total_bills'],
+        by_province=stats['by_province'],
+    )
+    print(f"Recorded {len(fixtures.responses)} responses ({stats['total_bills']} bills) into {fixtures.path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Record legislature responses for the replay benchmark')
+    parser.add_argument('--name', default='live', help='fixture set to (re)write under benchmarks/fixtures')
+    parser.add_argument('--from-stubs', action='store_true', help='record the local stub sites instead of the live ones')
+    parser.add_argument('--bills', type=int, default=200, help='bills per stub legislature with --from-stubs')
+    args = parser.parse_args()
+    asyncio.run(record(args.name, args.from_stubs, args.bills))
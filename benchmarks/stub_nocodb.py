@@ -0,0 +1,80 @@
+# Local stub of the NocoDB v2 records API used by the NocoDB sync benchmark
+import asyncio
+
+from aiohttp import web
+
+
+class StubNocoDb:
+    """In-memory NocoDB table serving list, bulk insert and bulk update on /api/v2/tables/{table}/records
+
+    Each request waits ``latency`` seconds, so batching and concurrency show
+    up in the measured throughput the way they would against a real server.
+    """
+
+    def __init__(self, token='stub-token', latency=0.02):
+        self.token = token
+        self.latency = latency
+        self.rows = {}
+        self.next_id = 1
+        self.requests = 0
+        self.rows_received = 0
+        self._runner = None
+        self.url = None
+
+    def check(self, request):
+        self.requests += 1
+        if request.headers.get('xc-token') != self.token:
+            raise web.HTTPUnauthorized()
+
+    async def handle_list(self, request):
+        self.check(request)
+        await asyncio.sleep(self.latency)
+        limit = int(request.query.get('limit', 25))
+        offset = int(request.query.get('offset', 0))
+        rows = list(self.rows.values())[offset:offset + limit]
+        return web.json_response({
+            'list': rows,
+            'pageInfo': {'totalRows': len(self.rows), 'isLastPage': offset + limit >= len(self.rows)}
+        })
+
+    async def handle_insert(self, request):
+        self.check(request)
+        records = await request.json()
+        await asyncio.sleep(self.latency)
+        created = []
+        for record in records:
+            row = {**record, 'Id': self.next_id}
+            self.rows[self.next_id] = row
+            created.append({'Id': self.next_id})
+            self.next_id += 1
+        self.rows_received += len(records)
+        return web.json_response(created)
+
+    async def handle_update(self, request):
+        self.check(request)
+        records = await request.json()
+        await asyncio.sleep(self.latency)
+        for record in records:
+            if record.get('Id') not in self.rows:
+                raise web.HTTPNotFound()
+            self.rows[record['Id']].update(record)
+        self.rows_received += len(records)
+        return web.json_response([{'Id': record['Id']} for record in records])
+
+    async def start(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_get('/api/v2/tables/{table}/records', self.handle_list)
+        app.router.add_post('/api/v2/tables/{table}/records', self.handle_insert)
+        app.router.add_patch('/api/v2/tables/{table}/records', self.handle_update)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
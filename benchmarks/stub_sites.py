@@ -0,0 +1,193 @@
+# Local stub legislature sites used by the benchmarks
+import asyncio
+import collections
+import hashlib
+import random
+import time
+
+from aiohttp import web
+
+from src.utils.endpoints import EndpointCache
+
+PROVINCES = ['ontario', 'bc', 'alberta', 'quebec', 'saskatchewan', 'manitoba']
+
+STATUSES = ['First Reading', 'Second Reading', 'Committee', 'Third Reading', 'Royal Assent']
+
+
+def listing_html(province, n_bills):
+    """Build a listing page shaped the way the given province's scraper expects"""
+    rows = []
+    for n in range(1, n_bills + 1):
+        status = STATUSES[n % len(STATUSES)]
+        title = f"An Act respecting stub matter number {n}"
+        if province == 'ontario':
+            rows.append(
+                f'<tr class="bill-row"><td class="bill-number">Bill {n}</td>'
+                f'<td class="title">{title}</td><td class="status">{status}</td></tr>'
+            )
+        elif province == 'bc':
+            rows.append(f'<tr><td>Bill {n}</td><td>{title}</td><td>Member {n}</td><td>{status}</td></tr>')
+        elif province == 'alberta':
+            rows.append(
+                f'<tr><td><a href="/detail/{n}">Bill {n}</a></td><td>{title}</td>'
+                f'<td>Member {n}</td><td>{status}</td></tr>'
+            )
+        elif province == 'quebec':
+            rows.append(f'<tr><td><a href="/detail/{n}">Bill {n} {title}</a></td></tr>')
+        else:
+            rows.append(
+                f'<tr><td><a href="/detail/{n}">Bill {n} - {title}</a></td>'
+                f'<td class="status">{status}</td><td class="sponsor">Member {n}</td></tr>'
+            )
+
+    header = '<tr><th>Bill</th><th>Title</th><th>Sponsor</th><th>Status</th></tr>'
+    if province == 'ontario':
+        table = f'<table><thead>{header}</thead><tbody>{"".join(rows)}</tbody></table>'
+    elif province == 'alberta':
+        table = f'<h3>1st Session</h3><table>{header}{"".join(rows)}</table>'
+    elif province == 'bc':
+        table = f'<table class="bills">{header}{"".join(rows)}</table>'
+    else:
+        table = f'<table>{"".join(rows)}</table>'
+
+    nav = ''.join(f'<li><a href="/page/{i}">Link {i}</a></li>' for i in range(50))
+    return f'<html><head><title>{province} bills</title></head><body><ul>{nav}</ul>{table}</body></html>'
+
+
+def detail_html(n):
+    """Build a bill detail page with a status and reading stages"""
+    readings = ''.join(
+        f'<div class="reading"><span class="stage">{stage}</span><span class="date">2024-0{i + 1}-15</span></div>'
+        for i, stage in enumerate(STATUSES[:1 + n % len(STATUSES)])
+    )
+    status = STATUSES[n % len(STATUSES)]
+    return (
+        f'<html><body><h1>Bill {n}</h1><div class="status">{status}</div>'
+        f'<section class="readings">{readings}</section></body></html>'
+    )
+
+
+class StubLegislature:
+    """aiohttp server on localhost serving one province's listing and detail pages
+
+    ``error_rate`` makes that fraction of requests fail with a 500, and
+    ``capacity`` (requests per second) answers anything beyond it with a 429
+    and a Retry-After, the way a throttling legislature server would.
+    """
+
+    def __init__(self, province, n_bills=50, latency=0.1, error_rate=0.0, capacity=None, retry_after=1):
+        self.province = province
+        self.n_bills = n_bills
+        self.latency = latency
+        self.error_rate = error_rate
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.throttled = 0
+        self.errors = 0
+        self._recent = collections.deque()
+        self._listing = listing_html(province, n_bills).encode('utf-8')
+        self._runner = None
+        self.url = None
+
+    def injected_failure(self):
+        """Return a 429 or 500 response when the stub decides this request fails"""
+        if self.capacity is not None:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.capacity:
+                self.throttled += 1
+                return web.Response(status=429, headers={'Retry-After': str(self.retry_after)})
+            self._recent.append(now)
+
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=500)
+        return None
+
+    def respond(self, request, body):
+        """Serve a body with an ETag, answering 304 when the client already has it"""
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if request.headers.get('If-None-Match') == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={'ETag': etag})
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type='text/html', headers={'ETag': etag})
+
+    async def handle_listing(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        failure = self.injected_failure()
+        if failure is not None:
+            return failure
+        return self.respond(request, self._listing)
+
+    async def handle_detail(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        failure = self.injected_failure()
+        if failure is not None:
+            return failure
+        return self.respond(request, detail_html(int(request.match_info['n'])).encode('utf-8'))
+
+    async def handle_missing(self, request):
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        raise web.HTTPNotFound()
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/listing', self.handle_listing)
+        app.router.add_get('/detail/{n}', self.handle_detail)
+        app.router.add_route('*', '/{tail:.*}', self.handle_missing)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+def point_scraper_at(province, scraper, site_url):
+    """Redirect a province scraper's listing URLs to a stub site"""
+    listing = f"{site_url}/listing"
+    if province == 'bc':
+        # The XML feed candidates are derived from these and 404 on the stub
+        scraper.base_url = listing
+        scraper.progress_url = f"{site_url}/progress"
+        # Discovery against a stub is not remembered in the real data/endpoints.json
+        scraper.endpoints = EndpointCache(path=None)
+    elif province == 'alberta':
+        scraper.bills_db_url = listing
+        scraper.base_url = site_url
+    elif province == 'saskatchewan':
+        # No progress PDF on the stub; the scraper falls back to listing rows alone
+        scraper.base_url = listing
+        scraper.progress_url = f"{site_url}/progress.pdf"
+    elif province == 'quebec':
+        scraper.base_url_en = listing
+        scraper.base_url_fr = listing
+    else:
+        scraper.base_url = listing
+
+
+async def start_sites(latencies, n_bills=50):
+    """Start one stub site per province, keyed by province"""
+    sites = {}
+    for province in PROVINCES:
+        sites[province] = await StubLegislature(province, n_bills, latencies.get(province, 0.1)).start()
+    return sites
+
+
+async def stop_sites(sites):
+    for site in sites.values():
+        await site.stop()
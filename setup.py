@@ -28,9 +28,15 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        "parquet": ["pyarrow>=12.0.0"],
+        "bench": ["beautifulsoup4>=4.12.0"],
+    },
     entry_points={
         "console_scripts": [
             "provincial-scrapy=src.main:main",
+            "provincial-scrapy-worker=src.worker:main",
+            "provincial-scrapy-api=src.api:main",
         ],
     },
 )
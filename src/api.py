@@ -0,0 +1,108 @@
+# Query API over the bill search index, for the dashboard
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from .utils.search_index import FACETS, SearchIndex
+
+MAX_LIMIT = 100
+
+
+def _int(request, name, default, low, high):
+    value = request.query.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+    return max(low, min(high, number))
+
+
+async def search(request):
+    """GET /api/bills/search?q=&province=&session=&status=&limit=&offset=&include_withdrawn=
+
+    Facet parameters can be repeated to match any of several values.
+    """
+    filters = {facet: request.query.getall(facet) for facet in FACETS if facet in request.query}
+    try:
+        limit = _int(request, 'limit', 20, 1, MAX_LIMIT)
+        offset = _int(request, 'offset', 0, 0, 10 ** 9)
+    except ValueError as e:
+        return web.json_response({'error': str(e)}, status=400)
+
+    started = time.perf_counter()
+    result = request.app['index'].search(
+        request.query.get('q', ''),
+        filters,
+        limit=limit,
+        offset=offset,
+        include_withdrawn=request.query.get('include_withdrawn') in ('1', 'true'),
+    )
+    result['took_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return web.json_response(result)
+
+
+async def health(request):
+    return web.json_response({'status': 'ok'})
+
+
+def create_app(index, cors_origin='*'):
+    """aiohttp application serving ``index``; ``cors_origin`` is allowed to call it from a browser"""
+
+    @web.middleware
+    async def cors(request, handler):
+        response = await handler(request)
+        if cors_origin:
+            response.headers['Access-Control-Allow-Origin'] = cors_origin
+        return response
+
+    app = web.Application(middlewares=[cors])
+    app['index'] = index
+    app.router.add_get('/api/bills/search', search)
+    app.router.add_get('/health', health)
+    return app
+
+
+async def serve(index, host='0.0.0.0', port=8000, cors_origin='*'):
+    """Start serving the API in the running event loop; returns the runner to clean up"""
+    runner = web.AppRunner(create_app(index, cors_origin))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"Search API listening on http://{host}:{port}/api/bills/search")
+    return runner
+
+
+def parse_address(address):
+    """'[HOST:]PORT' as a (host, port) pair"""
+    host, _, port = address.rpartition(':')
+    return host or '0.0.0.0', int(port)
+
+
+async def run(index, host, port, cors_origin):
+    runner = await serve(index, host, port, cors_origin)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the bill search index to the dashboard')
+    parser.add_argument('--index', default='data/search_index.db', help='search index database')
+    parser.add_argument('--host', default='0.0.0.0', help='address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='port to listen on')
+    parser.add_argument('--cors-origin', default='*', help="origin allowed to query from a browser ('' for none)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(SearchIndex(args.index), args.host, args.port, args.cors_origin))
+    except KeyboardInterrupt:
+        print("Search API stopped")
+
+
+if __name__ == "__main__":
+    main()
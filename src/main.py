@@ -1,96 +1,517 @@
 
 # Unified Canadian Provincial Bills Scraper
+import argparse
 import asyncio
-import aiohttp
+import time
 from datetime import datetime
-import pandas as pd
-from .scrapers.ontario_bills_scraper import OntarioBillsScraper
-from .scrapers.bc_bills_scraper import BCBillsScraper  
-from .scrapers.alberta_bills_scraper import AlbertaBillsScraper
-from .scrapers.quebec_bills_scraper import QuebecBillsScraper
-from .scrapers.saskatchewan_bills_scraper import SaskatchewanBillsScraper
-from .scrapers.manitoba_bills_scraper import ManitobaBillsScraper
+from .utils.backfill import Commit
+from .utils.incremental import FingerprintStore, bill_key
+from .utils.job_queue import JobQueue, connect, run_worker
+from .utils.metrics import current_province
+from .utils.poll_schedule import PollSchedule
+from .utils.sinks import SummaryStats, open_sink
+from .scrapers.registry import PROVINCES, ScraperRegistry
+
+# Marks the end of one province's stream on the pipeline queue
+_DONE = object()
+
+
+def build_scrapers(fetcher, provinces=None, configure=None):
+    """One scraper per province, keyed the way provinces are selected and queued
+
+    Scrapers are built, and their modules imported, the first time each
+    province is looked up, so a run over one province loads one scraper.
+    """
+    return ScraperRegistry(fetcher, provinces, configure)
+
 
 class CanadianProvincialBillsScraper:
-    def __init__(self):
-        self.scrapers = {
-            'ontario': OntarioBillsScraper(),
-            'bc': BCBillsScraper(),
-            'alberta': AlbertaBillsScraper(),
-            'quebec': QuebecBillsScraper(),
-            'saskatchewan': SaskatchewanBillsScraper(),
-            'manitoba': ManitobaBillsScraper()
+    def __init__(self, fetcher=None, incremental=False, sink=None, queue_size=1000, batch_size=500,
+                 parse_pool=None, provinces=None, search_index=None):
+        if fetcher is None:
+            # aiohttp is most of the package's import time, so it is only loaded for a run
+            from .utils.fetcher import AsyncFetcher
+            from .utils.http_cache import HttpCache
+            fetcher = AsyncFetcher(cache=HttpCache())
+        # One fetcher shared by every province so pools and limits are global
+        self.fetcher = fetcher
+        # Optional worker processes for parsing, so big crawls don't stall on the event loop
+        if parse_pool is not None:
+            self.fetcher.parse_pool = parse_pool
+
+        # Incremental mode emits only inserts, updates and withdrawals
+        self.incremental = incremental
+        self.fingerprints = FingerprintStore() if incremental else None
+        # Only the provinces in ``provinces`` (default: all) can be scraped, each loaded on first use
+        self.scrapers = build_scrapers(self.fetcher, provinces, self.configure_scraper)
+
+        # Bills are streamed to the sink as each province finishes; by default they are
+        # upserted into the persistent SQLite store
+        name = 'canadian_provincial_bills_delta' if incremental else 'canadian_provincial_bills'
+        self.sink = sink or open_sink('sqlite', name)
+        self.stats = SummaryStats()
+        # Optional SearchIndex kept up to date with every bill the run sees, for the query API
+        self.search_index = search_index
+
+        # Scrapers feed a bounded queue so memory stays flat however many bills there are
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.scraped_provinces = set()
+        self.failed_provinces = set()
+        self.mode = 'current'
+
+    def configure_scraper(self, scraper):
+        """Share the run's state with each scraper as the registry builds it"""
+        if self.incremental:
+            scraper.fingerprints = self.fingerprints
+
+    async def scrape_all_provinces(self, provinces=None, mode='current', start_year=2020, end_year=None):
+        """Run the provincial scrapers in parallel, streaming bills through the pipeline
+
+        ``mode`` is 'current' for the current session or 'historical' for a
+        backfill of sessions overlapping start_year..end_year.
+        """
+        self.mode = mode
+        selected = {
+            province: self.scrapers[province] for province in self.scrapers
+            if provinces is None or province in provinces
         }
-        self.all_bills = []
+        queue = asyncio.Queue(maxsize=self.queue_size)
+
+        async with self.fetcher:
+            producers = [
+                asyncio.create_task(self.scrape_province(
+                    province, scraper, queue, self.bill_source(scraper, mode, start_year, end_year)
+                ))
+                for province, scraper in selected.items()
+            ]
+            try:
+                await self.consume(queue, len(producers))
+            finally:
+                for producer in producers:
+                    producer.cancel()
+                await asyncio.gather(*producers, return_exceptions=True)
+
+        return self.get_summary_stats()
+
+    async def scrape_distributed(self, queue, provinces=None, mode='current', start_year=2020, end_year=None,
+                                 local_workers=0):
+        """Hand the scrape to workers through a JobQueue and stream their results through the pipeline
+
+        Province listings (or, for a historical run, each province's
+        historical units) are queued as jobs. Listing stubs that still need a
+        detail page become detail jobs of their own, so detail crawls spread
+        over the workers too. ``local_workers`` runs that many job slots in
+        this process as well, which is what makes an in-memory queue useful.
+        """
+        self.mode = mode
+        selected = {
+            province: self.scrapers[province] for province in self.scrapers
+            if provinces is None or province in provinces
+        }
+        bills = asyncio.Queue(maxsize=self.queue_size)
+        outstanding = set()
+        # Detail URL -> listing stubs waiting for that page
+        stubs = {}
+
+        async with self.fetcher:
+            consumer = asyncio.create_task(self.consume(bills, 1))
+            workers = [asyncio.create_task(run_worker(queue, self.scrapers, local_workers))] if local_workers else []
+            try:
+                for province, scraper in selected.items():
+                    print(f"Queueing {province}...")
+                    if mode == 'historical':
+                        for unit in await scraper.historical_units(start_year, end_year):
+                            outstanding.add(await queue.enqueue('unit', province, unit))
+                    else:
+                        outstanding.add(await queue.enqueue('listing', province))
+                outstanding.discard(None)
+
+                while outstanding:
+                    result = await queue.next_result()
+                    if result is None or result['job']['id'] not in outstanding:
+                        # Nothing yet, or a second delivery of a job that outlived its lease
+                        continue
+                    job = result['job']
+                    outstanding.discard(job['id'])
+                    scraper = self.scrapers[job['province']]
+
+                    if result['error']:
+                        print(f"Error in {job['kind']} job for {job['province']}: {result['error']}")
+                        self.failed_provinces.add(scraper.province)
+
+                    for bill, detail_url in result['bills']:
+                        if not detail_url:
+                            await bills.put(bill)
+                        elif detail_url in stubs:
+                            stubs[detail_url].append(bill)
+                        else:
+                            stubs[detail_url] = [bill]
+                            outstanding.add(await queue.enqueue('detail', job['province'], detail_url))
+                    outstanding.discard(None)
+
+                    if job['kind'] == 'detail':
+                        for bill in stubs.pop(job['url'], []):
+                            scraper.apply_details(bill, result['details'])
+                            await bills.put(bill)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await bills.put(_DONE)
+                await consumer
+                await queue.discard_run()
+
+        return self.get_summary_stats()
 
-    async def scrape_all_provinces(self):
-        """Run all provincial scrapers in parallel"""
-        tasks = []
+    async def watch(self, provinces=None, schedule=None, max_polls=None, serve=None):
+        """Poll each province on its own adaptive schedule, emitting change events as they are found
 
-        for province, scraper in self.scrapers.items():
-            task = asyncio.create_task(self.scrape_province(province, scraper))
-            tasks.append(task)
+        Each province's listing is polled whenever the schedule says it is due,
+        through the HTTP cache so an unchanged page costs a 304. Inserts,
+        updates and withdrawals go to the sink after every poll, and the poll's
+        outcome tunes that province's interval. Runs until cancelled, or until
+        every province has been polled ``max_polls`` times. ``serve``, a
+        (host, port) pair, serves the search index's query API meanwhile.
+        """
+        if not self.incremental:
+            raise ValueError("Watch mode needs incremental=True to detect changes")
+        if serve is not None and self.search_index is None:
+            raise ValueError("Serving the query API needs a search index")
+        self.mode = 'watch'
+        schedule = schedule or PollSchedule()
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        runner = None
+        if serve is not None:
+            from .api import serve as serve_api
+            runner = await serve_api(self.search_index, *serve)
 
-        # Combine all results
-        for result in results:
-            if isinstance(result, list):
-                self.all_bills.extend(result)
+        async with self.fetcher:
+            watchers = [
+                asyncio.create_task(self.watch_province(province, self.scrapers[province], schedule, max_polls))
+                for province in self.scrapers
+                if provinces is None or province in provinces
+            ]
+            try:
+                await asyncio.gather(*watchers)
+            finally:
+                for watcher in watchers:
+                    watcher.cancel()
+                await asyncio.gather(*watchers, return_exceptions=True)
+                if runner is not None:
+                    await runner.cleanup()
 
-        return self.all_bills
+        return self.get_summary_stats()
 
-    async def scrape_province(self, province, scraper):
-        """Scrape a single province"""
+    async def watch_province(self, province, scraper, schedule, max_polls=None):
+        """Poll one province whenever it is due"""
+        current_province.set(province)
+        metrics = self.fetcher.metrics
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            await asyncio.sleep(schedule.wait(province))
+            polls += 1
+            started = time.perf_counter()
+            try:
+                changes = await self.poll_province(scraper)
+            except Exception as e:
+                # Fingerprints are not committed, so the next poll sees the same changes
+                delay = schedule.failed(province)
+                print(f"Error polling {province}: {e}; retrying in {delay / 60:.1f} min")
+                self.failed_provinces.add(scraper.province)
+                continue
+            finally:
+                metrics.inc('polls')
+                metrics.observe('scrape_seconds', time.perf_counter() - started)
+
+            self.failed_provinces.discard(scraper.province)
+            metrics.inc('changes_detected', changes)
+            delay = schedule.record(province, changes)
+            print(f"{province}: {changes} changes, next poll in {delay / 60:.1f} min")
+
+    async def poll_province(self, scraper):
+        """Scrape a province's listing once and emit what changed since its last poll; returns the number of changes"""
+        seen = set()
+        batch = []
+        changes = 0
+        async for bill in scraper.scrape_current_bills():
+            if not self.is_new(bill, seen):
+                continue
+            self.scraped_provinces.add(bill.get('province'))
+            batch.append(bill)
+            if len(batch) >= self.batch_size:
+                changes += self.emit(batch)
+                batch = []
+        if batch:
+            changes += self.emit(batch)
+
+        # The listing was read completely, so bills missing from it were withdrawn
+        withdrawals = self.withdrawal_events({scraper.province})
+        if withdrawals:
+            self.write_withdrawals(withdrawals)
+        self.fingerprints.save({scraper.province})
+        self.sink.flush()
+        return changes + len(withdrawals)
+
+    def bill_source(self, scraper, mode, start_year, end_year):
+        """Pick the scraper's async generator for the run mode"""
+        if mode == 'historical':
+            return scraper.get_historical_bills(start_year=start_year, end_year=end_year)
+        return scraper.scrape_current_bills()
+
+    async def scrape_province(self, province, scraper, queue, bills):
+        """Scrape a single province onto the pipeline queue"""
+        # Labels this task's fetch and parse metrics, and those of any task it starts
+        current_province.set(province)
+        metrics = self.fetcher.metrics
+        started = time.perf_counter()
+        count = 0
         try:
             print(f"Starting scrape for {province}...")
-            bills = scraper.scrape_current_bills()
-            print(f"Found {len(bills)} bills for {province}")
-            return bills
+            async for bill in bills:
+                await queue.put(bill)
+                if not isinstance(bill, Commit):
+                    count += 1
+            print(f"Found {count} bills for {province}")
         except Exception as e:
+            # Bills already queued are kept, but the province is not considered complete
             print(f"Error scraping {province}: {e}")
-            return []
+            self.failed_provinces.add(scraper.province)
+        finally:
+            metrics.inc('rows_emitted', count)
+            metrics.observe('scrape_seconds', time.perf_counter() - started)
+            await queue.put(_DONE)
+
+    async def consume(self, queue, producers):
+        """Pipeline stages: deduplicate, then emit in batches to the sink and stats"""
+        seen = set()
+        batch = []
+
+        while producers:
+            bill = await queue.get()
+            if bill is _DONE:
+                producers -= 1
+                continue
+            if isinstance(bill, Commit):
+                # A backfill unit is checkpointed only once its bills are stored
+                if batch:
+                    self.emit(batch)
+                    batch = []
+                self.sink.flush()
+                bill()
+                continue
+
+            if not self.is_new(bill, seen):
+                continue
+
+            self.scraped_provinces.add(bill.get('province'))
+            batch.append(bill)
+            if len(batch) >= self.batch_size:
+                self.emit(batch)
+                batch = []
+
+        if batch:
+            self.emit(batch)
+
+    def is_new(self, bill, seen):
+        """Deduplication stage: drop bills already emitted this run"""
+        if not bill.get('bill_number'):
+            # Without a bill number there is nothing reliable to deduplicate on
+            return True
+        key = bill_key(bill)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def emit(self, bills):
+        """Output stage: write a batch to the sink, keeping only changes in incremental mode
+
+        Returns the number of bills written.
+        """
+        if self.search_index is not None:
+            # The index gets every bill, so it is complete even when only changes are output
+            with self.fetcher.metrics.timer('index_write_seconds', province='pipeline'):
+                self.search_index.write(bills)
+        if self.incremental:
+            bills = [
+                {**bill, 'change_type': change_type}
+                for bill in bills
+                for change_type in [self.fingerprints.observe(bill)]
+                if change_type
+            ]
+        with self.fetcher.metrics.timer('sink_write_seconds', province='pipeline'):
+            self.sink.write(bills)
+        self.fetcher.metrics.inc('rows_written', len(bills), province='pipeline')
+        self.stats.update(bills)
+        return len(bills)
+
+    def withdrawal_events(self, provinces):
+        """Withdrawal events for bills of the given provinces that this run no longer saw
+
+        The stored bill is the last sighting, so the event gets this run's
+        timestamp: the sinks and search index date the withdrawal from it.
+        """
+        found_at = datetime.now().isoformat()
+        return [
+            {**bill, 'change_type': 'withdrawal', 'scraped_date': found_at}
+            for bill in self.fingerprints.withdrawals(provinces)
+        ]
+
+    def write_withdrawals(self, withdrawals):
+        """Output withdrawal events and mark the bills withdrawn in the search index"""
+        self.sink.write(withdrawals)
+        self.stats.update(withdrawals)
+        if self.search_index is not None:
+            self.search_index.write(withdrawals)
 
     def save_to_database(self):
-        """Save all bills to database or CSV"""
-        df = pd.DataFrame(self.all_bills)
+        """Finish writing the streamed bills and return the output path or database"""
+        # Only provinces that were scraped completely can have withdrawals or new fingerprints
+        complete = self.scraped_provinces - self.failed_provinces
+        if self.incremental and self.mode == 'current':
+            self.write_withdrawals(self.withdrawal_events(complete))
 
-        # Save to CSV for now
-        filename = f"canadian_provincial_bills_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        df.to_csv(filename, index=False)
+        filename = self.sink.close()
+        if self.search_index is not None:
+            self.search_index.close()
+        # Watch mode commits each province after each complete poll, never a poll cut short;
+        # a province that failed keeps its previous fingerprints. A historical run's bills are
+        # past sessions, so committing them would replace the current listing's fingerprints
+        if self.incremental and self.mode == 'current':
+            self.fingerprints.save(complete)
 
-        print(f"Saved {len(self.all_bills)} bills to {filename}")
+        print(f"Saved {self.stats.total_bills} bills to {filename}")
         return filename
 
     def get_summary_stats(self):
         """Get summary statistics"""
-        if not self.all_bills:
-            return {}
-
-        df = pd.DataFrame(self.all_bills)
-        stats = {
-            'total_bills': len(df),
-            'by_province': df['province'].value_counts().to_dict(),
-            'latest_update': datetime.now().isoformat()
-        }
+        stats = self.stats.as_dict()
+        if self.fetcher.cache is not None:
+            stats['http_cache'] = self.fetcher.cache.get_stats()
+        stats['rate_limit'] = self.fetcher.limiter.get_stats()
 
         return stats
 
+    def write_metrics(self, directory, profile=None):
+        """Write the Prometheus metrics file and the JSON run report; returns the report path"""
+        extra = {'summary': self.get_summary_stats(), 'failed_provinces': sorted(self.failed_provinces)}
+        if profile is not None:
+            extra['profile'] = profile
+        return self.fetcher.metrics.write(directory, extra)
+
 def main():
     """Main entry point for the scraper"""
-    scraper = CanadianProvincialBillsScraper()
+    parser = argparse.ArgumentParser(description='Scrape bills from Canadian provincial legislatures')
+    parser.add_argument('-p', '--province', dest='provinces', action='append', choices=PROVINCES,
+                        help='province to scrape; repeat for several (default: all)')
+    parser.add_argument('--list-provinces', action='store_true', help='print the province keys and exit')
+    parser.add_argument('--mode', choices=['current', 'historical', 'watch'], default='current',
+                        help="'current' session, a 'historical' backfill of past sessions, or 'watch' to keep "
+                             "polling each province and output changes as they appear")
+    parser.add_argument('--historical', dest='mode', action='store_const', const='historical',
+                        help='same as --mode historical')
+    parser.add_argument('--incremental', action='store_true', help='only output bills that changed since the last run')
+    parser.add_argument('--min-interval', type=float, default=300,
+                        help='shortest watch-mode poll interval per province, in seconds')
+    parser.add_argument('--max-interval', type=float, default=6 * 3600,
+                        help='longest watch-mode poll interval per province, in seconds')
+    parser.add_argument('--search-index', default='data/search_index.db',
+                        help='full-text search index updated with every bill scraped')
+    parser.add_argument('--no-search-index', dest='search_index', action='store_const', const=None,
+                        help='do not update the search index')
+    parser.add_argument('--serve', metavar='[HOST:]PORT',
+                        help='in watch mode, also serve the search query API (python -m src.api serves it alone)')
+    parser.add_argument('--start-year', type=int, default=2020, help='first year of a historical backfill')
+    parser.add_argument('--end-year', type=int, help='last year of a historical backfill (default: this year)')
+    parser.add_argument('--output', choices=['sqlite', 'csv', 'jsonl', 'parquet', 'nocodb'], default='sqlite',
+                        help='output format; sqlite upserts into one database updated every run')
+    parser.add_argument('--compression', choices=['gzip', 'bz2', 'xz', 'snappy', 'zstd'], help='output compression')
+    parser.add_argument('--output-dir', default='.', help='directory for output files')
+    parser.add_argument('--distributed', metavar='REDIS_URL',
+                        help='queue the work for workers (python -m src.worker) through Redis; memory:// runs it in-process')
+    parser.add_argument('--local-workers', type=int, default=0, help='job slots to run in this process in distributed mode')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='parse pages in this many worker processes (default: parse on the event loop)')
+    parser.add_argument('--parse-batch-size', type=int, default=16, help='pages sent to a parse worker at a time')
+    parser.add_argument('--metrics-dir', default='data/metrics',
+                        help='directory for metrics.prom and the JSON run report')
+    parser.add_argument('--profile', choices=['cprofile', 'sample'],
+                        help='profile the run and break the time down by province scraper')
+    args = parser.parse_args()
+
+    if args.list_provinces:
+        print('\n'.join(PROVINCES))
+        return
+    if args.mode == 'watch':
+        if args.distributed:
+            parser.error('watch mode runs in a single process; drop --distributed')
+        # Watch mode outputs change events, which is what incremental mode detects
+        args.incremental = True
+    if args.serve and (args.mode != 'watch' or not args.search_index):
+        parser.error('--serve needs --mode watch and a search index')
+
+    name = 'canadian_provincial_bills_delta' if args.incremental else 'canadian_provincial_bills'
+    sink = open_sink(args.output, name, args.compression, args.output_dir)
+    parse_pool = None
+    if args.parse_workers:
+        from .utils.parse_pool import ParsePool
+        parse_pool = ParsePool(args.parse_workers, args.parse_batch_size)
+    search_index = None
+    if args.search_index:
+        from .utils.search_index import SearchIndex
+        search_index = SearchIndex(args.search_index)
+    scraper = CanadianProvincialBillsScraper(incremental=args.incremental, sink=sink, parse_pool=parse_pool,
+                                             provinces=args.provinces, search_index=search_index)
+    profiler = None
+    if args.profile:
+        from .utils.profiling import ScrapeProfiler
+        profiler = ScrapeProfiler(args.profile)
+        profiler.attach(scraper.scrapers)
+        profiler.start()
 
     # Run the scraper
-    bills = asyncio.run(scraper.scrape_all_provinces())
+    if args.mode == 'watch':
+        schedule = PollSchedule(min_interval=args.min_interval, max_interval=args.max_interval)
+        try:
+            serve = None
+            if args.serve:
+                from .api import parse_address
+                serve = parse_address(args.serve)
+            asyncio.run(scraper.watch(args.provinces, schedule, serve=serve))
+        except KeyboardInterrupt:
+            print("Watch stopped")
+    elif args.distributed:
+        queue = JobQueue(connect(args.distributed))
+        local_workers = args.local_workers or (4 if args.distributed.startswith('memory://') else 0)
+        asyncio.run(scraper.scrape_distributed(queue, args.provinces, args.mode, args.start_year, args.end_year,
+                                               local_workers=local_workers))
+    else:
+        asyncio.run(scraper.scrape_all_provinces(args.provinces, args.mode, args.start_year, args.end_year))
+
+    if parse_pool is not None:
+        parse_pool.close()
 
     # Save results
     filename = scraper.save_to_database()
+    profile = profiler.stop() if profiler is not None else None
+    report_path = scraper.write_metrics(args.metrics_dir, profile)
 
     # Print summary
     stats = scraper.get_summary_stats()
     print("\nScraping Summary:")
     print(f"Total bills scraped: {stats['total_bills']}")
     print(f"Bills by province: {stats['by_province']}")
+    if 'changes' in stats:
+        print(f"Changes: {stats['changes']}")
+    if 'http_cache' in stats:
+        cache_stats = stats['http_cache']
+        print(f"HTTP cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['bytes_saved']} bytes saved")
+    print("Stage timings:")
+    for province, line in scraper.fetcher.metrics.stage_summary().items():
+        print(f"  {province}: {line}")
+    print(f"Run report: {report_path}")
 
 # Usage example:
 if __name__ == "__main__":
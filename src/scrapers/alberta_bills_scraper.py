@@ -1,66 +1,110 @@
 
 # Alberta Legislature Bills Scraper  
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from datetime import datetime
+from urllib.parse import urljoin
+import re
+from .specs import ALBERTA
+from .table import TableBillsScraper
+from ..utils.backfill import CheckpointStore, run_backfill
+from ..utils.parsing import parse_html, xpath
 
-class AlbertaBillsScraper:
-    def __init__(self):
-        self.base_url = "https://www.assembly.ab.ca/assembly-business/bills"
-        self.bills_db_url = "https://www.assembly.ab.ca/assembly-business/bills/bills-by-legislature"
+# Selectors are compiled once at import time
+LINKS = xpath("//a[@href]")
+YEAR = re.compile(r'\b(19\d\d|20\d\d)\b')
+ORDINAL = re.compile(r'(\d+)(?:st|nd|rd|th)\s+legislature|legl(?:ature)?=(\d+)', re.IGNORECASE)
 
-    def scrape_bills_database(self):
-        """Scrape Alberta bills from structured database"""
-        bills = []
+# General election years; the Nth legislature sits from the Nth election to the next.
+# The 1st Legislature was elected in 1905 and first sat in 1906.
+ELECTION_YEARS = [
+    1906, 1909, 1913, 1917, 1921, 1926, 1930, 1935, 1940, 1944, 1948, 1952, 1955, 1959, 1963, 1967,
+    1971, 1975, 1979, 1982, 1986, 1989, 1993, 1997, 2001, 2004, 2008, 2012, 2015, 2019, 2023
+]
+
+
+def legislature_years(link_text, href):
+    """Work out the (first, last) years a legislature link covers, or None if unknown"""
+    years = [int(year) for year in YEAR.findall(link_text)]
+    if years:
+        return min(years), max(years)
+
+    match = ORDINAL.search(link_text) or ORDINAL.search(href)
+    if match:
+        number = int(match.group(1) or match.group(2))
+        if 1 <= number <= len(ELECTION_YEARS):
+            start = ELECTION_YEARS[number - 1]
+            end = ELECTION_YEARS[number] if number < len(ELECTION_YEARS) else datetime.now().year
+            return start, end
+    return None
+
+
+class AlbertaBillsScraper(TableBillsScraper):
+    """Alberta bills from the bills-by-legislature tables (specs.ALBERTA), with a historical backfill"""
+
+    spec = ALBERTA
+
+    async def scrape_current_bills(self):
+        """Scrape current legislature bills from the Alberta bills database"""
+        async for bill in self.scrape_bills_database():
+            yield bill
 
+    async def scrape_bills_database(self):
+        """Scrape Alberta bills from structured database"""
         # Get current legislature bills
-        response = requests.get(self.bills_db_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Look for legislature sessions
-        sessions = soup.find_all('div', class_='legislature-session') or soup.find_all('h3')
-
-        for session in sessions:
-            session_name = session.text.strip()
-
-            # Find bills table for this session
-            bills_table = session.find_next('table')
-            if bills_table:
-                rows = bills_table.find_all('tr')[1:]  # Skip header
-
-                for row in rows:
-                    cells = row.find_all('td')
-                    if len(cells) >= 4:
-                        bill_link = cells[0].find('a')
-                        bills.append({
-                            'province': 'Alberta',
-                            'session': session_name,
-                            'bill_number': cells[0].text.strip(),
-                            'title': cells[1].text.strip(),
-                            'sponsor': cells[2].text.strip(),
-                            'status': cells[3].text.strip(),
-                            'bill_url': bill_link.get('href') if bill_link else '',
-                            'scraped_date': datetime.now().isoformat()
-                        })
-
-        return bills
-
-    def get_historical_bills(self, start_year=2020):
-        """Get historical bills from Alberta going back to specified year"""
-        all_bills = []
+        async for bill in self.scrape_table(self.bills_db_url):
+            yield bill
+
+    async def get_historical_bills(self, start_year=2020, end_year=None, workers=4, checkpoint=None):
+        """Get historical bills from Alberta for legislatures overlapping start_year..end_year
+
+        Legislature pages are spread over a worker pool, paced by the
+        fetcher's per-host rate limiter, and completed pages are checkpointed
+        so an interrupted backfill resumes where it stopped. Disjoint year ranges can be run as
+        shards on separate machines.
+        """
+        end_year = end_year or datetime.now().year
+        checkpoint = checkpoint or CheckpointStore('data/checkpoints/alberta_backfill.jsonl')
+
+        session_urls = await self.discover_legislatures(start_year, end_year)
+        async for bill in run_backfill(session_urls, self.scrape_legislature_session, checkpoint,
+                                       workers=workers):
+            yield bill
 
+    async def discover_legislatures(self, start_year, end_year):
+        """List legislature page URLs whose years overlap the requested range"""
         # Alberta has bills database from 1906
         historical_url = f"{self.base_url}/bills-by-legislature"
-        response = requests.get(historical_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = await self.fetcher.get(historical_url)
 
         # Find legislature links
-        legislature_links = soup.find_all('a', href=True)
+        urls = {}
+        unknown = 0
+        for link in LINKS(parse_html(response.content)):
+            href = link.get('href')
+            if 'legislature' not in href.lower():
+                continue
+
+            years = legislature_years(link.text_content(), href)
+            if years is None:
+                unknown += 1
+                continue
+            if years[1] >= start_year and years[0] <= end_year:
+                urls.setdefault(urljoin(historical_url, href), years)
+
+        if unknown:
+            print(f"Alberta backfill: skipped {unknown} legislature links with no recognisable years")
+        return list(urls)
+
+    async def scrape_legislature_session(self, leg_url):
+        """Scrape every session's bills from one legislature page"""
+        # scrape_table raises on an error page, so it is never checkpointed as an empty session
+        async for bill in self.scrape_table(leg_url):
+            bill['source_url'] = leg_url
+            yield bill
 
-        for link in legislature_links:
-            if 'legislature' in link.get('href', '').lower():
-                leg_url = urljoin(historical_url, link.get('href'))
-                leg_bills = self.scrape_legislature_session(leg_url)
-                all_bills.extend(leg_bills)
+    async def historical_units(self, start_year, end_year):
+        """Legislature pages are the units of a distributed backfill"""
+        return await self.discover_legislatures(start_year, end_year)
 
-        return all_bills
+    async def scrape_historical_unit(self, unit):
+        async for bill in self.scrape_legislature_session(unit):
+            yield bill
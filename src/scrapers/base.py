@@ -0,0 +1,59 @@
+# Common interface for the province scrapers
+from ..utils.fetcher import AsyncFetcher
+
+
+class BaseBillsScraper:
+    """Base class for province scrapers
+
+    Every scrape method is an async generator that yields bill records as they
+    are parsed, so the orchestrator can stream them through its pipeline
+    without any province accumulating a list of bills.
+    """
+
+    # Province name as it appears in the 'province' field of each record
+    province = ''
+
+    def __init__(self, fetcher=None):
+        self.fetcher = fetcher or AsyncFetcher()
+        # Set by the orchestrator in incremental mode
+        self.fingerprints = None
+
+    async def scrape_current_bills(self):
+        """Yield bills from the current session"""
+        raise NotImplementedError
+        yield
+
+    async def scrape_bills_database(self):
+        """Yield bills from the province's bills database; defaults to the current listing"""
+        async for bill in self.scrape_current_bills():
+            yield bill
+
+    async def get_historical_bills(self, start_year=2020, end_year=None):
+        """Yield bills from past sessions; provinces without history yield nothing"""
+        return
+        yield
+
+    # Work-unit interface used by the distributed job queue; the defaults suit
+    # provinces whose listing rows are complete and that have no history
+
+    async def scrape_listing_stubs(self):
+        """Yield (bill, detail_url) pairs; detail_url is None when the bill needs no detail page"""
+        async for bill in self.scrape_current_bills():
+            yield bill, None
+
+    async def get_bill_details(self, bill_url):
+        """Fetch the details that complete a listing stub"""
+        return {}
+
+    def apply_details(self, bill, details):
+        """Merge the result of get_bill_details into a listing stub"""
+        bill.update(details)
+
+    async def historical_units(self, start_year, end_year):
+        """URLs of the independently scrapable pieces of a historical backfill"""
+        return []
+
+    async def scrape_historical_unit(self, unit):
+        """Yield the bills of one historical unit"""
+        return
+        yield
@@ -1,69 +1,148 @@
 
 # British Columbia Legislature Bills Scraper
-import requests
-from bs4 import BeautifulSoup
+from datetime import datetime
+import asyncio
 import xml.etree.ElementTree as ET
-import pandas as pd
 
-class BCBillsScraper:
-    def __init__(self):
-        self.base_url = "https://www.leg.bc.ca/parliamentary-business/bills"
-        self.progress_url = "https://www.leg.bc.ca/parliamentary-business/bills-and-legislation"
+import aiohttp
 
-    def scrape_bills_xml(self):
-        """Scrape BC bills from XML feed if available"""
-        bills = []
+from .specs import BC
+from .table import TableBillsScraper
+from ..utils.endpoints import NO_ENDPOINT, EndpointCache
+from ..utils.fetcher import HTTPStatusError
+from ..utils.records import BillRecord
 
-        # Try XML endpoint first
+# Endpoint cache key prefix for the discovered XML feed; the key also names the site probed
+FEED_KEY = 'bc_bills_xml'
+# Probe answers that show a candidate is not a feed; anything else may be transient
+NOT_FOUND = (404, 410)
+
+
+def parse_feed_bill(element, scraped_date):
+    """Build a bill record from a <bill> element of the XML feed"""
+    def field(tag):
+        child = element.find(tag)
+        return (child.text or '').strip() if child is not None else ''
+
+    return BillRecord(
+        province='British Columbia',
+        bill_number=field('number'),
+        title=field('title'),
+        status=field('status'),
+        member=field('member'),
+        scraped_date=scraped_date
+    )
+
+
+class BCBillsScraper(TableBillsScraper):
+    """BC bills from the XML feed when one answers, else the HTML table (specs.BC)"""
+
+    spec = BC
+
+    def __init__(self, fetcher=None, endpoints=None, probe_timeout=5):
+        super().__init__(fetcher)
+        self.endpoints = endpoints or EndpointCache()
+        self.probe_timeout = probe_timeout
+
+    async def scrape_current_bills(self):
+        """Scrape current BC bills, preferring the XML feed"""
+        async for bill in self.scrape_bills_xml():
+            yield bill
+
+    async def scrape_bills_xml(self):
+        """Scrape BC bills from XML feed if available, falling back to the HTML listing"""
+        xml_url = self.endpoints.get(self.feed_key)
+        if xml_url is None:
+            xml_url = await self.discover_xml_feed()
+
+        if xml_url:
+            try:
+                async for bill in self.stream_xml_feed(xml_url):
+                    yield bill
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError, HTTPStatusError, ET.ParseError) as e:
+                # The remembered feed went away; discover again on the next run
+                print(f"BC XML feed {xml_url} failed: {e}")
+                self.endpoints.invalidate(self.feed_key)
+
+        # Fallback to HTML scraping
+        async for bill in self.scrape_bills_html():
+            yield bill
+
+    @property
+    def feed_key(self):
+        """Endpoint cache key for this scraper's site, so a stub or mirror never shadows the real one"""
+        return f"{FEED_KEY}:{self.base_url}"
+
+    async def discover_xml_feed(self):
+        """Probe the candidate XML feeds concurrently; the first to answer with XML wins
+
+        The winner is remembered in the endpoint cache so later runs skip
+        discovery until the entry expires. The absence of a feed is only
+        remembered when every candidate definitely isn't one (a 404 or a
+        non-XML answer); after errors or timeouts the next run probes again.
+        """
         xml_urls = [
             f"{self.base_url}.xml",
-            f"{self.base_url}/feed.xml", 
+            f"{self.base_url}/feed.xml",
             f"{self.progress_url}.xml"
         ]
 
-        for xml_url in xml_urls:
+        async def probe(url):
+            """(url, True) for a feed, (url, False) for a definite miss, (url, None) if unsure"""
             try:
-                response = requests.get(xml_url)
-                if response.status_code == 200:
-                    root = ET.fromstring(response.content)
-
-                    for bill in root.findall('.//bill'):
-                        bills.append({
-                            'province': 'British Columbia',
-                            'bill_number': bill.find('number').text if bill.find('number') is not None else '',
-                            'title': bill.find('title').text if bill.find('title') is not None else '',
-                            'status': bill.find('status').text if bill.find('status') is not None else '',
-                            'member': bill.find('member').text if bill.find('member') is not None else '',
-                            'scraped_date': datetime.now().isoformat()
-                        })
-                    return bills
-            except:
-                continue
+                response = await self.fetcher.probe(url, timeout=self.probe_timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return url, None
+            if response.status_code == 200:
+                return url, 'xml' in response.headers.get('Content-Type', '')
+            return url, False if response.status_code in NOT_FOUND else None
 
-        # Fallback to HTML scraping
-        return self.scrape_bills_html()
+        winner = None
+        definite_misses = 0
+        tasks = [asyncio.create_task(probe(url)) for url in xml_urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                url, found = await next_done
+                if found:
+                    winner = url
+                    break
+                if found is False:
+                    definite_misses += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if winner is not None:
+            self.endpoints.put(self.feed_key, winner)
+            return winner
+        if definite_misses == len(xml_urls):
+            self.endpoints.put(self.feed_key, NO_ENDPOINT)
+        return NO_ENDPOINT
+
+    async def stream_xml_feed(self, xml_url):
+        """Parse the XML feed as it downloads, yielding each bill once its element closes"""
+        parser = ET.XMLPullParser(events=('start', 'end'))
+        open_elements = []
+        scraped_date = datetime.now().isoformat()
+
+        async for chunk in self.fetcher.stream(xml_url):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == 'start':
+                    open_elements.append(element)
+                    continue
+
+                open_elements.pop()
+                if element.tag == 'bill':
+                    yield parse_feed_bill(element, scraped_date)
+                    # Drop the finished bill so memory stays flat over the feed
+                    if open_elements:
+                        open_elements[-1].remove(element)
+        parser.close()
 
-    def scrape_bills_html(self):
+    async def scrape_bills_html(self):
         """Fallback HTML scraping for BC bills"""
-        response = requests.get(self.base_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        bills = []
-
-        # Look for bills table
-        table = soup.find('table', class_='bills') or soup.find('table')
-        if table:
-            rows = table.find_all('tr')[1:]  # Skip header
-
-            for row in rows:
-                cells = row.find_all('td')
-                if len(cells) >= 3:
-                    bills.append({
-                        'province': 'British Columbia',
-                        'bill_number': cells[0].text.strip(),
-                        'title': cells[1].text.strip(),
-                        'member': cells[2].text.strip() if len(cells) > 2 else '',
-                        'status': cells[3].text.strip() if len(cells) > 3 else '',
-                        'scraped_date': datetime.now().isoformat()
-                    })
-
-        return bills
+        async for bill in self.scrape_table(self.base_url):
+            yield bill
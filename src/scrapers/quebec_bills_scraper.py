@@ -1,67 +1,114 @@
 
 # Quebec National Assembly Bills Scraper
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import asyncio
+from .specs import QUEBEC
+from .table import TableBillsScraper
+from ..utils.detail_stage import parse_status_page
 
-class QuebecBillsScraper:
-    def __init__(self):
-        self.base_url_en = "https://www.assnat.qc.ca/en/travaux-parlementaires/projets-loi"
-        self.base_url_fr = "https://www.assnat.qc.ca/fr/travaux-parlementaires/projets-loi"
 
-    def scrape_current_bills(self, language='en'):
-        """Scrape Quebec bills in English or French"""
+def bilingual_record(english, french):
+    """One record for a bill from its English and/or French listing stub
+
+    The stub (the English one when there are both) becomes the record.
+    """
+    bill = english or french
+    if english and french:
+        bill['language'] = 'en,fr'
+    bill['title_en'] = english['title'] if english else ''
+    bill['title_fr'] = french['title'] if french else ''
+    bill['bill_url_fr'] = french['bill_url'] if french else ''
+    return bill
+
+
+def merge_languages(english, french):
+    """Join the English and French listing stubs of each bill into one bilingual record
+
+    The French stubs are indexed by (session, bill number) and each English
+    stub takes its counterpart from the index, so the merge is linear in the
+    number of bills. Bills listed in one language only, or without a number
+    to join on, come through on their own.
+    """
+    index = {}
+    unmatched = []
+    for bill in french:
+        key = (bill.get('session', ''), bill['bill_number'])
+        if bill['bill_number'] and key not in index:
+            index[key] = bill
+        else:
+            unmatched.append(bill)
+
+    for bill in english:
+        counterpart = index.pop((bill.get('session', ''), bill['bill_number']), None) if bill['bill_number'] else None
+        yield bilingual_record(bill, counterpart)
+    for bill in list(index.values()) + unmatched:
+        yield bilingual_record(None, bill)
+
+
+class QuebecBillsScraper(TableBillsScraper):
+    """Quebec bills from the English and French listings (specs.QUEBEC), completed from detail pages"""
+
+    spec = QUEBEC
+
+    async def scrape_current_bills(self, language=None):
+        """Scrape Quebec bills, one bilingual record per bill unless a single ``language`` is asked for"""
+        async for bill in self.complete_stubs(self.scrape_listing_stubs(language)):
+            yield bill
+
+    async def scrape_both_languages(self):
+        """Scrape the English and French listings and yield one bilingual record per bill
+
+        Records carry title_en and title_fr. The status comes from a single
+        detail page per bill, the English one when the bill is listed in
+        English, instead of one page per language.
+        """
+        async for bill in self.scrape_current_bills():
+            yield bill
+
+    async def complete_stubs(self, stubs):
+        """Yield stubs that need no detail page at once, and the rest as their detail pages arrive"""
+        # Phase 1: collect the stubs without touching detail pages
+        pending = {}
+        async for bill, detail_url in stubs:
+            if detail_url:
+                pending.setdefault(detail_url, []).append(bill)
+            else:
+                yield bill
+
+        # Phase 2: fetch the remaining detail pages concurrently, yielding each bill as its page arrives
+        async for bill_url, details in self.details.fetch_each(pending, parse_status_page):
+            for bill in pending.pop(bill_url):
+                self.apply_details(bill, details)
+                yield bill
+
+    async def scrape_listing_stubs(self, language=None):
+        """Yield listing stubs with the detail page each still needs, merged across languages by default
+
+        The status is only on the detail page, so every bill's page is
+        revalidated on every run; the HTTP cache makes an unchanged page a
+        304 with its parsed details reused.
+        """
+        bills = self.scrape_listing(language) if language else self.bilingual_listing()
+        async for bill in bills:
+            yield bill, bill['bill_url'] or None
+
+    async def bilingual_listing(self):
+        """Read the English and French listings together and join them into bilingual stubs"""
+        english, french = await asyncio.gather(
+            self._collect(self.scrape_listing('en')),
+            self._collect(self.scrape_listing('fr'))
+        )
+        for bill in merge_languages(english, french):
+            yield bill
+
+    def apply_details(self, bill, details):
+        """Take the status from the bill's detail page"""
+        bill['status'] = details.get('status', '')
+
+    async def scrape_listing(self, language='en'):
+        """Parse the bills listing into stubs that still need their detail page"""
         base_url = self.base_url_en if language == 'en' else self.base_url_fr
-        bills = []
-
-        response = requests.get(base_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Look for bills list or table
-        bills_container = soup.find('div', class_='bills-list') or soup.find('table')
-
-        if bills_container:
-            bill_items = bills_container.find_all('tr') or bills_container.find_all('div', class_='bill-item')
-
-            for item in bill_items:
-                try:
-                    # Extract bill information based on structure
-                    bill_link = item.find('a')
-                    if bill_link:
-                        bill_number = self.extract_bill_number(bill_link.text)
-                        title = bill_link.text.strip()
-
-                        # Get bill details page
-                        bill_url = urljoin(base_url, bill_link.get('href'))
-                        details = self.get_bill_details(bill_url)
-
-                        bills.append({
-                            'province': 'Quebec',
-                            'language': language,
-                            'bill_number': bill_number,
-                            'title': title,
-                            'bill_url': bill_url,
-                            'status': details.get('status', ''),
-                            'scraped_date': datetime.now().isoformat()
-                        })
-
-                except Exception as e:
-                    print(f"Error parsing Quebec bill: {e}")
-                    continue
-
-        return bills
-
-    def extract_bill_number(self, text):
-        """Extract bill number from text"""
-        import re
-        match = re.search(r'Bill (\d+)|Projet de loi (\d+)', text, re.IGNORECASE)
-        return match.group(1) or match.group(2) if match else ''
-
-    def scrape_both_languages(self):
-        """Scrape bills in both English and French"""
-        english_bills = self.scrape_current_bills('en')
-        french_bills = self.scrape_current_bills('fr')
-
-        # Merge and deduplicate bills
-        all_bills = english_bills + french_bills
-        return self.deduplicate_bills(all_bills)
+        async for bill in self.scrape_table(base_url, language):
+            yield bill
+
+    async def _collect(self, bills):
+        return [bill async for bill in bills]
@@ -0,0 +1,60 @@
+# Province scraper registry: scraper modules are imported only when a province is used
+from collections.abc import Mapping
+from importlib import import_module
+
+# Province key -> (module in this package, scraper class)
+SCRAPERS = {
+    'ontario': ('ontario_bills_scraper', 'OntarioBillsScraper'),
+    'bc': ('bc_bills_scraper', 'BCBillsScraper'),
+    'alberta': ('alberta_bills_scraper', 'AlbertaBillsScraper'),
+    'quebec': ('quebec_bills_scraper', 'QuebecBillsScraper'),
+    'saskatchewan': ('saskatchewan_bills_scraper', 'SaskatchewanBillsScraper'),
+    'manitoba': ('manitoba_bills_scraper', 'ManitobaBillsScraper'),
+}
+PROVINCES = tuple(SCRAPERS)
+
+
+def check_province(province):
+    if province not in SCRAPERS:
+        raise KeyError(f"Unknown province {province!r}; choose from {', '.join(PROVINCES)}")
+
+
+def scraper_class(province):
+    """Import the scraper module for a province and return its scraper class"""
+    check_province(province)
+    module, name = SCRAPERS[province]
+    return getattr(import_module(f"{__package__}.{module}"), name)
+
+
+class ScraperRegistry(Mapping):
+    """The province scrapers of a run, keyed by province, each built on first access
+
+    Iterating only lists the selected provinces; a scraper's module is
+    imported and the scraper built when it is looked up. ``configure`` is
+    called with every scraper as it is built.
+    """
+
+    def __init__(self, fetcher, provinces=None, configure=None):
+        self.fetcher = fetcher
+        self.provinces = tuple(provinces) if provinces else PROVINCES
+        for province in self.provinces:
+            check_province(province)
+        self.configure = configure
+        self._built = {}
+
+    def __getitem__(self, province):
+        if province not in self.provinces:
+            raise KeyError(province)
+        scraper = self._built.get(province)
+        if scraper is None:
+            scraper = scraper_class(province)(self.fetcher)
+            if self.configure is not None:
+                self.configure(scraper)
+            self._built[province] = scraper
+        return scraper
+
+    def __iter__(self):
+        return iter(self.provinces)
+
+    def __len__(self):
+        return len(self.provinces)
@@ -1,95 +1,90 @@
 # Saskatchewan Legislature Bills Scraper
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-from datetime import datetime
+import asyncio
 import re
+from .specs import SASKATCHEWAN
+from .table import TableBillsScraper
+from ..utils.pdf_pages import PdfPageCache
 
-class SaskatchewanBillsScraper:
-    def __init__(self):
-        self.base_url = "https://www.legassembly.sk.ca/legislative-business/bills/"
-        self.progress_url = "https://www.legassembly.sk.ca/media/obro0uvn/progress-of-bills.pdf"
-        self.session = requests.Session()
+# Progress-of-bills PDF: one row per bill, starting with its number, with a date per stage reached
+PROGRESS_ROW = re.compile(r'^\s*(\d{1,3})\s+(.*\S)')
+PROGRESS_DATE = re.compile(
+    r'\b(?:[A-Z][a-z]{2}\.? \d{1,2},? \d{4}|\d{4}-\d{2}-\d{2}|\d{1,2}[-/ ][A-Z][a-z]{2}[-/ ]\d{2,4})\b'
+)
+PROGRESS_STAGES = ('First Reading', 'Second Reading', 'Committee', 'Third Reading', 'Royal Assent')
+COMMITTEE = re.compile(
+    r'Committee of the Whole|Crown and Central Agencies|Economy|Human Services|'
+    r'Intergovernmental Affairs and Justice|House Services|Private Bills'
+)
 
-    def scrape_current_bills(self):
-        """Scrape current session bills from Saskatchewan Legislature"""
-        bills = []
 
-        try:
-            response = self.session.get(self.base_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
+def parse_progress_page(page_text):
+    """Parse the text of one progress-of-bills PDF page, yielding the stages each bill reached"""
+    for line in page_text.splitlines():
+        match = PROGRESS_ROW.match(line)
+        if not match:
+            continue
+        rest = match.group(2)
+        dates = PROGRESS_DATE.findall(rest)
+        if not dates:
+            # Title continuation lines and headers carry no stage dates
+            continue
 
-            # Look for bills table or list
-            bills_container = soup.find('div', class_='bills-list') or soup.find('table') or soup.find('section', class_='bills')
+        # Committee names follow the first date, so titles like "The Economy Act" don't match
+        committee = COMMITTEE.search(rest, rest.index(dates[0]))
+        yield {
+            'bill_number': match.group(1),
+            'readings': [
+                {'stage': stage, 'date': date} for stage, date in zip(PROGRESS_STAGES, dates)
+            ],
+            'committee': committee.group(0) if committee else '',
+        }
 
-            if bills_container:
-                bill_items = bills_container.find_all('tr') or bills_container.find_all('div', class_='bill-item')
 
-                for item in bill_items:
-                    try:
-                        # Extract bill information
-                        bill_link = item.find('a')
-                        if bill_link:
-                            bill_number = self.extract_bill_number(bill_link.text)
-                            title = bill_link.text.strip()
-                            bill_url = bill_link.get('href')
-                            
-                            # Get additional details if available
-                            status_cell = item.find('td', class_='status') or item.find('span', class_='status')
-                            sponsor_cell = item.find('td', class_='sponsor') or item.find('span', class_='sponsor')
-                            
-                            bills.append({
-                                'province': 'Saskatchewan',
-                                'bill_number': bill_number,
-                                'title': title,
-                                'bill_url': bill_url if bill_url else '',
-                                'status': status_cell.text.strip() if status_cell else '',
-                                'sponsor': sponsor_cell.text.strip() if sponsor_cell else '',
-                                'scraped_date': datetime.now().isoformat(),
-                                'source_url': self.base_url
-                            })
+def join_progress(bill, progress):
+    """Copy the PDF's stage data onto a listing row"""
+    bill['readings'] = progress['readings']
+    bill['committee'] = progress['committee']
+    if not bill['status'] and progress['readings']:
+        bill['status'] = progress['readings'][-1]['stage']
 
-                    except Exception as e:
-                        print(f"Error parsing Saskatchewan bill: {e}")
-                        continue
 
-        except Exception as e:
-            print(f"Error scraping Saskatchewan bills: {e}")
+class SaskatchewanBillsScraper(TableBillsScraper):
+    """Saskatchewan bills from the listing (specs.SASKATCHEWAN), with stages from the progress PDF"""
 
-        return bills
+    spec = SASKATCHEWAN
 
-    def extract_bill_number(self, text):
-        """Extract bill number from text"""
-        match = re.search(r'Bill (\d+)|(\d+)', text, re.IGNORECASE)
-        return match.group(1) or match.group(2) if match else ''
+    def __init__(self, fetcher=None, detail_concurrency=8, detail_timeout=20, progress_pages=None):
+        super().__init__(fetcher, detail_concurrency=detail_concurrency, detail_timeout=detail_timeout)
+        self.progress_pages = progress_pages or PdfPageCache('data/pdf_pages/saskatchewan_progress.json')
 
-    def get_bill_details(self, bill_url):
-        """Get detailed information for a specific bill"""
-        if not bill_url:
-            return {}
-            
+    async def scrape_current_bills(self):
+        """Scrape current session bills, joined with their stages from the progress PDF"""
+        # The PDF replaces a detail request per bill, so fetch it alongside the listing
+        progress_task = asyncio.create_task(self.get_progress())
         try:
-            response = self.session.get(bill_url)
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            details = {
-                'readings': [],
-                'committee': '',
-                'sponsor': '',
-                'amendments': []
-            }
+            bills = [bill async for bill in self.scrape_table(self.base_url)]
+        except BaseException:
+            progress_task.cancel()
+            raise
 
-            # Look for reading stages
-            readings_section = soup.find('section', class_='readings') or soup.find('div', class_='bill-stages')
-            if readings_section:
-                for reading in readings_section.find_all('div', class_='reading'):
-                    details['readings'].append({
-                        'stage': reading.find('span', class_='stage').text if reading.find('span', class_='stage') else '',
-                        'date': reading.find('span', class_='date').text if reading.find('span', class_='date') else ''
-                    })
-
-            return details
+        progress = await progress_task
+        for bill in bills:
+            if bill['bill_number'] in progress:
+                join_progress(bill, progress[bill['bill_number']])
+            yield bill
 
+    async def get_progress(self):
+        """Stage data for every bill in the progress-of-bills PDF, keyed by bill number"""
+        # An unchanged PDF is answered with a 304 and its stored parse result
+        try:
+            return await self.fetcher.get_parsed(self.progress_url, self.parse_progress_pdf)
         except Exception as e:
-            print(f"Error getting bill details: {e}")
+            print(f"Error reading Saskatchewan progress PDF: {e}")
             return {}
+
+    def parse_progress_pdf(self, content):
+        """Extract every page's rows, reusing pages unchanged since the last version"""
+        if not content.startswith(b'%PDF'):
+            raise ValueError("progress-of-bills response is not a PDF")
+        rows = self.progress_pages.extract(content, parse_progress_page)
+        return {row['bill_number']: row for row in rows}
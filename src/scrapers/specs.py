@@ -0,0 +1,135 @@
+# Declarative listing specs for the province scrapers
+#
+# A province whose bills are a table or list on one page needs nothing but a
+# spec here; TableBillsScraper(fetcher, spec=...) scrapes it.
+from ..utils.detail_stage import parse_readings_page, parse_status_page
+from ..utils.parsing import has_class
+from .table import (
+    BillNumber, Cell, CellLink, Classed, Const, LinkHref, LinkText, Now, Param, ProvinceSpec, Section, register
+)
+
+# Listings of linked rows, each link reading "Bill 12 - Title" (Quebec, Saskatchewan, Manitoba)
+BILLS_LIST = f"(//div[{has_class('bills-list')}])[1]"
+FIRST_TABLE = "(//table)[1]"
+BILLS_SECTION = f"(//section[{has_class('bills')}])[1]"
+LINKED_ROWS = (".//tr", f".//div[{has_class('bill-item')}]")
+LINKED_FIELDS = (
+    ('bill_number', BillNumber()),
+    ('title', LinkText()),
+    ('bill_url', LinkHref()),
+    ('status', Classed('status')),
+    ('sponsor', Classed('sponsor')),
+    ('scraped_date', Now()),
+    ('source_url', Param('url')),
+)
+
+ONTARIO = register(ProvinceSpec(
+    'ontario', 'Ontario',
+    urls={
+        'base_url': "https://www.ola.org/en/legislative-business/bills",
+        'data_portal_url': "https://data.ontario.ca/",
+    },
+    rows=(f"//tr[{has_class('bill-row')}]", "//table//tbody//tr"),
+    min_cells=1,
+    fields=(
+        ('bill_number', Cell(0, 'bill-number')),
+        ('title', Cell(1, 'title')),
+        ('status', Cell(2, 'status')),
+        ('scraped_date', Now()),
+        ('source_url', Param('url')),
+    ),
+    detail=parse_readings_page,
+))
+
+BC = register(ProvinceSpec(
+    'bc', 'British Columbia',
+    urls={
+        'base_url': "https://www.leg.bc.ca/parliamentary-business/bills",
+        'progress_url': "https://www.leg.bc.ca/parliamentary-business/bills-and-legislation",
+    },
+    containers=(f"(//table[{has_class('bills')}])[1]", FIRST_TABLE),
+    rows=(".//tr",),
+    skip_rows=1,
+    min_cells=3,
+    fields=(
+        ('bill_number', Cell(0)),
+        ('title', Cell(1)),
+        ('member', Cell(2)),
+        ('status', Cell(3)),
+        ('scraped_date', Now()),
+    ),
+))
+
+ALBERTA = register(ProvinceSpec(
+    'alberta', 'Alberta',
+    urls={
+        'base_url': "https://www.assembly.ab.ca/assembly-business/bills",
+        'bills_db_url': "https://www.assembly.ab.ca/assembly-business/bills/bills-by-legislature",
+    },
+    listing='bills_db_url',
+    # One table of bills after each session heading
+    sections=(f"//div[{has_class('legislature-session')}]", "//h3"),
+    section_table="following::table[1]",
+    rows=(".//tr",),
+    skip_rows=1,
+    min_cells=4,
+    fields=(
+        ('session', Section()),
+        ('bill_number', Cell(0)),
+        ('title', Cell(1)),
+        ('sponsor', Cell(2)),
+        ('status', Cell(3)),
+        ('bill_url', CellLink(0)),
+        ('scraped_date', Now()),
+    ),
+))
+
+QUEBEC = register(ProvinceSpec(
+    'quebec', 'Quebec',
+    urls={
+        'base_url_en': "https://www.assnat.qc.ca/en/travaux-parlementaires/projets-loi",
+        'base_url_fr': "https://www.assnat.qc.ca/fr/travaux-parlementaires/projets-loi",
+    },
+    listing='base_url_en',
+    containers=(BILLS_LIST, FIRST_TABLE),
+    rows=LINKED_ROWS,
+    require_link=True,
+    bill_number=r'Bill (?:No\.?\s*)?(\d+)|Projet de loi (?:n[°o]\.?\s*)?(\d+)',
+    fields=(
+        ('language', Param('language')),
+        ('bill_number', BillNumber()),
+        ('title', LinkText()),
+        ('bill_url', LinkHref(join=True)),
+        # Filled in from the detail page
+        ('status', Const('')),
+        ('scraped_date', Now()),
+    ),
+    detail=parse_status_page,
+))
+
+SASKATCHEWAN = register(ProvinceSpec(
+    'saskatchewan', 'Saskatchewan',
+    urls={
+        'base_url': "https://www.legassembly.sk.ca/legislative-business/bills/",
+        'progress_url': "https://www.legassembly.sk.ca/media/obro0uvn/progress-of-bills.pdf",
+    },
+    containers=(BILLS_LIST, FIRST_TABLE, BILLS_SECTION),
+    rows=LINKED_ROWS,
+    require_link=True,
+    spans=True,
+    bill_number=r'Bill (\d+)|(\d+)',
+    fields=LINKED_FIELDS,
+    detail=parse_readings_page,
+))
+
+MANITOBA = register(ProvinceSpec(
+    'manitoba', 'Manitoba',
+    urls={'base_url': "https://www.gov.mb.ca/legislature/business/bills.html"},
+    containers=(BILLS_LIST, FIRST_TABLE, BILLS_SECTION),
+    rows=LINKED_ROWS,
+    require_link=True,
+    spans=True,
+    bill_number=r'Bill (\d+)|(\d+)',
+    fields=LINKED_FIELDS,
+    detail=parse_readings_page,
+))
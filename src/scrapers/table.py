@@ -0,0 +1,292 @@
+# Generic table-extraction engine driven by declarative province specs
+import re
+from datetime import datetime
+from urllib.parse import urljoin
+
+from .base import BaseBillsScraper
+from ..utils.detail_stage import DetailStage
+from ..utils.parsing import by_class, first, first_match, parse_html, text, xpath
+from ..utils.records import BillRecord
+
+CELLS = xpath(".//td")
+SPANS = xpath(".//span")
+LINK = xpath("(.//a)[1]")
+
+
+class Row:
+    """The parts of one listing row that a spec's fields read, each found once"""
+
+    __slots__ = ('cells', 'classed', 'link', 'section', 'params', 'spec', 'now')
+
+
+# Field extractors: each reads one value out of a Row. ``needs`` says which
+# parts of the row the engine has to find for it.
+
+class Const:
+    needs = ()
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, row):
+        return self.value
+
+
+class Param:
+    """A value passed to the parse call, e.g. the listing URL or the language"""
+    needs = ()
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, row):
+        return row.params.get(self.name, '')
+
+
+class Now:
+    """Scrape timestamp, taken once per listing page and shared by its rows"""
+    needs = ()
+
+    def __call__(self, row):
+        return row.now
+
+
+class Section:
+    """Heading text of the section the row's table belongs to"""
+    needs = ()
+
+    def __call__(self, row):
+        return row.section
+
+
+class Cell:
+    """Text of the cell with class ``class_name``, falling back to the cell at ``index``"""
+
+    def __init__(self, index, class_name=None):
+        self.index = index
+        self.class_name = class_name
+        self.needs = ('cells', 'classed') if class_name else ('cells',)
+
+    def __call__(self, row):
+        cell = row.classed.get(self.class_name) if self.class_name else None
+        if cell is None and self.index < len(row.cells):
+            cell = row.cells[self.index]
+        return text(cell)
+
+
+class Classed:
+    """Text of the first cell (or span, for specs with ``spans``) carrying a class"""
+    needs = ('cells', 'classed')
+
+    def __init__(self, class_name):
+        self.class_name = class_name
+
+    def __call__(self, row):
+        return text(row.classed.get(self.class_name))
+
+
+class CellLink:
+    """href of the first link inside the cell at ``index``"""
+    needs = ('cells',)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __call__(self, row):
+        if self.index >= len(row.cells):
+            return ''
+        links = LINK(row.cells[self.index])
+        return (links[0].get('href') or '') if links else ''
+
+
+class LinkText:
+    """Text of the row's first link"""
+    needs = ('link',)
+
+    def __call__(self, row):
+        return row.link.text_content().strip() if row.link is not None else ''
+
+
+class LinkHref:
+    """href of the row's first link, resolved against the listing URL with ``join``"""
+    needs = ('link',)
+
+    def __init__(self, join=False):
+        self.join = join
+
+    def __call__(self, row):
+        href = row.link.get('href') if row.link is not None else None
+        if self.join:
+            return urljoin(row.params.get('url', ''), href)
+        return href or ''
+
+
+class BillNumber:
+    """Bill number matched by the spec's ``bill_number`` pattern in the row's first link"""
+    needs = ('link',)
+
+    def __call__(self, row):
+        return row.spec.extract_bill_number(row.link.text_content()) if row.link is not None else ''
+
+
+class ProvinceSpec:
+    """Everything province-specific about scraping a legislature's bills listing
+
+    ``urls`` become attributes of the scraper (so ``base_url`` stays
+    overridable per instance) and ``listing`` names the one holding the
+    listing page. Bills are found by narrowing the page with the first
+    matching ``containers`` selector, or by walking ``sections`` and the table
+    following each, then taking rows with the first matching ``rows``
+    selector. ``fields`` maps record keys to extractors, after the province.
+    Every selector and pattern is compiled when the spec is built, which for
+    the specs in specs.py is once at import time.
+    """
+
+    def __init__(self, key, province, urls, fields, rows, listing='base_url', containers=(), sections=(),
+                 section_table=None, skip_rows=0, min_cells=0, require_link=False, spans=False,
+                 bill_number=r'(\d+)', detail=None):
+        self.key = key
+        self.province = province
+        self.urls = urls
+        self.listing = listing
+        self.fields = tuple(fields)
+        self.rows = tuple(xpath(selector) for selector in rows)
+        self.containers = tuple(xpath(selector) for selector in containers)
+        self.sections = tuple(xpath(selector) for selector in sections)
+        self.section_table = xpath(section_table) if section_table else None
+        self.skip_rows = skip_rows
+        self.min_cells = min_cells
+        self.require_link = require_link
+        self.spans = spans
+        self.bill_number = re.compile(bill_number, re.IGNORECASE)
+        # Module-level parser for this province's detail pages, or None
+        self.detail = detail
+
+        needs = {need for _, field in self.fields for need in field.needs}
+        self.needs_classed = 'classed' in needs
+        self.needs_cells = 'cells' in needs or self.needs_classed or min_cells > 0
+        self.needs_link = 'link' in needs or require_link
+
+    def extract_bill_number(self, value):
+        """First group of the bill-number pattern that matched, or ''"""
+        match = self.bill_number.search(value)
+        if not match:
+            return ''
+        return next((group for group in match.groups() if group), '')
+
+    def _scopes(self, root):
+        """(section name, element) pairs holding the listing's rows"""
+        if self.sections:
+            for section in first_match(root, *self.sections):
+                tables = self.section_table(section)
+                if tables:
+                    yield text(section), tables[0]
+        elif self.containers:
+            container = first(root, *self.containers)
+            if container is not None:
+                yield '', container
+        else:
+            yield '', root
+
+    def parse(self, content, **params):
+        """Yield one BillRecord per listing row"""
+        now = datetime.now().isoformat()
+        for section, scope in self._scopes(parse_html(content)):
+            for element in first_match(scope, *self.rows)[self.skip_rows:]:
+                try:
+                    row = Row()
+                    row.spec = self
+                    row.params = params
+                    row.section = section
+                    row.now = now
+                    if self.needs_cells:
+                        row.cells = CELLS(element)
+                        if len(row.cells) < self.min_cells:
+                            continue
+                    if self.needs_link:
+                        links = LINK(element)
+                        if self.require_link and not links:
+                            continue
+                        row.link = links[0] if links else None
+                    if self.needs_classed:
+                        row.classed = by_class(row.cells + SPANS(element) if self.spans else row.cells)
+
+                    bill = BillRecord(province=self.province, **{name: field(row) for name, field in self.fields})
+                except Exception as e:
+                    print(f"Error parsing {self.province} bill: {e}")
+                    continue
+
+                yield bill
+
+
+# Specs by key, so parse_listing (which has to be picklable for the parse pool) can find them
+SPECS = {}
+
+
+def register(spec):
+    SPECS[spec.key] = spec
+    return spec
+
+
+def parse_listing(content, key, url='', language=''):
+    """Run the table engine of the registered spec ``key`` over a listing page"""
+    if key not in SPECS:
+        # A spawned parse-pool worker starts with an empty registry
+        from . import specs  # noqa: F401
+    return SPECS[key].parse(content, url=url, language=language)
+
+
+class TableBillsScraper(BaseBillsScraper):
+    """Scraper for a province described by a ProvinceSpec
+
+    Subclasses set ``spec`` and add whatever else their legislature offers
+    (feeds, PDFs, history); a province with nothing more than a listing page
+    needs no subclass: ``TableBillsScraper(fetcher, spec=SOME_SPEC)``.
+    """
+
+    spec = None
+
+    def __init__(self, fetcher=None, spec=None, detail_concurrency=8, detail_timeout=20):
+        super().__init__(fetcher)
+        self.spec = register(spec or self.spec)
+        self.province = self.spec.province
+        for name, url in self.spec.urls.items():
+            setattr(self, name, url)
+        self.details = DetailStage(self.fetcher, detail_concurrency, detail_timeout)
+
+    async def scrape_current_bills(self):
+        """Scrape the current session's bills from the listing page"""
+        async for bill in self.scrape_table(getattr(self, self.spec.listing)):
+            yield bill
+
+    async def scrape_table(self, url, language=''):
+        """Fetch a listing page and run the spec's table engine over it
+
+        An unchanged page (a 304) reuses the rows parsed from it before.
+        Each row comes out as a new record stamped with this scrape's time,
+        so the stored rows are never changed by what later stages add.
+        """
+        # An error page raises rather than looking like a session without bills
+        rows = await self.fetcher.get_parsed(url, parse_listing, self.spec.key, url, language)
+        now = datetime.now().isoformat()
+        for row in rows:
+            bill = BillRecord(row)
+            if 'scraped_date' in bill:
+                bill['scraped_date'] = now
+            yield bill
+
+    async def get_bill_details(self, bill_url):
+        """Get detailed information for a specific bill"""
+        if self.spec.detail is None:
+            return {}
+        return await self.details.fetch(bill_url, self.spec.detail)
+
+    async def get_bills_details(self, bill_urls):
+        """Get detailed information for many bills concurrently, keyed by URL"""
+        if self.spec.detail is None:
+            return {}
+        return await self.details.fetch_all(bill_urls, self.spec.detail)
+
+    def extract_bill_number(self, value):
+        """Extract bill number from text"""
+        return self.spec.extract_bill_number(value)
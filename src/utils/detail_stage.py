@@ -0,0 +1,103 @@
+# Concurrent bill-detail fetch stage shared by the province scrapers
+import asyncio
+
+from .parsing import first, has_class, parse_html, text, xpath
+
+# Selectors are compiled once at import time
+READINGS_SECTIONS = (
+    xpath(f"(//section[{has_class('readings')}])[1]"),
+    xpath(f"(//div[{has_class('bill-stages')}])[1]"),
+)
+READINGS = xpath(f".//div[{has_class('reading')}]")
+SPANS = xpath(".//span")
+STATUS = (
+    xpath(f"(//*[{has_class('status')}])[1]"),
+    xpath(f"(//*[{has_class('etape')}])[1]"),
+)
+
+
+def parse_readings_page(content):
+    """Parse reading stages from a bill detail page (Ontario, Manitoba, Saskatchewan layout)"""
+    details = {
+        'readings': [],
+        'committee': '',
+        'sponsor': '',
+        'amendments': []
+    }
+
+    # Look for reading stages
+    readings_section = first(parse_html(content), *READINGS_SECTIONS)
+    if readings_section is not None:
+        for reading in READINGS(readings_section):
+            # One pass over the spans instead of a find() per field
+            stage = date = ''
+            for span in SPANS(reading):
+                classes = (span.get('class') or '').split()
+                if not stage and 'stage' in classes:
+                    stage = span.text_content()
+                elif not date and 'date' in classes:
+                    date = span.text_content()
+            details['readings'].append({'stage': stage, 'date': date})
+
+    return details
+
+
+def parse_status_page(content):
+    """Parse the status from a bill detail page (Quebec layout)"""
+    return {'status': text(first(parse_html(content), *STATUS))}
+
+
+class DetailStage:
+    """Fetch many bill detail pages at once under a concurrency limit
+
+    Each page gets its own timeout and a failure only loses that bill's
+    details: failed pages come back as an empty dict.
+    """
+
+    def __init__(self, fetcher, concurrency=8, timeout=20):
+        self.fetcher = fetcher
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self):
+        """Create the semaphore per event loop so the stage survives repeated asyncio.run calls"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def fetch(self, bill_url, parse):
+        """Fetch and parse a single detail page"""
+        if not bill_url:
+            return {}
+
+        async with self._get_semaphore():
+            try:
+                return await self.fetcher.get_parsed(bill_url, parse, timeout=self.timeout)
+            except Exception as e:
+                print(f"Error getting bill details from {bill_url}: {e}")
+                return {}
+
+    async def _fetch_keyed(self, bill_url, parse):
+        return bill_url, await self.fetch(bill_url, parse)
+
+    async def fetch_each(self, bill_urls, parse):
+        """Yield (url, details) pairs in completion order as each detail page finishes"""
+        urls = list(dict.fromkeys(url for url in bill_urls if url))
+        tasks = [asyncio.ensure_future(self._fetch_keyed(url, parse)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop outstanding fetches if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_all(self, bill_urls, parse):
+        """Fetch and parse detail pages concurrently, returning details keyed by URL"""
+        urls = list(dict.fromkeys(url for url in bill_urls if url))
+        results = await asyncio.gather(*(self.fetch(url, parse) for url in urls))
+        return dict(zip(urls, results))
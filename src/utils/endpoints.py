@@ -0,0 +1,51 @@
+# Persisted endpoint-discovery cache
+import json
+import os
+import time
+
+# Stored when discovery found no working endpoint, so later runs skip the probing too
+NO_ENDPOINT = ''
+
+
+class EndpointCache:
+    """Remember which candidate URL answered for a data source, for a limited time
+
+    Entries expire after ``ttl`` seconds so a feed that appears (or moves) is
+    picked up again by a later discovery. With no ``path`` nothing is persisted.
+    """
+
+    def __init__(self, path='data/endpoints.json', ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as fh:
+                    self.entries = json.load(fh)
+            except ValueError:
+                self.entries = {}
+
+    def get(self, key):
+        """Return the remembered URL, NO_ENDPOINT, or None if unknown or expired"""
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry['discovered_at'] > self.ttl:
+            return None
+        return entry['url']
+
+    def put(self, key, url):
+        self.entries[key] = {'url': url, 'discovered_at': time.time()}
+        self._save()
+
+    def invalidate(self, key):
+        if self.entries.pop(key, None) is not None:
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.entries, fh)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,253 @@
+# Shared asynchronous HTTP fetch layer for the provincial scrapers
+import asyncio
+import inspect
+import json
+import time
+
+import aiohttp
+from multidict import CIMultiDict
+
+from .metrics import RunMetrics
+from .rate_limit import THROTTLE_STATUSES, RateLimiter, parse_retry_after
+
+
+class HTTPStatusError(Exception):
+    """Raised by FetchResponse.raise_for_status for error responses"""
+
+    def __init__(self, status_code, url):
+        super().__init__(f"HTTP {status_code} for {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+class FetchResponse:
+    """Fully-read HTTP response exposing the attributes the scrapers used from requests"""
+
+    def __init__(self, url, status_code, content, headers, not_modified=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        # True when the server answered 304 and the body came from the cache
+        self.not_modified = not_modified
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise HTTPStatusError(self.status_code, self.url)
+
+
+class AsyncFetcher:
+    """aiohttp client shared by every province scraper
+
+    Connections are pooled per host by the underlying connector, and a global
+    semaphore caps the number of requests in flight across all provinces, so a
+    full run takes as long as the slowest legislature rather than the sum of all.
+    With an HttpCache attached, GETs are revalidated with conditional headers
+    and a 304 is served from disk. Every request is paced per host by a
+    RateLimiter, which also retries throttled and failed GETs with backoff.
+    With a ParsePool attached, get_parsed parses pages in worker processes. Latencies, bytes, statuses, retries and
+    cache revalidations are recorded in ``metrics``. ``rewrite`` maps each URL
+    to the one actually requested (the benchmarks use it to replay recorded
+    fixtures from a local server); responses still carry the original URL.
+    """
+
+    def __init__(self, max_concurrency=20, per_host_limit=4, timeout=30, headers=None, cache=None,
+                 limiter=None, parse_pool=None, metrics=None, rewrite=None):
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.headers = headers or {'User-Agent': 'ProvincialScrapy/1.0'}
+        self.cache = cache
+        self.limiter = limiter or RateLimiter(max_concurrency=per_host_limit)
+        self.parse_pool = parse_pool
+        self.metrics = metrics or RunMetrics()
+        self.rewrite = rewrite
+        self._session = None
+        self._semaphore = None
+
+    def _get_session(self):
+        """Create the client session lazily so it binds to the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.per_host_limit,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+                trace_configs=[self.metrics.trace_config()]
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _target(self, url):
+        return self.rewrite(url) if self.rewrite else url
+
+    async def _send(self, url, headers=None, timeout=None):
+        """GET through the host's rate limiter, retrying throttled and failed requests
+
+        Returns (status, headers, final_url, content) of the last attempt.
+        """
+        session = self._get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        host = self.limiter.host(url)
+        metrics = self.metrics
+        attempt = 0
+
+        while True:
+            attempt += 1
+            if attempt > 1:
+                metrics.inc('retries', host=host.host)
+            # Wait for the host before taking a global slot, so a throttled host can't starve the rest
+            started = await host.acquire()
+            try:
+                async with self._semaphore:
+                    sent = time.perf_counter()
+                    async with session.get(self._target(url), headers=headers, timeout=request_timeout) as response:
+                        status = response.status
+                        response_headers = CIMultiDict(response.headers)
+                        final_url = url if self.rewrite else str(response.url)
+                        content = await response.read()
+                    metrics.observe('fetch_seconds', time.perf_counter() - sent, host=host.host)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                host.release(started)
+                metrics.inc('requests', host=host.host, status='error')
+                delay = self.limiter.retry_delay(host, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                host.release(started)
+                raise
+
+            metrics.inc('requests', host=host.host, status=status)
+            metrics.inc('response_bytes', len(content), host=host.host)
+
+            retry_after = None
+            if status in THROTTLE_STATUSES:
+                retry_after = parse_retry_after(response_headers.get('Retry-After'))
+            host.release(started, status, retry_after)
+
+            delay = self.limiter.retry_delay(host, attempt, status, retry_after) if status >= 400 else None
+            if delay is None:
+                return status, response_headers, final_url, content
+            await asyncio.sleep(delay)
+
+    async def get(self, url, timeout=None, headers=None):
+        """GET a URL and return the fully-read response"""
+        cached = self.cache.lookup(url) if self.cache is not None else None
+        if cached is not None:
+            headers = {**self.cache.conditional_headers(cached), **(headers or {})}
+
+        status, response_headers, final_url, content = await self._send(url, headers, timeout)
+
+        if status == 304 and cached is not None:
+            content = self.cache.revalidated(url)
+            if content is None:
+                # The cached body was lost; fetch it again without validators
+                return await self.get(url, timeout)
+            self.metrics.inc('cache_revalidated', host=self.limiter.host(url).host)
+            return FetchResponse(url, 200, content, response_headers, not_modified=True)
+
+        if self.cache is not None and status == 200:
+            self.cache.store(url, content, response_headers)
+        return FetchResponse(final_url, status, content, response_headers)
+
+    async def probe(self, url, timeout=None):
+        """Request a URL but read only the status and headers; the body is discarded
+
+        Probes are never retried, since callers use them to find out quickly
+        whether a URL answers at all.
+        """
+        session = self._get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        host = self.limiter.host(url)
+
+        started = await host.acquire()
+        status = None
+        try:
+            async with self._semaphore:
+                async with session.get(self._target(url), timeout=request_timeout) as response:
+                    status = response.status
+                    final_url = url if self.rewrite else str(response.url)
+                    return FetchResponse(final_url, status, b'', CIMultiDict(response.headers))
+        finally:
+            host.release(started, status)
+            self.metrics.inc('requests', host=host.host, status=status or 'error')
+
+    async def stream(self, url, chunk_size=64 * 1024, timeout=None):
+        """Yield the body of a URL in chunks without holding it all in memory"""
+        session = self._get_session()
+        request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+        host = self.limiter.host(url)
+
+        started = await host.acquire()
+        status = None
+        received = 0
+        try:
+            async with self._semaphore:
+                async with session.get(self._target(url), timeout=request_timeout) as response:
+                    status = response.status
+                    if status >= 400:
+                        raise HTTPStatusError(status, url)
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        received += len(chunk)
+                        yield chunk
+        finally:
+            host.release(started, status)
+            self.metrics.inc('requests', host=host.host, status=status or 'error')
+            self.metrics.inc('response_bytes', received, host=host.host)
+
+    async def get_parsed(self, url, parse, *args, timeout=None):
+        """GET a URL and parse it with ``parse(content, *args)``, reusing the stored result when unchanged
+
+        ``parse`` must return something JSON-serialisable (bill records
+        included) for the result to be cached; a generator is read into a
+        list. Error responses raise HTTPStatusError instead of being parsed.
+        """
+        response = await self.get(url, timeout=timeout)
+        response.raise_for_status()
+        name = f"{parse.__module__}.{parse.__qualname__}"
+        if args:
+            name += json.dumps(args)
+
+        if response.not_modified:
+            parsed = self.cache.load_derived(url, name)
+            if parsed is not None:
+                return parsed
+
+        with self.metrics.timer('parse_seconds', parser=parse.__name__):
+            if self.parse_pool is not None:
+                parsed = await self.parse_pool.run(parse, response.content, *args)
+            else:
+                # Listing parsers are generators, so the parse happens as they are consumed
+                parsed = parse(response.content, *args)
+                if inspect.isgenerator(parsed):
+                    parsed = list(parsed)
+        self.metrics.inc('pages_parsed', parser=parse.__name__)
+        if self.cache is not None and response.status_code == 200:
+            self.cache.store_derived(url, name, parsed)
+        return parsed
+
+    async def close(self):
+        """Close the underlying session and its connection pools"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
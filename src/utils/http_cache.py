@@ -0,0 +1,199 @@
+# On-disk HTTP response cache with ETag/Last-Modified revalidation
+import hashlib
+import json
+import os
+import time
+
+from .records import json_default
+
+
+class HttpCache:
+    """Store response bodies on disk and revalidate them with conditional requests
+
+    Each entry is a pair of files named after the SHA-256 of the URL: the raw
+    body and a JSON metadata file holding the validators, timestamps and any
+    parse results derived from that body. Entries not revalidated within
+    ``max_age`` are dropped, and the least recently used entries are evicted once the bodies
+    exceed ``max_bytes``.
+    """
+
+    def __init__(self, directory='data/http_cache', max_bytes=256 * 1024 * 1024, max_age=7 * 24 * 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._index = None
+        # Running total of the indexed bodies' sizes, so eviction never re-sums the index
+        self._bytes = 0
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + '.body', base + '.json'
+
+    def _load_index(self):
+        """Scan the cache directory once so eviction knows every entry's size"""
+        if self._index is None:
+            self._index = {}
+            self._bytes = 0
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(self.directory, name), encoding='utf-8') as fh:
+                        meta = json.load(fh)
+                    self._index[name[:-5]] = meta
+                    self._bytes += meta['size']
+                except (OSError, ValueError):
+                    continue
+        return self._index
+
+    def _write_meta(self, key, meta):
+        _, meta_path = self._paths(key)
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh, default=json_default)
+        os.replace(tmp_path, meta_path)
+
+    def _remove(self, key):
+        meta = self._load_index().pop(key, None)
+        if meta is not None:
+            self._bytes -= meta['size']
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def lookup(self, url):
+        """Return the metadata for a cached URL, or None if absent or expired"""
+        key = self._key(url)
+        meta = self._load_index().get(key)
+        if meta is None:
+            return None
+
+        if time.time() - meta['validated_at'] > self.max_age:
+            self._remove(key)
+            self.evictions += 1
+            return None
+
+        return meta
+
+    def conditional_headers(self, meta):
+        """Build the revalidation headers for a cached entry"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def revalidated(self, url):
+        """Record a 304 for a cached URL and return its stored body, or None if it was lost"""
+        key = self._key(url)
+        meta = self._load_index().get(key)
+        if meta is None:
+            # Evicted by a concurrent store() since lookup(); the caller refetches the body
+            return None
+        body_path, _ = self._paths(key)
+        try:
+            with open(body_path, 'rb') as fh:
+                content = fh.read()
+        except FileNotFoundError:
+            self._remove(key)
+            return None
+
+        meta['validated_at'] = meta['last_used'] = time.time()
+        self._write_meta(key, meta)
+
+        self.hits += 1
+        self.bytes_saved += len(content)
+        return content
+
+    def store(self, url, content, headers):
+        """Cache a full response if the server sent validators for it"""
+        self.misses += 1
+
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        key = self._key(url)
+        index = self._load_index()
+        body_path, _ = self._paths(key)
+        tmp_path = body_path + '.tmp'
+        with open(tmp_path, 'wb') as fh:
+            fh.write(content)
+        os.replace(tmp_path, body_path)
+
+        now = time.time()
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'size': len(content),
+            'validated_at': now,
+            'last_used': now,
+            'derived': {}
+        }
+        self._write_meta(key, meta)
+        replaced = index.get(key)
+        if replaced is not None:
+            self._bytes -= replaced['size']
+        index[key] = meta
+        self._bytes += meta['size']
+
+        self.evict()
+
+    def load_derived(self, url, name):
+        """Return a parse result previously stored against the cached body"""
+        meta = self._load_index().get(self._key(url))
+        if meta is None:
+            return None
+        return meta['derived'].get(name)
+
+    def store_derived(self, url, name, value):
+        """Keep a JSON-serialisable parse result so an unchanged page is not re-parsed"""
+        key = self._key(url)
+        meta = self._load_index().get(key)
+        if meta is None:
+            return
+        meta['derived'][name] = value
+        self._write_meta(key, meta)
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        index = self._load_index()
+        now = time.time()
+
+        for key in [key for key, meta in index.items() if now - meta['validated_at'] > self.max_age]:
+            self._remove(key)
+            self.evictions += 1
+
+        if self._bytes <= self.max_bytes:
+            return
+
+        for key in sorted(index, key=lambda k: index[k]['last_used']):
+            self._remove(key)
+            self.evictions += 1
+            if self._bytes <= self.max_bytes:
+                break
+
+    def get_stats(self):
+        """Hit/miss counters for confirming bandwidth savings"""
+        requests = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'evictions': self.evictions,
+            'entries': len(self._load_index())
+        }
@@ -0,0 +1,95 @@
+# Per-bill fingerprints for incremental scraping
+import hashlib
+import json
+import os
+
+from .records import json_default
+
+# Fields whose change makes a bill count as updated
+FINGERPRINT_FIELDS = ('status', 'title', 'sponsor')
+
+
+def bill_key(bill):
+    """Identify a bill by province, session and bill number
+
+    Bills without a number fall back to their URL or title, so they don't
+    all share one key per session.
+    """
+    number = bill.get('bill_number') or bill.get('bill_url') or bill.get('title') or ''
+    return '|'.join((bill.get('province') or '', bill.get('session') or '', number))
+
+
+def content_hash(bill, fields=FINGERPRINT_FIELDS):
+    """Hash the fields that matter for change detection"""
+    content = '\x1f'.join(str(bill.get(field, '')) for field in fields)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class FingerprintStore:
+    """Remember what each bill looked like on the last run
+
+    Bills are observed one at a time during a run and classified as inserts
+    or updates; bills from a scraped province that were not seen again are
+    withdrawals. Nothing is persisted until ``save`` so a failed run leaves
+    the previous fingerprints intact.
+    """
+
+    def __init__(self, path='data/fingerprints.json'):
+        self.path = path
+        self.previous = {}
+        self.current = {}
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as fh:
+                self.previous = json.load(fh)
+
+    def observe(self, bill):
+        """Record a bill from this run and return 'insert', 'update' or None if unchanged"""
+        key = bill_key(bill)
+        fingerprint = content_hash(bill)
+        self.current[key] = {'hash': fingerprint, 'bill': bill}
+
+        previous = self.previous.get(key)
+        if previous is None:
+            return 'insert'
+        if previous['hash'] != fingerprint:
+            return 'update'
+        return None
+
+    def withdrawals(self, provinces):
+        """Bills seen last run in the given provinces but missing from this one"""
+        return [
+            entry['bill'] for key, entry in self.previous.items()
+            if key not in self.current and entry['bill'].get('province') in provinces
+        ]
+
+    def save(self, provinces=None):
+        """Persist this run's fingerprints, keeping provinces that were not scraped
+
+        With ``provinces`` only those provinces are committed, even if none of
+        their bills were seen, and the rest of the run stays pending; watch
+        mode commits each province after each of its polls.
+        """
+        if provinces is None:
+            committed = self.current
+            provinces = set()
+        else:
+            committed = {
+                key: entry for key, entry in self.current.items()
+                if entry['bill'].get('province') in provinces
+            }
+        provinces = set(provinces) | {entry['bill'].get('province') for entry in committed.values()}
+        merged = {
+            key: entry for key, entry in self.previous.items()
+            if entry['bill'].get('province') not in provinces
+        }
+        merged.update(committed)
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(merged, fh, default=json_default)
+        os.replace(tmp_path, self.path)
+
+        self.previous = merged
+        self.current = {key: entry for key, entry in self.current.items() if key not in committed}
@@ -0,0 +1,290 @@
+# Redis-backed work queue for running scrapes across many worker processes
+import asyncio
+import json
+import time
+import uuid
+
+from .metrics import current_province
+from .records import json_default
+
+
+def connect(url):
+    """Open an asyncio Redis client for a redis:// URL, or the in-process fake for 'memory://'"""
+    if url.startswith('memory://'):
+        return InMemoryRedis()
+    try:
+        import redis.asyncio as aioredis
+    except ImportError as e:
+        raise ImportError("Distributed mode requires redis: pip install redis") from e
+    return aioredis.from_url(url, decode_responses=True)
+
+
+class JobQueue:
+    """Work units shared between one orchestrator run and any number of workers
+
+    Jobs wait on a pending list. A worker claims one by atomically moving its
+    id to a processing list and taking a lease; a job whose lease runs out
+    (a worker crashed or hung) is put back on the pending list by whichever
+    worker notices first, up to ``max_attempts`` times. Delivery is therefore
+    at-least-once, and the orchestrator deduplicates bills as usual.
+
+    Each orchestrator run has its own id. Jobs are deduplicated per run, so a
+    URL already queued or in flight is not queued twice, and results come
+    back on a per-run list.
+    """
+
+    def __init__(self, redis, prefix='provincial', run_id=None, visibility_timeout=300, max_attempts=3):
+        self.redis = redis
+        self.prefix = prefix
+        self.run_id = run_id or uuid.uuid4().hex
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+        self.pending_key = f"{prefix}:pending"
+        self.processing_key = f"{prefix}:processing"
+        self.jobs_key = f"{prefix}:jobs"
+        self.leases_key = f"{prefix}:leases"
+
+    def _inflight_key(self, run_id):
+        return f"{self.prefix}:inflight:{run_id}"
+
+    def _results_key(self, run_id):
+        return f"{self.prefix}:results:{run_id}"
+
+    async def enqueue(self, kind, province, url=''):
+        """Queue a work unit for this run; returns its id, or None if it is already queued"""
+        dedup = f"{kind}|{province}|{url}"
+        if not await self.redis.sadd(self._inflight_key(self.run_id), dedup):
+            return None
+
+        job_id = str(await self.redis.incr(f"{self.prefix}:next_id"))
+        job = {
+            'id': job_id, 'run': self.run_id, 'kind': kind, 'province': province, 'url': url,
+            'dedup': dedup, 'attempts': 0
+        }
+        await self.redis.hset(self.jobs_key, job_id, json.dumps(job))
+        await self.redis.lpush(self.pending_key, job_id)
+        return job_id
+
+    async def claim(self):
+        """Take the next pending job, or None if there is nothing to do"""
+        job_id = await self.redis.lmove(self.pending_key, self.processing_key, 'RIGHT', 'LEFT')
+        if job_id is None:
+            return None
+        await self.redis.hset(self.leases_key, job_id, time.time() + self.visibility_timeout)
+
+        payload = await self.redis.hget(self.jobs_key, job_id)
+        if payload is None:
+            # Finished by another worker after its lease had already been handed out again
+            await self._forget(job_id)
+            return None
+        return json.loads(payload)
+
+    async def extend(self, job):
+        """Renew a job's lease while a worker is still busy with it"""
+        await self.redis.hset(self.leases_key, job['id'], time.time() + self.visibility_timeout)
+
+    async def complete(self, job, bills=None, details=None, error=None):
+        """Publish a job's result to its run and drop the job"""
+        result = {'job': job, 'bills': bills or [], 'details': details or {}, 'error': error}
+        # The result goes out first: a crash before the cleanup only means the job runs again
+        await self.redis.rpush(self._results_key(job['run']), json.dumps(result, default=json_default))
+        await self.redis.srem(self._inflight_key(job['run']), job['dedup'])
+        await self.redis.hdel(self.jobs_key, job['id'])
+        await self._forget(job['id'])
+
+    async def fail(self, job, error):
+        """Put a failed job back on the queue, or report it once it has used its attempts"""
+        if await self._forget(job['id']):
+            await self._retry(job, error)
+
+    async def _retry(self, job, error):
+        job['attempts'] += 1
+        if job['attempts'] >= self.max_attempts:
+            await self.complete(job, error=error)
+            return
+        await self.redis.hset(self.jobs_key, job['id'], json.dumps(job))
+        await self.redis.lpush(self.pending_key, job['id'])
+
+    async def requeue_expired(self):
+        """Return jobs whose lease has run out to the pending list; returns how many"""
+        requeued = 0
+        now = time.time()
+        for job_id in await self.redis.lrange(self.processing_key, 0, -1):
+            lease = await self.redis.hget(self.leases_key, job_id)
+            if lease is None:
+                # Claimed a moment ago and the lease is not written yet; start the clock now
+                await self.redis.hsetnx(self.leases_key, job_id, now + self.visibility_timeout)
+                continue
+            if float(lease) > now:
+                continue
+
+            payload = await self.redis.hget(self.jobs_key, job_id)
+            # LREM decides which of several competing workers gets to requeue the job
+            if not await self._forget(job_id) or payload is None:
+                continue
+            job = json.loads(payload)
+            print(f"Job {job_id} ({job['kind']} {job['url'] or job['province']}) timed out; requeueing")
+            await self._retry(job, 'visibility timeout expired')
+            requeued += 1
+        return requeued
+
+    async def _forget(self, job_id):
+        """Remove a job from the processing list; False if someone else already did"""
+        removed = await self.redis.lrem(self.processing_key, 1, job_id)
+        await self.redis.hdel(self.leases_key, job_id)
+        return bool(removed)
+
+    async def next_result(self, timeout=1.0):
+        """Wait up to ``timeout`` seconds for the next result of this run"""
+        item = await self.redis.blpop([self._results_key(self.run_id)], timeout=timeout)
+        return json.loads(item[1]) if item else None
+
+    async def discard_run(self):
+        """Remove this run's bookkeeping keys"""
+        await self.redis.delete(self._inflight_key(self.run_id), self._results_key(self.run_id))
+
+
+async def execute(job, scraper):
+    """Run one work unit, returning the keyword arguments for JobQueue.complete"""
+    if job['kind'] == 'listing':
+        return {'bills': [[bill, detail_url] async for bill, detail_url in scraper.scrape_listing_stubs()]}
+    if job['kind'] == 'detail':
+        return {'details': await scraper.get_bill_details(job['url'])}
+    if job['kind'] == 'unit':
+        return {'bills': [[bill, None] async for bill in scraper.scrape_historical_unit(job['url'])]}
+    raise ValueError(f"Unknown job kind: {job['kind']}")
+
+
+async def run_worker(queue, scrapers, slots=4, poll_interval=0.5, stop_when_idle=False):
+    """Claim and run jobs with ``slots`` concurrent jobs until cancelled
+
+    ``scrapers`` maps the province keys used in jobs to scraper instances.
+    Leases are renewed while a job runs, and every idle slot also looks for
+    jobs abandoned by crashed workers. With ``stop_when_idle`` the worker
+    returns once the queue is empty.
+    """
+    async def heartbeat(job):
+        while True:
+            await asyncio.sleep(queue.visibility_timeout / 3)
+            await queue.extend(job)
+
+    async def slot():
+        while True:
+            job = await queue.claim()
+            if job is None:
+                if stop_when_idle:
+                    return
+                await queue.requeue_expired()
+                await asyncio.sleep(poll_interval)
+                continue
+
+            keepalive = asyncio.create_task(heartbeat(job))
+            # Fetch and parse metrics of this job are labelled with its province
+            current_province.set(job['province'])
+            try:
+                result = await execute(job, scrapers[job['province']])
+            except Exception as e:
+                print(f"Job {job['id']} ({job['kind']} {job['url'] or job['province']}) failed: {e}")
+                await queue.fail(job, str(e))
+            else:
+                await queue.complete(job, **result)
+            finally:
+                keepalive.cancel()
+
+    await asyncio.gather(*(slot() for _ in range(slots)))
+
+
+class InMemoryRedis:
+    """In-process stand-in for the subset of redis.asyncio that JobQueue uses
+
+    Lets the orchestrator and workers share a queue inside one process, for
+    tests and benchmarks without a Redis server.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def sadd(self, key, *members):
+        members_set = self.data.setdefault(key, set())
+        added = len(set(members) - members_set)
+        members_set.update(members)
+        return added
+
+    async def srem(self, key, *members):
+        members_set = self.data.get(key, set())
+        removed = len(members_set & set(members))
+        members_set.difference_update(members)
+        return removed
+
+    async def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = str(value)
+        return 1
+
+    async def hsetnx(self, key, field, value):
+        fields = self.data.setdefault(key, {})
+        if field in fields:
+            return 0
+        fields[field] = str(value)
+        return 1
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def hdel(self, key, *fields):
+        existing = self.data.get(key, {})
+        return sum(1 for field in fields if existing.pop(field, None) is not None)
+
+    async def lpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        for value in values:
+            items.insert(0, value)
+        return len(items)
+
+    async def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(values)
+        return len(items)
+
+    async def lmove(self, source, destination, src='LEFT', dest='RIGHT'):
+        items = self.data.get(source)
+        if not items:
+            return None
+        value = items.pop(0 if src == 'LEFT' else -1)
+        target = self.data.setdefault(destination, [])
+        target.insert(0 if dest == 'LEFT' else len(target), value)
+        return value
+
+    async def lrem(self, key, count, value):
+        items = self.data.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    async def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        return list(items[start:] if end == -1 else items[start:end + 1])
+
+    async def llen(self, key):
+        return len(self.data.get(key, []))
+
+    async def blpop(self, keys, timeout=0):
+        deadline = time.monotonic() + timeout
+        while True:
+            for key in keys:
+                if self.data.get(key):
+                    return key, self.data[key].pop(0)
+            if timeout and time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(0.01)
+
+    async def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    async def aclose(self):
+        pass
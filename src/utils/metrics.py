@@ -0,0 +1,286 @@
+# Run metrics: latency histograms, counters, Prometheus export and a JSON run report
+import contextvars
+import json
+import os
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+# Province whose scrape the current task is working for; tasks inherit it from their parent
+current_province = contextvars.ContextVar('current_province', default='')
+
+# Upper bounds in seconds, from sub-millisecond parses up to slow downloads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Help text for the Prometheus export; anything not listed is exported without HELP
+DESCRIPTIONS = {
+    'dns_seconds': 'DNS resolution time',
+    'connect_seconds': 'Time to open a new connection, DNS included',
+    'ttfb_seconds': 'Time from sending a request to its response headers',
+    'fetch_seconds': 'Time for a whole request attempt, body download included',
+    'response_bytes': 'Response body bytes downloaded',
+    'requests': 'HTTP requests by response status',
+    'retries': 'HTTP requests retried after a failure or throttling',
+    'cache_revalidated': 'GETs answered 304 and served from the HTTP cache',
+    'connections_reused': 'Requests sent on a pooled keep-alive connection',
+    'parse_seconds': 'Time to parse one page',
+    'pages_parsed': 'Pages parsed',
+    'rows_emitted': 'Bills yielded by a province scraper',
+    'scrape_seconds': 'Wall time of a province scrape',
+    'sink_write_seconds': 'Time to write one batch to the output sink',
+    'rows_written': 'Bills written to the output sink',
+    'index_write_seconds': 'Time to update the search index with one batch',
+    'polls': 'Watch-mode polls of a province listing',
+    'changes_detected': 'Inserts, updates and withdrawals found by watch-mode polls',
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style, plus min/max"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the max for the overflow bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'max': self.max,
+        }
+
+
+def _merge(histograms):
+    """Combine histograms with the same buckets, e.g. one province's hosts"""
+    merged = Histogram()
+    for histogram in histograms:
+        merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+        merged.count += histogram.count
+        merged.sum += histogram.sum
+        if histogram.max is not None:
+            merged.max = histogram.max if merged.max is None else max(merged.max, histogram.max)
+            merged.min = histogram.min if merged.min is None else min(merged.min, histogram.min)
+    return merged
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+class RunMetrics:
+    """Counters and histograms for one scrape run, labelled by province, host and stage
+
+    The fetcher, the scrapers' page parsing and the orchestrator's pipeline
+    all record into the instance hanging off the shared AsyncFetcher. Calls
+    that don't pass a province are labelled with the province of the task
+    making them (see ``current_province``).
+    """
+
+    def __init__(self, namespace='provincial_scrapy'):
+        self.namespace = namespace
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+
+    def _with_province(self, labels):
+        if 'province' not in labels:
+            labels['province'] = current_province.get()
+        return _labels(labels)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, self._with_province(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, self._with_province(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the time spent in a ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def trace_config(self):
+        """aiohttp TraceConfig recording DNS, connect and time-to-first-byte per host"""
+        import aiohttp
+
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.host = params.url.host or ''
+            context.started = time.perf_counter()
+            context.connect_started = None
+
+        async def on_dns_start(session, context, params):
+            context.dns_started = time.perf_counter()
+
+        async def on_dns_end(session, context, params):
+            self.observe('dns_seconds', time.perf_counter() - context.dns_started, host=context.host)
+
+        async def on_connection_create_start(session, context, params):
+            context.connect_started = time.perf_counter()
+
+        async def on_connection_create_end(session, context, params):
+            self.observe('connect_seconds', time.perf_counter() - context.connect_started, host=context.host)
+
+        async def on_connection_reuseconn(session, context, params):
+            self.inc('connections_reused', host=context.host)
+
+        async def on_request_end(session, context, params):
+            self.observe('ttfb_seconds', time.perf_counter() - context.started, host=context.host)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    def to_prometheus(self):
+        """Every metric in the Prometheus text exposition format"""
+        lines = []
+        families = {}
+        for (name, labels), value in self.counters.items():
+            families.setdefault((name, 'counter'), []).append((labels, value))
+        for (name, labels), histogram in self.histograms.items():
+            families.setdefault((name, 'histogram'), []).append((labels, histogram))
+
+        for (name, kind), series in sorted(families.items()):
+            metric = f"{self.namespace}_{name}" + ('_total' if kind == 'counter' else '')
+            if name in DESCRIPTIONS:
+                lines.append(f"# HELP {metric} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for labels, value in sorted(series, key=lambda item: item[0]):
+                if kind == 'counter':
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(value.buckets, value.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_format_labels(labels, [('le', str(bound))])} {cumulative}")
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {value.count}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {value.sum}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {value.count}")
+        return '\n'.join(lines) + '\n'
+
+    def report(self, extra=None):
+        """JSON-serialisable run report: every series by province, then totals per metric"""
+        provinces = {}
+        totals = {}
+        for (name, labels), value in self.counters.items():
+            labels = dict(labels)
+            province = provinces.setdefault(labels.pop('province') or 'unattributed', {})
+            key = name + ''.join(f"[{v}]" for _, v in sorted(labels.items()))
+            province[key] = province.get(key, 0) + value
+            totals[name] = totals.get(name, 0) + value
+        for (name, labels), histogram in self.histograms.items():
+            labels = dict(labels)
+            province = provinces.setdefault(labels.pop('province') or 'unattributed', {})
+            key = name + ''.join(f"[{v}]" for _, v in sorted(labels.items()))
+            province[key] = histogram.summary()
+            total = totals.setdefault(name, {'count': 0, 'sum': 0.0})
+            total['count'] += histogram.count
+            total['sum'] = round(total['sum'] + histogram.sum, 6)
+
+        report = {
+            'started': datetime.fromtimestamp(self.started).isoformat(),
+            'wall_seconds': round(time.time() - self.started, 3),
+            'totals': totals,
+            'provinces': provinces,
+        }
+        report.update(extra or {})
+        return report
+
+    def stage_summary(self):
+        """One line per province: rows, requests, bytes, fetch latency, parse and scrape time"""
+        provinces = {}
+        for (name, labels), value in self.counters.items():
+            province = provinces.setdefault(dict(labels)['province'] or 'unattributed', Counter())
+            province[name] += value
+        fetches = {}
+        for (name, labels), histogram in self.histograms.items():
+            province = dict(labels)['province'] or 'unattributed'
+            if name == 'fetch_seconds':
+                fetches.setdefault(province, []).append(histogram)
+            elif name in ('parse_seconds', 'scrape_seconds', 'sink_write_seconds'):
+                provinces.setdefault(province, Counter())[name] += histogram.sum
+
+        lines = {}
+        for province, totals in sorted(provinces.items()):
+            parts = []
+            if totals['rows_emitted'] or totals['rows_written']:
+                parts.append(f"{totals['rows_emitted'] or totals['rows_written']} rows")
+            if totals['scrape_seconds']:
+                parts.append(f"{totals['scrape_seconds']:.2f}s wall")
+            if totals['requests']:
+                merged = _merge(fetches.get(province, []))
+                parts.append(f"{totals['requests']} requests ({totals['retries']} retried, "
+                             f"{totals['cache_revalidated']} from cache), {totals['response_bytes'] / 1e6:.2f} MB")
+                if merged.count:
+                    parts.append(f"fetch p50 {merged.quantile(0.5) * 1000:.0f}ms p95 {merged.quantile(0.95) * 1000:.0f}ms")
+            if totals['pages_parsed']:
+                parts.append(f"{totals['pages_parsed']} pages parsed in {totals['parse_seconds']:.3f}s")
+            if totals['sink_write_seconds']:
+                parts.append(f"{totals['sink_write_seconds']:.3f}s writing output")
+            lines[province] = ', '.join(parts)
+        return lines
+
+    def write(self, directory, extra=None):
+        """Write metrics.prom and a timestamped run_<time>.json report; returns the report path"""
+        os.makedirs(directory, exist_ok=True)
+        prom_path = os.path.join(directory, 'metrics.prom')
+        # Written atomically so a node_exporter textfile collector never sees half a file
+        with open(prom_path + '.tmp', 'w', encoding='utf-8') as fh:
+            fh.write(self.to_prometheus())
+        os.replace(prom_path + '.tmp', prom_path)
+
+        stamp = datetime.fromtimestamp(self.started).strftime('%Y%m%d_%H%M%S')
+        report_path = os.path.join(directory, f"run_{stamp}.json")
+        with open(report_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.report(extra), fh, indent=2, default=str)
+        return report_path
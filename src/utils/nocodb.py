@@ -0,0 +1,197 @@
+# Batched sync of scraped bills to a NocoDB table
+import asyncio
+import json
+import os
+import threading
+
+import aiohttp
+
+from .incremental import bill_key, content_hash
+from .sinks import flat_bill
+
+# Columns synced to NocoDB, plus bill_key which identifies the row; withdrawn_at is
+# the date of the run that found a bill withdrawn, and empty while it is listed
+SYNC_FIELDS = (
+    'province', 'session', 'bill_number', 'title', 'title_en', 'title_fr', 'sponsor', 'member', 'status',
+    'committee', 'language', 'bill_url', 'bill_url_fr', 'source_url', 'readings', 'withdrawn_at', 'scraped_date'
+)
+# scraped_date changes every run, so it is sent but not part of the change hash
+HASH_FIELDS = tuple(field for field in SYNC_FIELDS if field != 'scraped_date')
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class NocoDbSink:
+    """Sync bills to a NocoDB table through its bulk insert and bulk update endpoints
+
+    The sink remembers each synced bill's row Id and a hash of its fields in
+    ``state_path``, so only new and changed bills are sent. When there is no
+    state yet it is rebuilt from the table itself. Requests go through one
+    keep-alive aiohttp session running on a background event loop, with up to
+    ``concurrency`` batches in flight; ``write`` blocks only when that limit
+    is reached, so it fits the pipeline's synchronous sink interface.
+    """
+
+    def __init__(self, url, token, table_id, batch_size=100, concurrency=4,
+                 state_path='data/nocodb_state.json'):
+        self.url = url.rstrip('/')
+        self.table_id = table_id
+        self.records_url = f"{self.url}/api/v2/tables/{table_id}/records"
+        self.token = token
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.state_path = state_path
+        self.stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+
+        self.state = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._pending = set()
+        self._loop = None
+        self._thread = None
+        self._session = None
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Build a sink from NOCODB_URL, NOCODB_API_TOKEN and NOCODB_TABLE_ID"""
+        missing = [name for name in ('NOCODB_URL', 'NOCODB_API_TOKEN', 'NOCODB_TABLE_ID') if not os.environ.get(name)]
+        if missing:
+            raise ValueError(f"NocoDB output needs {', '.join(missing)} in the environment")
+        return cls(os.environ['NOCODB_URL'], os.environ['NOCODB_API_TOKEN'], os.environ['NOCODB_TABLE_ID'], **kwargs)
+
+    def _start(self):
+        """Start the background loop and load the last-synced state"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='nocodb-sync', daemon=True)
+        self._thread.start()
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path, encoding='utf-8') as fh:
+                self.state = json.load(fh)
+        else:
+            self.state = asyncio.run_coroutine_threadsafe(self._load_remote_state(), self._loop).result()
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=60),
+                headers={'xc-token': self.token}
+            )
+        return self._session
+
+    async def _load_remote_state(self):
+        """Rebuild the sync state from the rows already in the table"""
+        state = {}
+        offset = 0
+        while True:
+            params = {'limit': 1000, 'offset': offset, 'fields': ','.join(('Id', 'bill_key') + HASH_FIELDS)}
+            async with self._get_session().get(self.records_url, params=params) as response:
+                response.raise_for_status()
+                page = await response.json()
+
+            for row in page.get('list', []):
+                if row.get('bill_key'):
+                    # NocoDB may return empty cells as null; hash them the way write() does
+                    values = {field: row.get(field) or '' for field in HASH_FIELDS}
+                    state[row['bill_key']] = [row['Id'], content_hash(values, HASH_FIELDS)]
+            offset += len(page.get('list', []))
+            if page.get('pageInfo', {}).get('isLastPage', True) or not page.get('list'):
+                return state
+
+    def write(self, bills):
+        if self._loop is None:
+            self._start()
+
+        inserts = []
+        updates = []
+        for bill in bills:
+            key = bill_key(bill)
+            flat = flat_bill(bill)
+            record = {field: flat.get(field) or '' for field in SYNC_FIELDS}
+            if bill.get('change_type') == 'withdrawal':
+                record['withdrawn_at'] = bill.get('scraped_date') or ''
+            digest = content_hash(record, HASH_FIELDS)
+            known = self.state.get(key)
+            if known is not None and known[1] == digest:
+                self.stats['unchanged'] += 1
+                continue
+
+            record['bill_key'] = key
+            if known is None:
+                inserts.append((key, digest, record))
+            else:
+                updates.append((key, digest, {**record, 'Id': known[0]}))
+
+        for batch in _chunks(inserts, self.batch_size):
+            self._submit(self._send('POST', batch, 'inserted'))
+        for batch in _chunks(updates, self.batch_size):
+            self._submit(self._send('PATCH', batch, 'updated'))
+
+    def _submit(self, coroutine):
+        """Hand a batch to the background loop, waiting while too many are in flight"""
+        self._slots.acquire()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        self._pending.add(future)
+
+        def done(finished):
+            self._pending.discard(finished)
+            self._slots.release()
+
+        future.add_done_callback(done)
+
+    async def _send(self, method, batch, counter):
+        """POST (insert) or PATCH (update) one batch and record the synced rows"""
+        try:
+            async with self._get_session().request(
+                method, self.records_url, json=[record for _, _, record in batch]
+            ) as response:
+                response.raise_for_status()
+                rows = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Left out of the state, so the next run sends these rows again
+            print(f"NocoDB {method} of {len(batch)} rows failed: {e}")
+            with self._lock:
+                self.stats['failed'] += len(batch)
+            return
+
+        with self._lock:
+            for (key, digest, record), row in zip(batch, rows):
+                self.state[key] = [row.get('Id', record.get('Id')), digest]
+            self.stats[counter] += len(batch)
+
+    def flush(self):
+        """Save the sync state of the batches finished so far; batches still in flight carry on"""
+        if self._loop is not None:
+            self._save_state()
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            # A copy, since the sync thread keeps updating the state
+            json.dump(dict(self.state), fh)
+        os.replace(tmp_path, self.state_path)
+
+    def close(self):
+        """Wait for in-flight batches, save the sync state and shut the client down"""
+        if self._loop is None:
+            return self.records_url
+
+        for future in list(self._pending):
+            future.result()
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._save_state()
+
+        print(f"NocoDB sync: {self.stats['inserted']} inserted, {self.stats['updated']} updated, "
+              f"{self.stats['unchanged']} unchanged, {self.stats['failed']} failed")
+        return self.records_url
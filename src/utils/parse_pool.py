@@ -0,0 +1,101 @@
+# Process pool for CPU-bound page parsing
+import asyncio
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _parse_batch(items):
+    """Worker side: run each (parse, content, args) and return its records or its error"""
+    results = []
+    for parse, content, args in items:
+        try:
+            parsed = parse(content, *args)
+            results.append((True, list(parsed) if inspect.isgenerator(parsed) else parsed))
+        except Exception as e:
+            results.append((False, f"{type(e).__name__}: {e}"))
+    return results
+
+
+class ParsePoolError(Exception):
+    """A page failed to parse in a pool worker"""
+
+
+class ParsePool:
+    """Parse raw response bytes in worker processes instead of on the event loop thread
+
+    Pages are shipped to the workers in batches of up to ``batch_size`` to
+    amortise the cost of pickling; a partial batch is sent after
+    ``max_delay`` seconds. Workers return the parser's records (generators
+    are turned into lists), so only compact results cross back.
+
+    Only module-level functions can be sent to a worker. Anything else, such
+    as a bound method whose state lives in this process, is parsed inline.
+    """
+
+    def __init__(self, workers=None, batch_size=16, max_delay=0.005):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._executor = None
+        self._batch = []
+        self._flush_handle = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def run(self, parse, content, *args):
+        """Parse one page in the pool and return its records"""
+        if not inspect.isfunction(parse) or parse.__qualname__ != parse.__name__:
+            parsed = parse(content, *args)
+            return list(parsed) if inspect.isgenerator(parsed) else parsed
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((parse, content, args, future))
+
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+
+        ok, result = await future
+        if not ok:
+            raise ParsePoolError(f"{parse.__name__} failed in a parse worker: {result}")
+        return result
+
+    def _flush(self):
+        """Send the waiting pages to a worker as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+
+        items = [(parse, content, args) for parse, content, args, _ in batch]
+        futures = [future for _, _, _, future in batch]
+        task = asyncio.get_running_loop().run_in_executor(self._get_executor(), _parse_batch, items)
+
+        def deliver(finished):
+            for future, result in zip(futures, _batch_results(finished, len(futures))):
+                if not future.done():
+                    future.set_result(result)
+
+        task.add_done_callback(deliver)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _batch_results(finished, size):
+    """Per-page results of a batch, or its exception repeated for every page"""
+    if finished.cancelled():
+        return [(False, 'parse batch cancelled')] * size
+    if finished.exception() is not None:
+        return [(False, f"{type(finished.exception()).__name__}: {finished.exception()}")] * size
+    return finished.result()
@@ -0,0 +1,85 @@
+# Shared lxml parsing helpers for the province scrapers
+import codecs
+import re
+
+from lxml import etree, html
+
+# A declared encoding lxml reads itself; without one it would take the bytes as Latin-1
+DECLARED_ENCODING = re.compile(rb'<meta[^>]+charset|<\?xml[^>]+encoding', re.IGNORECASE)
+BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+_parsers = {}
+
+
+def has_class(name):
+    """XPath predicate matching one token of an element's class attribute"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def xpath(expression):
+    """Compile an XPath expression once, at import time of the calling module"""
+    return etree.XPath(expression)
+
+
+def page_encoding(content):
+    """Encoding to parse page bytes with, or None when the page declares its own
+
+    Pages that declare nothing are read as UTF-8, which is what the
+    legislature sites serve, or as Windows-1252 when the bytes are not
+    valid UTF-8.
+    """
+    if content.startswith(BOMS) or DECLARED_ENCODING.search(content, 0, 4096):
+        return None
+    try:
+        content.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'cp1252'
+    return 'utf-8'
+
+
+def parse_html(content):
+    """Parse an HTML document with lxml's C parser, as UTF-8 unless it declares an encoding"""
+    if not content or not content.strip():
+        return html.Element('html')
+    encoding = page_encoding(content) if isinstance(content, bytes) else None
+    if encoding is None:
+        return html.document_fromstring(content)
+    parser = _parsers.get(encoding)
+    if parser is None:
+        parser = _parsers[encoding] = html.HTMLParser(encoding=encoding)
+    return html.document_fromstring(content, parser=parser)
+
+
+def first_match(node, *selectors):
+    """Return the results of the first selector that matches anything
+
+    Replaces BeautifulSoup ``find(...) or find_all(...)`` fallback chains.
+    """
+    for selector in selectors:
+        results = selector(node)
+        if results:
+            return results
+    return []
+
+
+def first(node, *selectors):
+    """Return the first element matched by a fallback chain of selectors, or None"""
+    results = first_match(node, *selectors)
+    return results[0] if results else None
+
+
+def text(node):
+    """All text inside an element, stripped; '' for a missing element"""
+    return node.text_content().strip() if node is not None else ''
+
+
+def by_class(elements):
+    """Index elements by each of their class names, keeping the first element per class
+
+    Lets a row's cells be looked up by class without searching the row again
+    for every field.
+    """
+    index = {}
+    for element in elements:
+        for name in (element.get('class') or '').split():
+            index.setdefault(name, element)
+    return index
@@ -0,0 +1,66 @@
+# Page-level PDF text extraction with a content-hash cache
+import hashlib
+import io
+import json
+import os
+
+from pypdf import PdfReader
+
+
+def page_hash(page, parser_name):
+    """Hash a page's raw content stream together with the parser that reads it"""
+    digest = hashlib.sha256(parser_name.encode('utf-8'))
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    return digest.hexdigest()
+
+
+class PdfPageCache:
+    """Rows extracted from each page of a PDF, keyed by a hash of the page's content stream
+
+    A re-published PDF usually changes only a few pages. Pages whose content
+    hashes match the previous version reuse their rows instead of having their
+    text extracted and parsed again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as fh:
+                    self.pages = json.load(fh)
+            except ValueError:
+                self.pages = {}
+
+    def extract(self, content, parse_page):
+        """Return the rows ``parse_page(text)`` yields for every page, reusing unchanged pages"""
+        parser_name = f"{parse_page.__module__}.{parse_page.__qualname__}"
+        rows = []
+        current = {}
+        for page in PdfReader(io.BytesIO(content)).pages:
+            key = page_hash(page, parser_name)
+            page_rows = self.pages.get(key)
+            if page_rows is None:
+                page_rows = list(parse_page(page.extract_text() or ''))
+                self.misses += 1
+            else:
+                self.hits += 1
+            current[key] = page_rows
+            rows.extend(page_rows)
+
+        # Only the latest version's pages are worth keeping
+        self.pages = current
+        self._save()
+        return rows
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.pages, fh)
+        os.replace(tmp_path, self.path)
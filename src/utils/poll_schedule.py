@@ -0,0 +1,142 @@
+# Adaptive per-province polling schedule for watch mode
+import json
+import math
+import os
+import random
+import time
+
+HOUR = 3600
+WEEK_HOURS = 7 * 24
+
+
+def hour_of_week(t):
+    """Hour-of-week slot (0..167) of a Unix timestamp"""
+    return int(t // HOUR) % WEEK_HOURS
+
+
+class PollSchedule:
+    """Decide when to poll each province next from when its listing tends to change
+
+    Legislatures change their listings on a weekly rhythm (sitting days and
+    hours), so each province keeps a change rate per hour of the week,
+    learned from what its polls found and decaying with ``half_life`` hours of
+    observation per slot. The next poll is due once ``target`` changes are
+    expected since the last one, looking ahead through the coming slots, so
+    a province is polled every few minutes while the house sits and wakes up
+    for the next sitting morning instead of polling through the night.
+    Expected changes that don't show up count against the profile, so a
+    recess (the house not sitting when it usually would) backs polling off
+    to ``max_interval``; the next change found resets that. ``jitter``
+    spreads polls so provinces don't fall into step, and the state is saved
+    to ``path`` after every poll so a restarted daemon keeps what it learned.
+    """
+
+    def __init__(self, path='data/poll_schedule.json', min_interval=300, max_interval=6 * 3600, target=0.25,
+                 half_life=4, patience=20, jitter=0.1):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target = target
+        self.half_life = half_life
+        self.patience = patience
+        self.jitter = jitter
+        # Prior for slots never observed: 0.5 changes an hour, outweighed after a few polls
+        self.prior = (0.5, 1.0)
+        self.entries = {}
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as fh:
+                    self.entries = json.load(fh)
+            except ValueError:
+                self.entries = {}
+
+    def _entry(self, province):
+        entry = self.entries.get(province)
+        if entry is None:
+            entry = self.entries[province] = {
+                # [changes, hours observed] per hour-of-week slot
+                'profile': [[0.0, 0.0] for _ in range(WEEK_HOURS)],
+                'last_poll': None, 'next_poll': 0, 'missed': 0.0,
+                'polls': 0, 'changed_polls': 0, 'last_change': None,
+            }
+        return entry
+
+    def _rate(self, entry, slot):
+        """Learned changes per hour in a slot"""
+        changes, hours = entry['profile'][slot]
+        return (changes + self.prior[0]) / (hours + self.prior[1])
+
+    def _spans(self, start, end):
+        """Split start..end into (slot, hours) pieces at hour boundaries"""
+        t = start
+        while t < end:
+            boundary = min(end, (t // HOUR + 1) * HOUR)
+            yield hour_of_week(t), (boundary - t) / HOUR
+            t = boundary
+
+    def wait(self, province, now=None):
+        """Seconds until the province is due; 0 if it is overdue"""
+        now = time.time() if now is None else now
+        return max(0.0, self._entry(province)['next_poll'] - now)
+
+    def record(self, province, changes, now=None):
+        """Learn from a poll's outcome and schedule the next poll; returns the delay until it"""
+        now = time.time() if now is None else now
+        entry = self._entry(province)
+        if entry['last_poll'] is not None and now > entry['last_poll']:
+            self._learn(entry, entry['last_poll'], now, changes)
+        entry['polls'] += 1
+        entry['last_poll'] = now
+        if changes:
+            entry['changed_polls'] += 1
+            entry['last_change'] = now
+        return self._schedule(entry, now, self.interval(province, now))
+
+    def _learn(self, entry, start, end, changes):
+        spans = list(self._spans(start, end))
+        expected = [self._rate(entry, slot) * hours for slot, hours in spans]
+        total = sum(expected)
+        # Changes are credited to the slots where the profile found them most likely
+        entry['missed'] = 0.0 if changes else entry['missed'] + total
+        for (slot, hours), share in zip(spans, expected):
+            decay = 0.5 ** (hours / self.half_life)
+            found, observed = entry['profile'][slot]
+            entry['profile'][slot] = [found * decay + changes * share / total, observed * decay + hours]
+
+    def interval(self, province, now=None):
+        """Seconds from ``now`` until ``target`` changes are expected, within the interval bounds"""
+        now = time.time() if now is None else now
+        entry = self._entry(province)
+        # Each expected change that didn't appear makes it likelier the house isn't sitting
+        confidence = math.exp(-entry['missed'] / self.patience)
+        expected = 0.0
+        elapsed = 0.0
+        for slot, hours in self._spans(now, now + self.max_interval):
+            rate = self._rate(entry, slot) * confidence
+            if expected + rate * hours >= self.target:
+                elapsed += (self.target - expected) / rate * HOUR
+                return max(self.min_interval, elapsed)
+            expected += rate * hours
+            elapsed += hours * HOUR
+        return self.max_interval
+
+    def failed(self, province, now=None):
+        """Schedule the next poll after a failed one without learning anything from it"""
+        now = time.time() if now is None else now
+        return self._schedule(self._entry(province), now, self.interval(province, now))
+
+    def _schedule(self, entry, now, interval):
+        delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        entry['next_poll'] = now + delay
+        self._save()
+        return delay
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(self.entries, fh)
+        os.replace(tmp_path, self.path)
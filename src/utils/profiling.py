@@ -0,0 +1,138 @@
+# Opt-in profiling of a scrape run, attributed to the province scrapers
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+
+class ScrapeProfiler:
+    """Profile a run and break the results down by province scraper
+
+    ``'sample'`` looks at the event loop thread's stack every ``interval``
+    seconds from a background thread, which costs little enough to leave on
+    under production load. ``'cprofile'`` also traces every call; it is exact
+    but slows the run down, and writes a ``.prof`` file for snakeviz or
+    pstats. Either way the province breakdown comes from the samples: a
+    sample is charged to a province when a method of that province's scraper
+    (or of its detail stage) is on the stack. Instances rather than modules
+    identify the province, since most scrapers are a spec run by the shared
+    table engine.
+    """
+
+    def __init__(self, mode, directory='data/profiles', interval=0.005, top=10):
+        if mode not in ('cprofile', 'sample'):
+            raise ValueError(f"Unknown profiler: {mode}")
+        self.mode = mode
+        self.directory = directory
+        self.interval = interval
+        self.top = top
+        self.owners = {}
+        self.started = None
+
+        self._profile = None
+        self._thread = None
+        self._target = None
+        self._stop = threading.Event()
+        self._samples = Counter()
+        self._province_samples = Counter()
+        self._province_leaves = {}
+
+    def attach(self, scrapers):
+        """Map each scraper, and the detail stage it fetches pages with, to its province key"""
+        for province, scraper in scrapers.items():
+            for owner in (scraper, getattr(scraper, 'details', None)):
+                if owner is not None:
+                    # The object is kept alongside its province so its id is never reused
+                    self.owners[id(owner)] = (province, owner)
+
+    def start(self):
+        self.started = time.time()
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._sample_loop, name='scrape-profiler', daemon=True)
+        self._thread.start()
+
+    def province_of(self, frame):
+        """Province of the innermost scraper (or detail stage) method on a stack, or None"""
+        while frame is not None:
+            owner = self.owners.get(id(frame.f_locals.get('self')))
+            if owner is not None:
+                return owner[0]
+            frame = frame.f_back
+        return None
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            code = frame.f_code
+            leaf = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self._samples[leaf] += 1
+
+            province = self.province_of(frame)
+            if province is not None:
+                self._province_samples[province] += 1
+                self._province_leaves.setdefault(province, Counter())[leaf] += 1
+
+    def stop(self):
+        """Stop profiling, write any profile file and return the summary for the run report"""
+        stamp = datetime.fromtimestamp(self.started).strftime('%Y%m%d_%H%M%S')
+        self._stop.set()
+        self._thread.join()
+        if self.mode == 'cprofile':
+            self._profile.disable()
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"run_{stamp}.prof")
+            self._profile.dump_stats(path)
+            summary = self._cprofile_summary()
+            summary['file'] = path
+            return summary
+        return self._sample_summary()
+
+    def _cprofile_summary(self):
+        # (filename, line, function) -> (primitive calls, calls, own time, cumulative time, callers)
+        stats = pstats.Stats(self._profile).stats
+
+        def entry(key, value):
+            filename, line, function = key
+            return {
+                'function': f"{os.path.basename(filename)}:{line}:{function}",
+                'calls': value[1],
+                'own_seconds': round(value[2], 6),
+                'cumulative_seconds': round(value[3], 6),
+            }
+
+        hottest = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        return {
+            'mode': 'cprofile',
+            'hottest': [entry(key, value) for key, value in hottest],
+            # cProfile counts calls per function, not per scraper, so provinces come from the samples
+            'provinces': self._sample_summary()['provinces'],
+        }
+
+    def _sample_summary(self):
+        total = sum(self._samples.values())
+        return {
+            'mode': 'sample',
+            'interval': self.interval,
+            'samples': total,
+            'hottest': [{'function': leaf, 'samples': count} for leaf, count in self._samples.most_common(self.top)],
+            'provinces': {
+                province: {
+                    'samples': count,
+                    'share': round(count / total, 4) if total else 0,
+                    'hottest': [
+                        {'function': leaf, 'samples': leaf_count}
+                        for leaf, leaf_count in self._province_leaves[province].most_common(self.top)
+                    ],
+                }
+                for province, count in self._province_samples.most_common()
+            },
+        }
@@ -0,0 +1,224 @@
+# Adaptive per-host rate limiting and retry scheduling for the fetch layer
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Responses that tell us the host is overloaded and we should slow down
+THROTTLE_STATUSES = {429, 503}
+# Responses worth retrying after a backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` may be changed while in use"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def take(self):
+        """Wait for a token and consume it"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    """Request scheduling state for one host
+
+    Concurrency and request rate follow AIMD: every healthy response nudges
+    them up, while a 429/503, a connection failure or a response much slower
+    than the host's usual latency halves them (at most once per cooldown, so a
+    burst of bad responses counts as one congestion event). A Retry-After
+    blocks the whole host until it has passed, for at most ``max_retry_after``
+    seconds: a longer one is not waited for by the retry either.
+    """
+
+    def __init__(self, host, rate=5.0, burst=5, concurrency=2, max_concurrency=8,
+                 min_rate=0.2, max_rate=50.0, rate_step=0.5, latency_factor=3.0, adaptive=True,
+                 retry_ratio=0.2, min_retries=10, max_retry_after=120.0):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.limit = float(concurrency)
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.latency_factor = latency_factor
+        self.adaptive = adaptive
+        self.retry_ratio = retry_ratio
+        self.min_retries = min_retries
+        self.max_retry_after = max_retry_after
+
+        self.in_flight = 0
+        self.latency = None
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        # Futures of acquirers waiting for a slot; created per call so no loop is baked in
+        self._waiters = []
+
+    async def acquire(self):
+        """Wait for Retry-After, a free concurrency slot and a rate token"""
+        while True:
+            delay = self.blocked_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight < max(1, int(self.limit)):
+                break
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        self.in_flight += 1
+        try:
+            await self.bucket.take()
+        except BaseException:
+            self.in_flight -= 1
+            self._wake()
+            raise
+        self.requests += 1
+        return time.monotonic()
+
+    def release(self, started, status=None, retry_after=None):
+        """Free the slot and adapt to the outcome; ``status`` is None for a failed request"""
+        self.in_flight -= 1
+        self._wake()
+        elapsed = time.monotonic() - started
+
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + min(retry_after, self.max_retry_after))
+
+        if status in THROTTLE_STATUSES:
+            self.throttled += 1
+            self._decrease()
+        elif status is None:
+            self._decrease()
+        elif self.latency is not None and elapsed > self.latency * self.latency_factor:
+            self._decrease()
+        else:
+            self._increase()
+
+        if status is not None and status < 500:
+            # Latency baseline from responses the server actually produced
+            self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+
+    def _wake(self):
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _increase(self):
+        if not self.adaptive:
+            return
+        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self.bucket.rate = min(self.max_rate, self.bucket.rate + self.rate_step)
+
+    def _decrease(self):
+        if not self.adaptive:
+            return
+        now = time.monotonic()
+        if now - self.last_decrease < max(1.0, self.latency or 0):
+            return
+        self.last_decrease = now
+        self.limit = max(1.0, self.limit / 2)
+        self.bucket.rate = max(self.min_rate, self.bucket.rate / 2)
+
+    def spend_retry(self):
+        """Take one retry from the host's budget; False once retries outgrow the traffic"""
+        if self.retries >= self.min_retries + self.retry_ratio * self.requests:
+            return False
+        self.retries += 1
+        return True
+
+    def get_stats(self):
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'concurrency': int(self.limit),
+            'rate': round(self.bucket.rate, 2),
+            'latency': round(self.latency, 4) if self.latency is not None else None,
+        }
+
+
+class RateLimiter:
+    """Per-host request scheduler shared by every scraper through the AsyncFetcher
+
+    ``max_attempts`` bounds the tries of a single request. Backoff between
+    tries is full-jitter exponential, and a Retry-After from the server takes
+    precedence as long as it is no longer than ``max_retry_after``.
+    """
+
+    def __init__(self, rate=5.0, burst=5, concurrency=2, max_concurrency=8, adaptive=True,
+                 max_attempts=4, base_delay=0.5, max_delay=30.0, max_retry_after=120.0,
+                 retry_ratio=0.2):
+        self.host_options = {
+            'rate': rate, 'burst': burst, 'concurrency': concurrency,
+            'max_concurrency': max_concurrency, 'adaptive': adaptive, 'retry_ratio': retry_ratio,
+            'max_retry_after': max_retry_after,
+        }
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.hosts = {}
+
+    def host(self, url):
+        netloc = urlsplit(url).netloc
+        limiter = self.hosts.get(netloc)
+        if limiter is None:
+            limiter = self.hosts[netloc] = HostLimiter(netloc, **self.host_options)
+        return limiter
+
+    def backoff(self, attempt):
+        """Full-jitter exponential delay before retry number ``attempt`` (from 1)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def retry_delay(self, host, attempt, status=None, retry_after=None):
+        """Seconds to wait before trying again, or None if the request should not be retried"""
+        if attempt >= self.max_attempts:
+            return None
+        if status is not None and status not in RETRY_STATUSES:
+            return None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            return None
+        if not host.spend_retry():
+            return None
+        return retry_after if retry_after is not None else self.backoff(attempt)
+
+    def get_stats(self):
+        return {netloc: host.get_stats() for netloc, host in self.hosts.items()}
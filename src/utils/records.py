@@ -0,0 +1,133 @@
+# Compact bill records: one slotted object per bill, with repeated values shared
+import sys
+from collections.abc import MutableMapping
+
+# Every key a bill record has a slot for; others go to a small overflow dict
+FIELDS = (
+    'province', 'session', 'bill_number', 'title', 'title_en', 'title_fr', 'sponsor', 'member', 'status',
+    'committee', 'language', 'bill_url', 'bill_url_fr', 'source_url', 'scraped_date', 'readings', 'amendments',
+    'change_type'
+)
+_SLOTTED = frozenset(FIELDS)
+# Fields whose values repeat across many bills, so each distinct value is kept once
+INTERNED = frozenset(('province', 'session', 'sponsor', 'member', 'status', 'committee', 'language', 'change_type'))
+
+
+class BillRecord(MutableMapping):
+    """One scraped bill, with the dict interface the pipeline always used
+
+    ``bill['status']``, ``bill.get('session', '')``, ``{**bill}`` and
+    ``bill.update(details)`` all work, but the values live in slots instead
+    of a per-bill dict, and strings in the INTERNED fields are interned so a
+    status or province shared by thousands of bills is stored once. Keys that
+    were never set are absent, as they were in a dict. Use ``as_dict`` (or
+    ``json_default``) where a real dict is needed, e.g. for JSON.
+    """
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, *args, **fields):
+        if args:
+            self.update(*args)
+        # __setitem__ inlined: the table engine builds every record through here
+        extra = None
+        for name, value in fields.items():
+            if name in INTERNED and type(value) is str:
+                value = sys.intern(value)
+            if name in _SLOTTED:
+                setattr(self, name, value)
+            else:
+                if extra is None:
+                    extra = self._extra = getattr(self, '_extra', None) or {}
+                extra[name] = value
+
+    def __getitem__(self, name):
+        if name in _SLOTTED:
+            try:
+                return getattr(self, name)
+            except AttributeError:
+                raise KeyError(name) from None
+        extra = getattr(self, '_extra', None)
+        if extra is None or name not in extra:
+            raise KeyError(name)
+        return extra[name]
+
+    def __setitem__(self, name, value):
+        if name in INTERNED and type(value) is str:
+            value = sys.intern(value)
+        if name in _SLOTTED:
+            setattr(self, name, value)
+        else:
+            extra = getattr(self, '_extra', None)
+            if extra is None:
+                extra = self._extra = {}
+            extra[name] = value
+
+    def __delitem__(self, name):
+        if name in _SLOTTED and hasattr(self, name):
+            delattr(self, name)
+            return
+        extra = getattr(self, '_extra', None)
+        if extra is None or name not in extra:
+            raise KeyError(name)
+        del extra[name]
+
+    def keys(self):
+        keys = [name for name in FIELDS if hasattr(self, name)]
+        extra = getattr(self, '_extra', None)
+        return keys + list(extra) if extra else keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, name):
+        if name in _SLOTTED:
+            return hasattr(self, name)
+        extra = getattr(self, '_extra', None)
+        return extra is not None and name in extra
+
+    def get(self, name, default=None):
+        if name in _SLOTTED:
+            return getattr(self, name, default)
+        extra = getattr(self, '_extra', None)
+        return extra.get(name, default) if extra else default
+
+    def as_dict(self):
+        return {name: self[name] for name in self.keys()}
+
+    def copy(self):
+        return BillRecord(self)
+
+    def __repr__(self):
+        return f"BillRecord({self.as_dict()!r})"
+
+
+def json_default(value):
+    """``default`` hook for json.dump(s) so bill records serialise as objects"""
+    if isinstance(value, BillRecord):
+        return value.as_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_arrow(bills, fields, schema=None):
+    """Build a pyarrow Table of string columns, one per field, from bill records (or dicts)
+
+    This is the output boundary: records stay compact objects until here,
+    and ``to_arrow(...).to_pandas()`` gives a DataFrame where pandas is
+    installed. Requires pyarrow.
+    """
+    import pyarrow as pa
+
+    bills = bills if isinstance(bills, list) else list(bills)
+    slotted = all(type(bill) is BillRecord for bill in bills)
+    columns = {}
+    for field in fields:
+        if slotted and field in _SLOTTED:
+            values = [getattr(bill, field, None) for bill in bills]
+        else:
+            values = [bill.get(field) for bill in bills]
+        columns[field] = [value if value is None or type(value) is str else str(value) for value in values]
+    return pa.table(columns, schema=schema)
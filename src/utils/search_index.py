@@ -0,0 +1,249 @@
+# Full-text and faceted search index over scraped bills (SQLite FTS5)
+import heapq
+import os
+import re
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+from .incremental import bill_key
+
+# Facets counted for every search, each a column of the bills table
+FACETS = ('province', 'session', 'status')
+# Columns returned for each matching bill
+RESULT_COLUMNS = (
+    'bill_key', 'province', 'session', 'bill_number', 'title', 'title_en', 'title_fr', 'sponsor', 'status',
+    'bill_url', 'updated_at', 'withdrawn_at'
+)
+# Relevance weight of each full-text column, in bills_fts column order
+WEIGHTS = (5.0, 10.0, 10.0, 10.0, 2.0)
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(query):
+    """Turn free text typed into a search box into an FTS5 query
+
+    Every word has to match (the last one as a prefix, for search-as-you-type)
+    and FTS5 operators in the text are taken as plain words, so no input is a
+    syntax error. Returns None when the text has no words.
+    """
+    words = TOKEN.findall(query or '')
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class SearchIndex:
+    """Incremental inverted index of bills with facet counts, kept in its own SQLite database
+
+    Bills are upserted by province, session and bill number. A row is only
+    rewritten when a field it indexes changed, and the FTS5 index (titles,
+    bilingual Quebec titles, sponsor and bill number) only when searchable
+    text changed, so re-indexing a whole run's unchanged bills costs an
+    index lookup per bill. Withdrawn bills keep their row, marked with
+    ``withdrawn_at``, and are left out of searches unless asked for.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bills (
+            id INTEGER PRIMARY KEY,
+            bill_key TEXT NOT NULL UNIQUE,
+            province TEXT, session TEXT, bill_number TEXT, title TEXT, title_en TEXT, title_fr TEXT,
+            sponsor TEXT, status TEXT, bill_url TEXT, updated_at TEXT, withdrawn_at TEXT
+        );
+        -- One covering index led by each facet, so facet counts and filters never read the table
+        CREATE INDEX IF NOT EXISTS bills_by_province ON bills (province, session, status, withdrawn_at, updated_at);
+        CREATE INDEX IF NOT EXISTS bills_by_session ON bills (session, province, status, withdrawn_at, updated_at);
+        CREATE INDEX IF NOT EXISTS bills_by_status ON bills (status, province, session, withdrawn_at, updated_at);
+        CREATE INDEX IF NOT EXISTS bills_updated ON bills (updated_at);
+        CREATE VIRTUAL TABLE IF NOT EXISTS bills_fts USING fts5(
+            bill_number, title, title_en, title_fr, sponsor,
+            content='bills', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS bills_fts_insert AFTER INSERT ON bills BEGIN
+            INSERT INTO bills_fts (rowid, bill_number, title, title_en, title_fr, sponsor)
+            VALUES (new.id, new.bill_number, new.title, new.title_en, new.title_fr, new.sponsor);
+        END;
+        CREATE TRIGGER IF NOT EXISTS bills_fts_delete AFTER DELETE ON bills BEGIN
+            INSERT INTO bills_fts (bills_fts, rowid, bill_number, title, title_en, title_fr, sponsor)
+            VALUES ('delete', old.id, old.bill_number, old.title, old.title_en, old.title_fr, old.sponsor);
+        END;
+        CREATE TRIGGER IF NOT EXISTS bills_fts_update AFTER UPDATE ON bills
+        WHEN (old.bill_number, old.title, old.title_en, old.title_fr, old.sponsor)
+            IS NOT (new.bill_number, new.title, new.title_en, new.title_fr, new.sponsor)
+        BEGIN
+            INSERT INTO bills_fts (bills_fts, rowid, bill_number, title, title_en, title_fr, sponsor)
+            VALUES ('delete', old.id, old.bill_number, old.title, old.title_en, old.title_fr, old.sponsor);
+            INSERT INTO bills_fts (rowid, bill_number, title, title_en, title_fr, sponsor)
+            VALUES (new.id, new.bill_number, new.title, new.title_en, new.title_fr, new.sponsor);
+        END;
+    """
+
+    COLUMNS = ('province', 'session', 'bill_number', 'title', 'title_en', 'title_fr', 'sponsor', 'status', 'bill_url')
+
+    # Unchanged bills match the WHERE and are left alone, triggers and all
+    UPSERT = f"""
+        INSERT INTO bills (bill_key, {', '.join(COLUMNS)}, updated_at, withdrawn_at)
+        VALUES (:bill_key, {', '.join(':' + column for column in COLUMNS)}, :seen, NULL)
+        ON CONFLICT (bill_key) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in COLUMNS)},
+            updated_at = excluded.updated_at, withdrawn_at = NULL
+        WHERE ({', '.join(f'bills.{column}' for column in COLUMNS)}, bills.withdrawn_at)
+            IS NOT ({', '.join(f'excluded.{column}' for column in COLUMNS)}, NULL)
+    """
+
+    WITHDRAW = "UPDATE bills SET withdrawn_at = :seen WHERE bill_key = :bill_key AND withdrawn_at IS NULL"
+
+    def __init__(self, path='data/search_index.db'):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            # WAL lets the query API read while a scrape writes
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(self.SCHEMA)
+        return self._conn
+
+    def _row(self, bill):
+        row = {column: bill.get(column) or None for column in self.COLUMNS}
+        # BC and Alberta list the member who introduced a bill rather than a sponsor
+        row['sponsor'] = row['sponsor'] or bill.get('member') or None
+        row['bill_key'] = bill_key(bill)
+        row['seen'] = bill.get('scraped_date') or datetime.now().isoformat()
+        return row
+
+    def write(self, bills):
+        """Index a batch of bills; bills with ``change_type`` 'withdrawal' are marked withdrawn"""
+        # Without a bill number there is no key to upsert on
+        bills = [bill for bill in bills if bill.get('bill_number')]
+        sightings = [self._row(bill) for bill in bills if bill.get('change_type') != 'withdrawal']
+        withdrawals = [self._row(bill) for bill in bills if bill.get('change_type') == 'withdrawal']
+
+        # One transaction per batch
+        with self._connect() as conn:
+            conn.executemany(self.UPSERT, sightings)
+            conn.executemany(self.WITHDRAW, withdrawals)
+
+    def flush(self):
+        """Every batch is already committed"""
+
+    def _where(self, filters, include_withdrawn, skip=None):
+        """WHERE clause, with parameters, for facet filters
+
+        ``skip`` leaves one facet's own filter out, so its counts show what
+        picking another value would give.
+        """
+        clauses, params = [], []
+        for facet, values in filters.items():
+            if facet != skip:
+                clauses.append(f"b.{facet} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if not include_withdrawn:
+            clauses.append('b.withdrawn_at IS NULL')
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ''), params
+
+    def _bills(self, conn, ids):
+        """Result rows for bill ids, in the order given"""
+        cursor = conn.execute(
+            f"SELECT b.id, {', '.join('b.' + column for column in RESULT_COLUMNS)} FROM bills b "
+            f"WHERE b.id IN ({', '.join('?' * len(ids))})",
+            ids
+        )
+        rows = {row[0]: dict(zip(RESULT_COLUMNS, row[1:])) for row in cursor}
+        return [rows[bill_id] for bill_id in ids if bill_id in rows]
+
+    def search(self, query='', filters=None, limit=20, offset=0, include_withdrawn=False, facet_limit=50):
+        """Bills matching free text and facet filters, best match first, with facet counts
+
+        ``filters`` maps facet names to a value or a list of values (any of
+        which may match). Without query text bills come most recently changed
+        first. Returns ``{'total', 'bills', 'facets'}``, where each facet is a
+        list of ``{'value', 'count'}`` pairs, most frequent first.
+        """
+        filters = {
+            facet: [values] if isinstance(values, str) else list(values)
+            for facet, values in (filters or {}).items()
+            if values
+        }
+        unknown = set(filters) - set(FACETS)
+        if unknown:
+            raise ValueError(f"Unknown facets: {', '.join(sorted(unknown))}")
+
+        conn = self._connect()
+        match = match_expression(query)
+        if match is None:
+            total, ids, counts = self._browse(conn, filters, limit, offset, include_withdrawn, facet_limit)
+        else:
+            total, ids, counts = self._match(conn, match, filters, limit, offset, include_withdrawn)
+
+        facets = {
+            facet: [
+                {'value': value, 'count': count}
+                for value, count in sorted(
+                    ((value, count) for value, count in counts[facet].items() if value is not None),
+                    key=lambda item: (-item[1], item[0])
+                )
+            ][:facet_limit]
+            for facet in FACETS
+        }
+        return {'total': total, 'bills': self._bills(conn, ids), 'facets': facets}
+
+    def _browse(self, conn, filters, limit, offset, include_withdrawn, facet_limit):
+        """Filters only: counts come from the covering facet indexes, newest changes first"""
+        where, params = self._where(filters, include_withdrawn)
+        total = conn.execute(f"SELECT count(*) FROM bills b {where}", params).fetchone()[0]
+        ids = [
+            bill_id for bill_id, in conn.execute(
+                f"SELECT b.id FROM bills b {where} ORDER BY b.updated_at DESC, b.id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            )
+        ]
+        counts = {}
+        for facet in FACETS:
+            facet_where, facet_params = self._where(filters, include_withdrawn, skip=facet)
+            counts[facet] = dict(conn.execute(
+                f"SELECT b.{facet}, count(*) AS n FROM bills b {facet_where} GROUP BY b.{facet} "
+                f"ORDER BY n DESC LIMIT ?",
+                facet_params + [facet_limit + 1]
+            ))
+        return total, ids, counts
+
+    def _match(self, conn, match, filters, limit, offset, include_withdrawn):
+        """Text query: one pass over the matches tallies the total and every facet, ranked by bm25"""
+        cursor = conn.execute(
+            f"""
+            SELECT b.id, {', '.join('b.' + facet for facet in FACETS)}, bm25(bills_fts, {', '.join(map(str, WEIGHTS))})
+            FROM bills_fts JOIN bills b ON b.id = bills_fts.rowid
+            WHERE bills_fts MATCH ? {'' if include_withdrawn else 'AND b.withdrawn_at IS NULL'}
+            """,
+            (match,)
+        )
+        allowed = [(position, set(filters[facet])) for position, facet in enumerate(FACETS) if facet in filters]
+        counts = {facet: Counter() for facet in FACETS}
+        hits = []
+        for bill_id, *values, rank in cursor:
+            missed = [position for position, values_allowed in allowed if values[position] not in values_allowed]
+            if not missed:
+                hits.append((rank, bill_id))
+                for facet, value in zip(FACETS, values):
+                    counts[facet][value] += 1
+            elif len(missed) == 1:
+                # Fails only this facet's filter, so it counts towards the facet's other values
+                counts[FACETS[missed[0]]][values[missed[0]]] += 1
+        ids = [bill_id for _, bill_id in heapq.nsmallest(offset + limit, hits)[offset:]]
+        return len(hits), ids, counts
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.execute('PRAGMA optimize')
+            self._conn.close()
+            self._conn = None
+        return self.path
@@ -0,0 +1,339 @@
+# Streaming output sinks for scraped bills
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import os
+import re
+import sqlite3
+from collections import Counter
+from datetime import datetime
+
+from .incremental import bill_key
+from .records import json_default, to_arrow
+
+# Columns written by the tabular sinks; any other keys on a bill are dropped
+BILL_FIELDS = [
+    'province', 'session', 'bill_number', 'title', 'title_en', 'title_fr', 'sponsor', 'member', 'status',
+    'committee', 'language', 'bill_url', 'bill_url_fr', 'source_url', 'scraped_date', 'readings', 'change_type'
+]
+# Fields holding lists (reading stages and their dates), written as JSON text by the tabular sinks
+JSON_FIELDS = ('readings',)
+
+COMPRESSORS = {
+    None: (open, ''),
+    'gzip': (gzip.open, '.gz'),
+    'bz2': (bz2.open, '.bz2'),
+    'xz': (lzma.open, '.xz'),
+}
+
+
+def _compressed_path(path, compression):
+    if compression not in COMPRESSORS:
+        raise ValueError(f"Unsupported compression for text output: {compression}")
+    return path + COMPRESSORS[compression][1]
+
+
+def _open_text(path, compression):
+    opener, _ = COMPRESSORS[compression]
+    return opener(path, 'wt', encoding='utf-8', newline='')
+
+
+def flat_bill(bill):
+    """The bill with its JSON_FIELDS as JSON text, for sinks whose columns hold strings"""
+    values = {
+        field: json.dumps(bill[field], ensure_ascii=False)
+        for field in JSON_FIELDS
+        if bill.get(field) and not isinstance(bill[field], str)
+    }
+    return {**bill, **values} if values else bill
+
+
+class SummaryStats:
+    """Running counters kept while bills are written, instead of rebuilding a DataFrame"""
+
+    def __init__(self):
+        self.total_bills = 0
+        self.by_province = Counter()
+        self.by_status = Counter()
+        self.changes = Counter()
+
+    def update(self, bills):
+        for bill in bills:
+            self.total_bills += 1
+            self.by_province[bill.get('province', '')] += 1
+            self.by_status[bill.get('status', '')] += 1
+            if bill.get('change_type'):
+                self.changes[bill['change_type']] += 1
+
+    def as_dict(self):
+        stats = {
+            'total_bills': self.total_bills,
+            'by_province': dict(self.by_province),
+            'by_status': dict(self.by_status),
+            'latest_update': datetime.now().isoformat()
+        }
+        if self.changes:
+            stats['changes'] = dict(self.changes)
+        return stats
+
+
+class CsvSink:
+    """Append bills to a CSV file batch by batch"""
+
+    def __init__(self, path, compression=None):
+        self.path = _compressed_path(path, compression)
+        self.compression = compression
+        self._fh = None
+        self._writer = None
+
+    def write(self, bills):
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._fh = _open_text(self.path, self.compression)
+            self._writer = csv.DictWriter(self._fh, fieldnames=BILL_FIELDS, extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerows(flat_bill(bill) for bill in bills)
+
+    def flush(self):
+        if self._fh is not None:
+            self._fh.flush()
+
+    def close(self):
+        if self._fh is None:
+            # Nothing was scraped; still leave an empty file with a header
+            self.write([])
+        self._fh.close()
+        return self.path
+
+
+class JsonLinesSink:
+    """Append bills to a newline-delimited JSON file batch by batch"""
+
+    def __init__(self, path, compression=None):
+        self.path = _compressed_path(path, compression)
+        self.compression = compression
+        self._fh = None
+
+    def write(self, bills):
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._fh = _open_text(self.path, self.compression)
+        self._fh.writelines(json.dumps(bill, ensure_ascii=False, default=json_default) + '\n' for bill in bills)
+
+    def flush(self):
+        if self._fh is not None:
+            self._fh.flush()
+
+    def close(self):
+        if self._fh is None:
+            self.write([])
+        self._fh.close()
+        return self.path
+
+
+class ParquetSink:
+    """Write bills to Parquet partitioned by province and session
+
+    Each partition keeps one open writer, and every batch becomes a row group,
+    so memory is bounded by the batch size rather than the whole run. A
+    flush finishes the open files, and later batches go to new part files.
+    Requires pyarrow (``pip install provincial-scrapy[parquet]``).
+    """
+
+    def __init__(self, directory, compression='snappy'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow") from e
+
+        self.path = directory
+        self.compression = compression or 'none'
+        self._pq = pq
+        self._schema = pa.schema([(field, pa.string()) for field in BILL_FIELDS])
+        self._writers = {}
+        self._parts = Counter()
+
+    def _partition_path(self, province, session):
+        def clean(value):
+            return re.sub(r'[^\w.-]+', '_', value) or '_'
+        return os.path.join(self.path, f"province={clean(province)}", f"session={clean(session)}")
+
+    def write(self, bills):
+        partitions = {}
+        for bill in bills:
+            partitions.setdefault((bill.get('province', ''), bill.get('session', '')), []).append(bill)
+
+        for key, rows in partitions.items():
+            writer = self._writers.get(key)
+            if writer is None:
+                directory = self._partition_path(*key)
+                os.makedirs(directory, exist_ok=True)
+                writer = self._pq.ParquetWriter(
+                    os.path.join(directory, f'part-{self._parts[key]}.parquet'), self._schema,
+                    compression=self.compression
+                )
+                self._parts[key] += 1
+                self._writers[key] = writer
+
+            writer.write_table(to_arrow([flat_bill(bill) for bill in rows], BILL_FIELDS, self._schema))
+
+    def flush(self):
+        """Parquet files only become readable when closed, so close the open ones"""
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def close(self):
+        self.flush()
+        os.makedirs(self.path, exist_ok=True)
+        return self.path
+
+
+def _store_row(bill):
+    """Named parameters for the SQLite statements"""
+    bill = flat_bill(bill)
+    row = {column: bill.get(column) or '' for column in SqliteSink.COLUMNS}
+    row['bill_key'] = bill_key(bill)
+    row['seen'] = bill.get('scraped_date') or datetime.now().isoformat()
+    return row
+
+
+class SqliteSink:
+    """Upsert bills into a persistent SQLite database instead of writing a file per run
+
+    Bills are keyed by province, session and bill number, so every run
+    updates the same rows. Each status change (including a bill's first
+    sighting and incremental-mode withdrawals) is appended to
+    ``status_history``, which makes "what changed since yesterday" an indexed
+    query rather than a diff of two dumps.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bills (
+            bill_key TEXT PRIMARY KEY,
+            province TEXT, session TEXT, bill_number TEXT, title TEXT, title_en TEXT, title_fr TEXT,
+            sponsor TEXT, member TEXT, status TEXT, committee TEXT, language TEXT, bill_url TEXT,
+            bill_url_fr TEXT, source_url TEXT, readings TEXT, first_seen TEXT, last_seen TEXT, withdrawn_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS bills_number ON bills (province, session, bill_number);
+        CREATE INDEX IF NOT EXISTS bills_status ON bills (status);
+        CREATE TABLE IF NOT EXISTS status_history (
+            bill_key TEXT, old_status TEXT, new_status TEXT, changed_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS status_history_changed ON status_history (changed_at);
+        CREATE INDEX IF NOT EXISTS status_history_bill ON status_history (bill_key, changed_at);
+    """
+
+    COLUMNS = [
+        'province', 'session', 'bill_number', 'title', 'title_en', 'title_fr', 'sponsor', 'member', 'status',
+        'committee', 'language', 'bill_url', 'bill_url_fr', 'source_url', 'readings'
+    ]
+
+    # Recorded before the upsert so the old status is still in place; no-op when unchanged
+    RECORD_CHANGE = """
+        INSERT INTO status_history (bill_key, old_status, new_status, changed_at)
+        SELECT :bill_key, (SELECT status FROM bills WHERE bill_key = :bill_key), :status, :seen
+        WHERE NOT EXISTS (SELECT 1 FROM bills WHERE bill_key = :bill_key AND status IS :status)
+    """
+
+    UPSERT = f"""
+        INSERT INTO bills (bill_key, {', '.join(COLUMNS)}, first_seen, last_seen, withdrawn_at)
+        VALUES (:bill_key, {', '.join(':' + column for column in COLUMNS)}, :seen, :seen, NULL)
+        ON CONFLICT (bill_key) DO UPDATE SET
+            {', '.join(f'{column} = excluded.{column}' for column in COLUMNS)},
+            last_seen = excluded.last_seen, withdrawn_at = NULL
+    """
+
+    RECORD_WITHDRAWAL = """
+        INSERT INTO status_history (bill_key, old_status, new_status, changed_at)
+        SELECT :bill_key, status, 'Withdrawn', :seen FROM bills
+        WHERE bill_key = :bill_key AND withdrawn_at IS NULL
+    """
+
+    WITHDRAW = "UPDATE bills SET withdrawn_at = :seen WHERE bill_key = :bill_key AND withdrawn_at IS NULL"
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(self.SCHEMA)
+            self._add_missing_columns()
+        return self._conn
+
+    def _add_missing_columns(self):
+        """Bring a database created before a column was added up to the current schema"""
+        existing = {row[1] for row in self._conn.execute('PRAGMA table_info(bills)')}
+        with self._conn:
+            for column in self.COLUMNS:
+                if column not in existing:
+                    self._conn.execute(f'ALTER TABLE bills ADD COLUMN {column} TEXT')
+
+    def write(self, bills):
+        conn = self._connect()
+        sightings = [_store_row(bill) for bill in bills if bill.get('change_type') != 'withdrawal']
+        withdrawals = [_store_row(bill) for bill in bills if bill.get('change_type') == 'withdrawal']
+
+        # One transaction per batch
+        with conn:
+            conn.executemany(self.RECORD_CHANGE, sightings)
+            conn.executemany(self.UPSERT, sightings)
+            conn.executemany(self.RECORD_WITHDRAWAL, withdrawals)
+            conn.executemany(self.WITHDRAW, withdrawals)
+
+    def flush(self):
+        """Every batch is already committed"""
+
+    def changes_since(self, since):
+        """Status changes recorded at or after an ISO timestamp, newest first"""
+        cursor = self._connect().execute(
+            """
+            SELECT b.province, b.session, b.bill_number, b.title, h.old_status, h.new_status, h.changed_at
+            FROM status_history h JOIN bills b ON b.bill_key = h.bill_key
+            WHERE h.changed_at >= ?
+            ORDER BY h.changed_at DESC
+            """,
+            (since,)
+        )
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def close(self):
+        if self._conn is None:
+            # Nothing was scraped; still leave a database with the schema
+            self._connect()
+        self._conn.close()
+        self._conn = None
+        return self.path
+
+
+def open_sink(output_format, name, compression=None, directory='.'):
+    """Create a sink for the given format with a timestamped output name
+
+    The SQLite store is a single database updated in place by every run, so
+    it is not timestamped; NocoDB is configured from the environment.
+    """
+    if output_format == 'nocodb':
+        from .nocodb import NocoDbSink
+        return NocoDbSink.from_env()
+    if output_format == 'sqlite':
+        if compression is not None:
+            raise ValueError("The SQLite store does not support compression")
+        return SqliteSink(os.path.join(directory, 'canadian_provincial_bills.db'))
+
+    stem = os.path.join(directory, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    if output_format == 'csv':
+        return CsvSink(stem + '.csv', compression)
+    if output_format == 'jsonl':
+        return JsonLinesSink(stem + '.jsonl', compression)
+    if output_format == 'parquet':
+        return ParquetSink(stem, compression)
+    raise ValueError(f"Unknown output format: {output_format}")
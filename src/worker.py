@@ -0,0 +1,48 @@
+# Distributed scraping worker: pulls work units from the Redis job queue
+import argparse
+import asyncio
+from .main import build_scrapers
+from .utils.fetcher import AsyncFetcher
+from .utils.http_cache import HttpCache
+from .utils.job_queue import JobQueue, connect, run_worker
+from .utils.metrics import RunMetrics
+from .utils.parse_pool import ParsePool
+
+
+async def work(redis_url, slots, prefix, visibility_timeout, parse_pool=None, metrics=None):
+    """Run jobs from the queue until interrupted"""
+    fetcher = AsyncFetcher(cache=HttpCache(), parse_pool=parse_pool, metrics=metrics)
+    queue = JobQueue(connect(redis_url), prefix=prefix, visibility_timeout=visibility_timeout)
+    async with fetcher:
+        await run_worker(queue, build_scrapers(fetcher), slots)
+
+
+def main():
+    """Entry point for a worker process or container"""
+    parser = argparse.ArgumentParser(description='Run scraping jobs from the distributed job queue')
+    parser.add_argument('--redis', default='redis://localhost:6379/0', help='Redis URL shared with the orchestrator')
+    parser.add_argument('--slots', type=int, default=4, help='jobs to run at once in this process')
+    parser.add_argument('--prefix', default='provincial', help='key prefix of the queue')
+    parser.add_argument('--visibility-timeout', type=int, default=300,
+                        help='seconds before a job held by an unresponsive worker is handed out again')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='parse pages in this many worker processes (default: parse on the event loop)')
+    parser.add_argument('--metrics-dir', default='data/metrics',
+                        help='directory for the metrics.prom and JSON run report written when the worker stops')
+    args = parser.parse_args()
+
+    parse_pool = ParsePool(args.parse_workers) if args.parse_workers else None
+    metrics = RunMetrics()
+    print(f"Worker started with {args.slots} slots on {args.redis}")
+    try:
+        asyncio.run(work(args.redis, args.slots, args.prefix, args.visibility_timeout, parse_pool, metrics))
+    except KeyboardInterrupt:
+        print("Worker stopped")
+    finally:
+        if parse_pool is not None:
+            parse_pool.close()
+        print(f"Run report: {metrics.write(args.metrics_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# Backfill checkpoints and resume
+import asyncio
+
+from src.utils.backfill import CheckpointStore, Commit, run_backfill
+
+
+def test_checkpoints_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'backfill' / 'checkpoint.jsonl')
+    store = CheckpointStore(path)
+    store.mark_done('https://example.org/40-1', bills=12)
+    store.mark_done('https://example.org/41-1')
+
+    assert CheckpointStore(path).completed == {'https://example.org/40-1', 'https://example.org/41-1'}
+
+
+def test_a_line_cut_short_by_a_crash_runs_again(tmp_path):
+    path = tmp_path / 'checkpoint.jsonl'
+    CheckpointStore(str(path)).mark_done('https://example.org/40-1')
+    with open(path, 'a', encoding='utf-8') as fh:
+        fh.write('{"unit": "https://example.org/4')
+
+    store = CheckpointStore(str(path))
+    assert store.is_done('https://example.org/40-1')
+    assert not store.is_done('https://example.org/41-1')
+
+
+def backfill(units, checkpoint, commit=True, fail=()):
+    """Run a backfill over ``units``, returning its bills and how many Commit markers came out"""
+    async def scrape_unit(unit):
+        if unit in fail:
+            raise ValueError('listing changed')
+        for n in range(2):
+            await asyncio.sleep(0)
+            yield {'unit': unit, 'bill_number': str(n)}
+
+    async def main():
+        bills, commits = [], 0
+        async for item in run_backfill(units, scrape_unit, checkpoint, workers=2):
+            if isinstance(item, Commit):
+                commits += 1
+                if commit:
+                    item()
+            else:
+                bills.append(item)
+        return bills, commits
+    return asyncio.run(main())
+
+
+def test_resume_skips_checkpointed_units(tmp_path):
+    path = str(tmp_path / 'checkpoint.jsonl')
+    checkpoint = CheckpointStore(path)
+    checkpoint.mark_done('a')
+
+    bills, commits = backfill(['a', 'b', 'c'], checkpoint)
+    assert sorted({bill['unit'] for bill in bills}) == ['b', 'c']
+    assert commits == 2
+    assert CheckpointStore(path).completed == {'a', 'b', 'c'}
+
+
+def test_units_are_checkpointed_only_once_their_commit_is_called(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.jsonl'))
+    bills, commits = backfill(['a', 'b'], checkpoint, commit=False)
+
+    assert len(bills) == 4 and commits == 2
+    assert checkpoint.completed == set()
+
+
+def test_a_failed_unit_is_left_for_the_next_run(tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / 'checkpoint.jsonl'))
+    bills, commits = backfill(['a', 'b'], checkpoint, fail={'b'})
+
+    assert {bill['unit'] for bill in bills} == {'a'}
+    assert checkpoint.completed == {'a'}
@@ -0,0 +1,82 @@
+# HttpCache revalidation, derived parse results and eviction
+import asyncio
+import os
+
+from benchmarks.stub_sites import StubLegislature, point_scraper_at
+from src.scrapers.ontario_bills_scraper import OntarioBillsScraper
+from src.utils.fetcher import AsyncFetcher
+from src.utils.http_cache import HttpCache
+
+
+def scrape_listing_twice(cache_dir):
+    """Scrape the Ontario stub listing twice through one cache, returning both runs and the fetcher"""
+    async def main():
+        site = await StubLegislature('ontario', n_bills=5, latency=0).start()
+        try:
+            async with AsyncFetcher(cache=HttpCache(str(cache_dir))) as fetcher:
+                scraper = OntarioBillsScraper(fetcher)
+                point_scraper_at('ontario', scraper, site.url)
+                first = [bill async for bill in scraper.scrape_table(scraper.base_url)]
+                for bill in first:
+                    bill['status'] = 'changed downstream'
+                await asyncio.sleep(0.01)
+                second = [bill async for bill in scraper.scrape_table(scraper.base_url)]
+                return first, second, fetcher, site.not_modified
+        finally:
+            await site.stop()
+    return asyncio.run(main())
+
+
+def test_unchanged_listing_is_not_reparsed(tmp_path):
+    first, second, fetcher, not_modified = scrape_listing_twice(tmp_path)
+
+    assert not_modified == 1
+    assert sum(value for (name, _), value in fetcher.metrics.counters.items() if name == 'pages_parsed') == 1
+    assert [bill['bill_number'] for bill in second] == [bill['bill_number'] for bill in first]
+    # The reused rows are this run's, untouched by what was done to the first run's records
+    assert all(bill['status'] != 'changed downstream' for bill in second)
+    assert second[0]['scraped_date'] > first[0]['scraped_date']
+
+
+def store(cache, url, body):
+    cache.store(url, body, {'ETag': '"%s"' % url})
+
+
+def test_eviction_keeps_bodies_under_max_bytes(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=250)
+    for n in range(5):
+        store(cache, f"https://example.org/{n}", b'x' * 100)
+
+    assert cache.evictions == 3
+    assert cache.lookup('https://example.org/0') is None
+    assert cache.lookup('https://example.org/4') is not None
+    assert cache._bytes == sum(os.path.getsize(path) for path in tmp_path.glob('*.body')) == 200
+
+
+def test_replacing_an_entry_does_not_count_it_twice(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=250)
+    for _ in range(5):
+        store(cache, 'https://example.org/same', b'x' * 100)
+
+    assert cache.evictions == 0
+    assert cache._bytes == 100
+
+
+def test_running_total_survives_a_restart(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=250)
+    store(cache, 'https://example.org/a', b'x' * 100)
+    store(cache, 'https://example.org/b', b'x' * 100)
+
+    reopened = HttpCache(str(tmp_path), max_bytes=250)
+    store(reopened, 'https://example.org/c', b'x' * 100)
+    assert reopened.evictions == 1
+    assert reopened.lookup('https://example.org/a') is None
+
+
+def test_revalidating_an_evicted_entry_asks_for_a_refetch(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=150)
+    store(cache, 'https://example.org/a', b'x' * 100)
+    store(cache, 'https://example.org/b', b'x' * 100)
+
+    assert cache.revalidated('https://example.org/a') is None
+    assert cache.revalidated('https://example.org/b') == b'x' * 100
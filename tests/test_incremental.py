@@ -0,0 +1,71 @@
+# Change detection between runs
+from src.main import CanadianProvincialBillsScraper
+from src.utils.fetcher import AsyncFetcher
+from src.utils.incremental import FingerprintStore, bill_key
+from src.utils.sinks import JsonLinesSink
+
+
+def bill(number, status='First Reading', province='Ontario', session='44-1'):
+    return {'province': province, 'session': session, 'bill_number': str(number), 'title': f'Act {number}',
+            'status': status}
+
+
+def test_observe_classifies_changes(tmp_path):
+    path = str(tmp_path / 'fingerprints.json')
+    store = FingerprintStore(path)
+    assert [store.observe(bill(n)) for n in (1, 2)] == ['insert', 'insert']
+    store.save()
+
+    store = FingerprintStore(path)
+    assert store.observe(bill(1)) is None
+    assert store.observe(bill(3)) == 'insert'
+    assert store.observe(bill(1, status='Second Reading')) == 'update'
+    assert [entry['bill_number'] for entry in store.withdrawals({'Ontario'})] == ['2']
+    assert store.withdrawals({'Quebec'}) == []
+
+
+def test_save_keeps_provinces_that_were_not_committed(tmp_path):
+    path = str(tmp_path / 'fingerprints.json')
+    store = FingerprintStore(path)
+    for number in (1, 2, 3):
+        store.observe(bill(number))
+    store.observe(bill(1, province='Quebec'))
+    store.save()
+
+    # Ontario fails part way through the next run
+    store = FingerprintStore(path)
+    store.observe(bill(1))
+    store.observe(bill(2, province='Quebec'))
+    store.save({'Quebec'})
+
+    saved = FingerprintStore(path).previous
+    assert sorted(key for key in saved if key.startswith('Ontario')) == [bill_key(bill(n)) for n in (1, 2, 3)]
+    assert sorted(key for key in saved if key.startswith('Quebec')) == [bill_key(bill(2, province='Quebec'))]
+
+
+def test_bill_key_without_a_number():
+    untitled = {'province': 'Alberta', 'session': '31-1', 'bill_number': '', 'bill_url': 'https://example.org/a'}
+    assert bill_key(untitled) == 'Alberta|31-1|https://example.org/a'
+    assert bill_key(dict(untitled, bill_url='', title='Supply Act')) == 'Alberta|31-1|Supply Act'
+
+
+def finish_run(tmp_path, mode, bills):
+    pipeline = CanadianProvincialBillsScraper(
+        AsyncFetcher(), incremental=True, sink=JsonLinesSink(str(tmp_path / f'{mode}.jsonl')), provinces=['ontario']
+    )
+    pipeline.fingerprints = FingerprintStore(str(tmp_path / 'fingerprints.json'))
+    pipeline.mode = mode
+    pipeline.scraped_provinces.add('Ontario')
+    changes = pipeline.emit(bills)
+    pipeline.save_to_database()
+    return changes, pipeline.stats.changes
+
+
+def test_historical_run_leaves_current_fingerprints(tmp_path):
+    current = [bill(n) for n in (1, 2)]
+    finish_run(tmp_path, 'current', current)
+    finish_run(tmp_path, 'historical', [bill(n, session='40-1') for n in range(1, 6)])
+
+    changes, events = finish_run(tmp_path, 'current', current)
+    assert changes == 0
+    assert not events
@@ -0,0 +1,86 @@
+# Job queue leases, retries and per-run deduplication
+import asyncio
+
+from src.utils.job_queue import InMemoryRedis, JobQueue
+
+
+def run(steps, **options):
+    """Run ``steps(queue)`` against a fresh in-memory queue"""
+    return asyncio.run(steps(JobQueue(InMemoryRedis(), **options)))
+
+
+def test_a_url_is_queued_once_per_run():
+    async def steps(queue):
+        first = await queue.enqueue('detail', 'ontario', 'https://example.org/1')
+        again = await queue.enqueue('detail', 'ontario', 'https://example.org/1')
+        other_run = JobQueue(queue.redis, run_id='other')
+        return first, again, await other_run.enqueue('detail', 'ontario', 'https://example.org/1')
+
+    first, again, other_run = run(steps)
+    assert first is not None and again is None and other_run is not None
+
+
+def test_completed_job_reports_back_to_its_run():
+    async def steps(queue):
+        await queue.enqueue('listing', 'ontario')
+        job = await queue.claim()
+        await queue.complete(job, bills=[[{'bill_number': '1'}, None]])
+        result = await queue.next_result(timeout=0.1)
+        # Finished jobs may be queued again by the same run
+        requeued = await queue.enqueue('listing', 'ontario')
+        return result, requeued, await queue.redis.llen(queue.processing_key)
+
+    result, requeued, processing = run(steps)
+    assert result['bills'] == [[{'bill_number': '1'}, None]] and result['error'] is None
+    assert requeued is not None
+    assert processing == 0
+
+
+def test_an_expired_lease_is_requeued():
+    async def steps(queue):
+        await queue.enqueue('detail', 'ontario', 'https://example.org/1')
+        crashed = await queue.claim()
+        requeued = await queue.requeue_expired()
+        retried = await queue.claim()
+        return crashed, requeued, retried
+
+    crashed, requeued, retried = run(steps, visibility_timeout=0)
+    assert requeued == 1
+    assert retried['id'] == crashed['id'] and retried['attempts'] == 1
+
+
+def test_a_live_lease_is_left_alone():
+    async def steps(queue):
+        await queue.enqueue('detail', 'ontario', 'https://example.org/1')
+        job = await queue.claim()
+        await queue.extend(job)
+        return await queue.requeue_expired(), await queue.claim()
+
+    assert run(steps, visibility_timeout=60) == (0, None)
+
+
+def test_a_job_out_of_attempts_reports_its_error():
+    async def steps(queue):
+        await queue.enqueue('detail', 'ontario', 'https://example.org/1')
+        for _ in range(2):
+            await queue.fail(await queue.claim(), 'HTTP 500')
+        return await queue.claim(), await queue.next_result(timeout=0.1)
+
+    leftover, result = run(steps, max_attempts=2)
+    assert leftover is None
+    assert result['error'] == 'HTTP 500' and result['job']['attempts'] == 2
+
+
+def test_a_late_finish_does_not_run_the_job_again():
+    async def steps(queue):
+        await queue.enqueue('detail', 'ontario', 'https://example.org/1')
+        slow = await queue.claim()
+        await queue.requeue_expired()
+        # The slow worker finishes after its job was handed back to the pending list
+        await queue.complete(slow, details={'status': 'Royal Assent'})
+        return await queue.claim(), await queue.next_result(timeout=0.1), await queue.next_result(timeout=0.05)
+
+    reclaimed, result, duplicate = run(steps, visibility_timeout=0)
+    assert reclaimed is None
+    assert result['details'] == {'status': 'Royal Assent'}
+    assert duplicate is None
@@ -0,0 +1,29 @@
+# Stage timings recorded into RunMetrics
+import asyncio
+import time
+
+from benchmarks.stub_sites import StubLegislature
+from src.utils.fetcher import AsyncFetcher
+
+
+def slow_rows(content, rows):
+    for n in range(rows):
+        time.sleep(0.01)
+        yield {'bill_number': str(n)}
+
+
+def test_parse_seconds_covers_a_generator_parser():
+    async def main():
+        site = await StubLegislature('ontario', latency=0).start()
+        try:
+            async with AsyncFetcher() as fetcher:
+                return fetcher, await fetcher.get_parsed(f"{site.url}/listing", slow_rows, 3)
+        finally:
+            await site.stop()
+    fetcher, bills = asyncio.run(main())
+
+    assert [bill['bill_number'] for bill in bills] == ['0', '1', '2']
+    histograms = {name: (labels, histogram) for (name, labels), histogram in fetcher.metrics.histograms.items()}
+    labels, histogram = histograms['parse_seconds']
+    assert ('parser', 'slow_rows') in labels
+    assert histogram.count == 1 and histogram.sum >= 0.03
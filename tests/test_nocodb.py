@@ -0,0 +1,85 @@
+# NocoDB sync against the local stub of its records API
+import asyncio
+import json
+import threading
+
+import pytest
+
+from benchmarks.stub_nocodb import StubNocoDb
+from src.utils.nocodb import NocoDbSink
+
+READINGS = [{'stage': 'First Reading', 'date': 'March 4, 2025'}]
+
+
+@pytest.fixture
+def stub():
+    # The stub runs on its own loop thread, as a real server is independent of the sink's loop
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = asyncio.run_coroutine_threadsafe(StubNocoDb(latency=0).start(), loop).result()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def bills(status='First Reading'):
+    return [
+        {'province': 'Saskatchewan', 'session': '30-1', 'bill_number': '1', 'title': 'The Economy Act',
+         'status': status, 'readings': READINGS, 'scraped_date': '2026-01-01T00:00:00'},
+        {'province': 'Quebec', 'session': '43-1', 'bill_number': '7', 'title': 'An Act respecting matter 7',
+         'title_en': 'An Act respecting matter 7', 'title_fr': 'Loi concernant la matière 7',
+         'bill_url_fr': 'https://example.org/fr/7', 'status': status, 'scraped_date': '2026-01-01T00:00:00'},
+    ]
+
+
+def sync(stub, state_path, batch):
+    sink = NocoDbSink(stub.url, stub.token, 'bills', batch_size=10, state_path=str(state_path))
+    sink.write(batch)
+    sink.close()
+    return sink.stats
+
+
+def rows(stub):
+    return {row['bill_number']: row for row in stub.rows.values()}
+
+
+def test_only_new_and_changed_bills_are_sent(stub, tmp_path):
+    state = tmp_path / 'nocodb_state.json'
+    assert sync(stub, state, bills())['inserted'] == 2
+    assert sync(stub, state, bills())['unchanged'] == 2
+
+    stats = sync(stub, state, bills(status='Second Reading'))
+    assert (stats['updated'], stats['unchanged']) == (2, 0)
+    assert {row['status'] for row in rows(stub).values()} == {'Second Reading'}
+    assert len(stub.rows) == 2
+
+
+def test_bilingual_titles_and_readings_are_synced(stub, tmp_path):
+    sync(stub, tmp_path / 'nocodb_state.json', bills())
+    stored = rows(stub)
+    assert json.loads(stored['1']['readings']) == READINGS
+    assert stored['7']['title_en'] == 'An Act respecting matter 7'
+    assert stored['7']['title_fr'] == 'Loi concernant la matière 7'
+    assert stored['7']['bill_url_fr'] == 'https://example.org/fr/7'
+
+
+def test_withdrawal_marks_the_row(stub, tmp_path):
+    state = tmp_path / 'nocodb_state.json'
+    sync(stub, state, bills())
+
+    withdrawal = {**bills()[1], 'change_type': 'withdrawal', 'scraped_date': '2026-01-02T00:00:00'}
+    assert sync(stub, state, [withdrawal])['updated'] == 1
+    assert rows(stub)['7']['withdrawn_at'] == '2026-01-02T00:00:00'
+
+    # Listed again: the mark is cleared
+    assert sync(stub, state, bills()[1:])['updated'] == 1
+    assert rows(stub)['7']['withdrawn_at'] == ''
+
+
+def test_state_is_rebuilt_from_the_table(stub, tmp_path):
+    sync(stub, tmp_path / 'nocodb_state.json', bills())
+    stats = sync(stub, tmp_path / 'other_state.json', bills())
+    assert (stats['inserted'], stats['unchanged']) == (0, 2)
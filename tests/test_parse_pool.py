@@ -0,0 +1,65 @@
+# Parsing pages in worker processes
+import asyncio
+
+from benchmarks.stub_sites import listing_html
+from src.scrapers.table import parse_listing
+from src.utils.parse_pool import ParsePool, ParsePoolError
+
+
+def broken(content):
+    raise ValueError('no bills table')
+
+
+class Parser:
+    def rows(self, content):
+        yield from content.split()
+
+
+def stable(results):
+    """Parsed records without the parse time, which differs between processes"""
+    return [[{k: v for k, v in bill.items() if k != 'scraped_date'} for bill in bills] for bills in results]
+
+
+def parse_all(pool, calls):
+    async def main():
+        try:
+            return await asyncio.gather(*(pool.run(parse, content, *args) for parse, content, args in calls))
+        finally:
+            pool.close()
+    return asyncio.run(main())
+
+
+def test_pool_results_match_parsing_inline():
+    pages = [listing_html(province, 20).encode('utf-8') for province in ('ontario', 'manitoba', 'bc')]
+    calls = [(parse_listing, page, (province,)) for page, province in zip(pages, ('ontario', 'manitoba', 'bc'))]
+
+    pooled = parse_all(ParsePool(workers=2, batch_size=2), calls)
+    inline = [list(parse_listing(page, province)) for parse, page, (province,) in calls]
+    assert stable(pooled) == stable(inline)
+    assert all(len(bills) == 20 for bills in pooled)
+
+
+def test_bound_methods_are_parsed_inline():
+    assert parse_all(ParsePool(workers=1), [(Parser().rows, 'a b', ())]) == [['a', 'b']]
+
+
+def test_a_failed_page_raises_without_failing_its_batch():
+    async def main():
+        pool = ParsePool(workers=1, batch_size=2)
+        try:
+            return await asyncio.gather(
+                pool.run(broken, b''), pool.run(parse_listing, listing_html('ontario', 3).encode('utf-8'), 'ontario'),
+                return_exceptions=True
+            )
+        finally:
+            pool.close()
+    error, bills = asyncio.run(main())
+
+    assert isinstance(error, ParsePoolError) and 'no bills table' in str(error)
+    assert len(bills) == 3
+
+
+def test_a_partial_batch_is_sent_after_max_delay():
+    page = listing_html('ontario', 3).encode('utf-8')
+    results = parse_all(ParsePool(workers=1, batch_size=16, max_delay=0.01), [(parse_listing, page, ('ontario',))])
+    assert len(results[0]) == 3
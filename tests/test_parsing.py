@@ -0,0 +1,25 @@
+# Page bytes are decoded the way the legislature sites encode them
+from src.scrapers import specs  # noqa: F401  (registers the province specs)
+from src.scrapers.table import parse_listing
+from src.utils.parsing import parse_html, text
+
+FRENCH_ROW = '<tr><td><a href="/fr/detail/5">Projet de loi n° 5 Loi concernant la matière 5</a></td></tr>'
+
+
+def test_utf8_page_without_a_declared_charset():
+    page = f'<html><body><table>{FRENCH_ROW}</table></body></html>'.encode('utf-8')
+    assert 'n° 5' in text(parse_html(page))
+
+    bill, = parse_listing(page, 'quebec', 'https://example.org/fr', 'fr')
+    assert bill['bill_number'] == '5'
+    assert bill['title'].endswith('la matière 5')
+
+
+def test_declared_charset_is_honoured():
+    page = f'<html><head><meta charset="iso-8859-1"></head><body>{FRENCH_ROW}</body></html>'.encode('latin-1')
+    assert 'n° 5' in text(parse_html(page))
+
+
+def test_undeclared_windows_1252_page():
+    page = f'<html><body>{FRENCH_ROW}</body></html>'.encode('cp1252')
+    assert 'matière 5' in text(parse_html(page))
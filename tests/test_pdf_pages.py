@@ -0,0 +1,55 @@
+# Saskatchewan progress-of-bills PDF extraction and its page cache
+import io
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from src.scrapers.saskatchewan_bills_scraper import parse_progress_page
+from src.utils.pdf_pages import PdfPageCache
+
+
+def pdf(*pages):
+    """A PDF with one line of text per page"""
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+    })
+    for line in pages:
+        page = writer.add_blank_page(612, 792)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font})
+        })
+        stream = DecodedStreamObject()
+        stream.set_data(f'BT /F1 10 Tf 40 700 Td ({line}) Tj ET'.encode('latin-1'))
+        page.replace_contents(stream)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+FIRST = '12 The Economy Act Mar 4, 2025 Mar 11, 2025 Economy'
+SECOND = '13 The Water Act Apr 1, 2025'
+
+
+def test_progress_rows(tmp_path):
+    cache = PdfPageCache(str(tmp_path / 'pages.json'))
+    rows = cache.extract(pdf(FIRST, SECOND), parse_progress_page)
+
+    assert [row['bill_number'] for row in rows] == ['12', '13']
+    assert rows[0]['readings'] == [
+        {'stage': 'First Reading', 'date': 'Mar 4, 2025'}, {'stage': 'Second Reading', 'date': 'Mar 11, 2025'}
+    ]
+    assert rows[0]['committee'] == 'Economy'
+    assert rows[1]['committee'] == ''
+
+
+def test_unchanged_pages_are_reused(tmp_path):
+    path = str(tmp_path / 'pages.json')
+    PdfPageCache(path).extract(pdf(FIRST, SECOND), parse_progress_page)
+
+    cache = PdfPageCache(path)
+    rows = cache.extract(pdf(FIRST, '13 The Water Act Apr 1, 2025 Apr 8, 2025'), parse_progress_page)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(rows[1]['readings']) == 2
@@ -0,0 +1,48 @@
+# Profiles broken down by province scraper
+import asyncio
+import time
+
+from benchmarks.stub_sites import StubLegislature, point_scraper_at
+from src.scrapers.registry import ScraperRegistry
+from src.utils.fetcher import AsyncFetcher
+from src.utils.profiling import ScrapeProfiler
+
+
+def profile(profiler, provinces, seconds=0.3):
+    """Scrape each province's stub listing through its own scraper, by turns, for a while"""
+    async def scrape():
+        sites = {province: await StubLegislature(province, 200, latency=0).start() for province in provinces}
+        try:
+            async with AsyncFetcher() as fetcher:
+                scrapers = ScraperRegistry(fetcher, provinces)
+                for province in provinces:
+                    point_scraper_at(province, scrapers[province], sites[province].url)
+                profiler.attach({province: scrapers[province] for province in provinces})
+                profiler.start()
+                deadline = time.perf_counter() + seconds
+                while time.perf_counter() < deadline:
+                    for province in provinces:
+                        scraper = scrapers[province]
+                        [bill async for bill in scraper.scrape_table(scraper.base_url)]
+                return profiler.stop()
+        finally:
+            for site in sites.values():
+                await site.stop()
+
+    return asyncio.run(scrape())
+
+
+def test_sample_profile_attributes_spec_driven_scrapers():
+    # Both are a spec run by the shared table engine, with no code of their own
+    provinces = profile(ScrapeProfiler('sample', interval=0.001), ('ontario', 'manitoba'))['provinces']
+    assert set(provinces) == {'ontario', 'manitoba'}
+    for summary in provinces.values():
+        assert summary['samples'] > 0
+        assert summary['hottest']
+
+
+def test_cprofile_breaks_down_by_province(tmp_path):
+    summary = profile(ScrapeProfiler('cprofile', directory=str(tmp_path), interval=0.001), ('ontario',))
+    assert summary['hottest']
+    assert summary['file'].startswith(str(tmp_path))
+    assert list(summary['provinces']) == ['ontario']
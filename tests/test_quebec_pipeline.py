@@ -0,0 +1,156 @@
+# Quebec bills reach the pipeline as bilingual records in every run mode
+import asyncio
+import csv
+import json
+import sqlite3
+
+from aiohttp import web
+
+from benchmarks.stub_sites import STATUSES, detail_html
+from src.main import CanadianProvincialBillsScraper
+from src.utils.fetcher import AsyncFetcher
+from src.utils.incremental import FingerprintStore
+from src.utils.job_queue import InMemoryRedis, JobQueue
+from src.utils.search_index import SearchIndex
+from src.utils.sinks import CsvSink, JsonLinesSink, SqliteSink
+
+N_BILLS = 5
+# Moves every bill on by this many statuses on the detail pages, leaving the listings as they are
+ADVANCE = {'statuses': 0}
+
+
+def listing(language):
+    if language == 'en':
+        rows = [f'<tr><td><a href="/detail/{n}">Bill {n} An Act respecting matter {n}</a></td></tr>'
+                for n in range(1, N_BILLS + 1)]
+    else:
+        rows = [f'<tr><td><a href="/fr/detail/{n}">Projet de loi n° {n} Loi concernant la matière {n}</a></td></tr>'
+                for n in range(1, N_BILLS + 1)]
+    return f'<html><body><table>{"".join(rows)}</table></body></html>'
+
+
+async def handle_listing(request):
+    return web.Response(text=listing(request.match_info['language']), content_type='text/html')
+
+
+async def handle_detail(request):
+    n = int(request.match_info['n']) + ADVANCE['statuses']
+    return web.Response(text=detail_html(n), content_type='text/html')
+
+
+async def start_site():
+    ADVANCE['statuses'] = 0
+    app = web.Application()
+    app.router.add_get('/{language:en|fr}', handle_listing)
+    app.router.add_get('/detail/{n}', handle_detail)
+    app.router.add_get('/fr/detail/{n}', handle_detail)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}"
+
+
+def orchestrator(tmp_path, url, incremental, sink, search_index):
+    pipeline = CanadianProvincialBillsScraper(
+        AsyncFetcher(), incremental=incremental, sink=sink or JsonLinesSink(str(tmp_path / 'bills.jsonl')),
+        provinces=['quebec'], search_index=search_index
+    )
+    if incremental:
+        pipeline.fingerprints = FingerprintStore(str(tmp_path / 'fingerprints.json'))
+    scraper = pipeline.scrapers['quebec']
+    scraper.base_url_en = f"{url}/en"
+    scraper.base_url_fr = f"{url}/fr"
+    return pipeline, scraper
+
+
+def by_number(bills):
+    return sorted(bills, key=lambda bill: int(bill['bill_number']))
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as fh:
+        return by_number(json.loads(line) for line in fh)
+
+
+def assert_bilingual(bills):
+    assert [bill['bill_number'] for bill in bills] == [str(n) for n in range(1, N_BILLS + 1)]
+    for bill in bills:
+        assert bill['language'] == 'en,fr'
+        assert 'An Act respecting' in bill['title_en']
+        assert 'Loi concernant' in bill['title_fr']
+        assert bill['bill_url_fr'].endswith(f"/fr/detail/{bill['bill_number']}")
+        assert bill['status']
+
+
+def run(tmp_path, scrape, incremental=False, sink=None, search_index=None):
+    """Scrape the stub site and return what save_to_database returns"""
+    async def main():
+        runner, url = await start_site()
+        try:
+            pipeline, scraper = orchestrator(tmp_path, url, incremental, sink, search_index)
+            await scrape(pipeline, scraper)
+            return pipeline.save_to_database()
+        finally:
+            await runner.cleanup()
+    return asyncio.run(main())
+
+
+async def current(pipeline, scraper):
+    await pipeline.scrape_all_provinces(['quebec'])
+
+
+def test_current_run_merges_languages(tmp_path):
+    assert_bilingual(read_jsonl(run(tmp_path, current)))
+
+
+def test_watch_poll_merges_languages(tmp_path):
+    async def scrape(pipeline, scraper):
+        pipeline.mode = 'watch'
+        async with pipeline.fetcher:
+            await pipeline.poll_province(scraper)
+    assert_bilingual(read_jsonl(run(tmp_path, scrape, incremental=True)))
+
+
+def test_watch_picks_up_a_status_change_behind_an_unchanged_listing(tmp_path):
+    async def scrape(pipeline, scraper):
+        pipeline.mode = 'watch'
+        async with pipeline.fetcher:
+            await pipeline.poll_province(scraper)
+            ADVANCE['statuses'] = 1
+            assert await pipeline.poll_province(scraper) == N_BILLS
+    bills = read_jsonl(run(tmp_path, scrape, incremental=True))
+    updates = [bill for bill in bills if bill['change_type'] == 'update']
+    assert [bill['bill_number'] for bill in updates] == [str(n) for n in range(1, N_BILLS + 1)]
+    assert all(bill['status'] == STATUSES[(int(bill['bill_number']) + 1) % len(STATUSES)] for bill in updates)
+
+
+def test_distributed_run_merges_languages(tmp_path):
+    async def scrape(pipeline, scraper):
+        await pipeline.scrape_distributed(JobQueue(InMemoryRedis()), ['quebec'], local_workers=2)
+    assert_bilingual(read_jsonl(run(tmp_path, scrape)))
+
+
+def test_current_run_indexes_both_titles(tmp_path):
+    index = SearchIndex(str(tmp_path / 'search_index.db'))
+    run(tmp_path, current, search_index=index)
+
+    english = index.search('respecting')
+    french = index.search('matiere')
+    index.close()
+    assert english['total'] == french['total'] == N_BILLS
+    assert [bill['bill_key'] for bill in english['bills']] == [bill['bill_key'] for bill in french['bills']]
+    for bill in french['bills']:
+        assert 'An Act respecting' in bill['title_en']
+        assert 'Loi concernant' in bill['title_fr']
+
+
+def test_current_run_stores_both_titles(tmp_path):
+    path = run(tmp_path, current, sink=SqliteSink(str(tmp_path / 'bills.db')))
+    with sqlite3.connect(path) as conn:
+        conn.row_factory = sqlite3.Row
+        assert_bilingual(by_number(dict(row) for row in conn.execute('SELECT * FROM bills')))
+
+    path = run(tmp_path, current, sink=CsvSink(str(tmp_path / 'bills.csv')))
+    with open(path, encoding='utf-8', newline='') as fh:
+        assert_bilingual(by_number(csv.DictReader(fh)))
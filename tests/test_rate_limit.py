@@ -0,0 +1,54 @@
+# Per-host rate limiting and retry scheduling
+import asyncio
+import time
+from email.utils import formatdate
+
+from src.utils.rate_limit import HostLimiter, RateLimiter, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('30') == 30.0
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_after_blocks_the_host():
+    host = HostLimiter('example.org')
+    started = asyncio.run(host.acquire())
+    host.release(started, 429, retry_after=5)
+    assert 4 < host.blocked_until - time.monotonic() <= 5
+
+
+def test_a_retry_after_too_long_to_wait_for_does_not_block_the_host():
+    limiter = RateLimiter(max_retry_after=2)
+    host = limiter.host('https://example.org/bills')
+    started = asyncio.run(host.acquire())
+    host.release(started, 429, retry_after=3600)
+
+    assert limiter.retry_delay(host, 1, 429, retry_after=3600) is None
+    assert host.blocked_until - time.monotonic() <= 2
+
+
+def test_throttling_halves_concurrency_and_rate_once_per_cooldown():
+    host = HostLimiter('example.org', rate=8.0, concurrency=4)
+    for _ in range(3):
+        host.release(asyncio.run(host.acquire()), 503)
+    assert (host.limit, host.bucket.rate) == (2.0, 4.0)
+    assert host.throttled == 3
+
+    host.last_decrease = 0.0
+    host.release(asyncio.run(host.acquire()), 200)
+    assert host.limit > 2.0 and host.bucket.rate > 4.0
+
+
+def test_retry_budget_and_statuses():
+    limiter = RateLimiter(max_attempts=3)
+    host = limiter.host('https://example.org/')
+    assert limiter.retry_delay(host, 1, 404) is None
+    assert limiter.retry_delay(host, 3, 503) is None
+    assert limiter.retry_delay(host, 1, 503, retry_after=7) == 7
+
+    host.retries = host.min_retries
+    assert limiter.retry_delay(host, 1, 503) is None
@@ -0,0 +1,77 @@
+# The tabular sinks keep bilingual titles and reading stages
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from src.utils.records import BillRecord
+from src.utils.sinks import BILL_FIELDS, CsvSink, ParquetSink, SqliteSink
+
+READINGS = [{'stage': 'First Reading', 'date': 'March 4, 2025'}, {'stage': 'Second Reading', 'date': ''}]
+
+BILLS = [
+    BillRecord(
+        province='Saskatchewan', session='30-1', bill_number='12', title='The Economy Act', status='Second Reading',
+        readings=READINGS, scraped_date='2026-01-01T00:00:00'
+    ),
+    BillRecord(
+        province='Quebec', session='43-1', bill_number='7', title='An Act respecting matter 7',
+        title_en='An Act respecting matter 7', title_fr='Loi concernant la matière 7', language='en,fr',
+        bill_url='https://example.org/en/7', bill_url_fr='https://example.org/fr/7',
+        scraped_date='2026-01-01T00:00:00'
+    ),
+]
+
+
+def assert_stored(rows):
+    saskatchewan, quebec = sorted(rows, key=lambda row: row['province'], reverse=True)
+    assert json.loads(saskatchewan['readings']) == READINGS
+    assert quebec['title_en'] == 'An Act respecting matter 7'
+    assert quebec['title_fr'] == 'Loi concernant la matière 7'
+    assert quebec['bill_url_fr'] == 'https://example.org/fr/7'
+
+
+def test_csv_sink(tmp_path):
+    sink = CsvSink(str(tmp_path / 'bills.csv'))
+    sink.write(BILLS)
+    with open(sink.close(), encoding='utf-8', newline='') as fh:
+        reader = csv.DictReader(fh)
+        assert reader.fieldnames == BILL_FIELDS
+        assert_stored(list(reader))
+
+
+def test_parquet_sink(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    sink = ParquetSink(str(tmp_path / 'bills'))
+    sink.write(BILLS)
+    sink.close()
+    rows = []
+    for path in sorted(tmp_path.glob('bills/*/*/*.parquet')):
+        rows.extend(pq.read_table(str(path)).to_pylist())
+    assert_stored(rows)
+
+
+def test_sqlite_sink(tmp_path):
+    sink = SqliteSink(str(tmp_path / 'bills.db'))
+    sink.write(BILLS)
+    with sqlite3.connect(sink.close()) as conn:
+        conn.row_factory = sqlite3.Row
+        assert_stored([dict(row) for row in conn.execute('SELECT * FROM bills')])
+
+
+def test_sqlite_sink_adds_columns_to_an_older_store(tmp_path):
+    path = str(tmp_path / 'bills.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            'CREATE TABLE bills (bill_key TEXT PRIMARY KEY, province TEXT, session TEXT, bill_number TEXT, '
+            'title TEXT, sponsor TEXT, member TEXT, status TEXT, committee TEXT, language TEXT, bill_url TEXT, '
+            'source_url TEXT, first_seen TEXT, last_seen TEXT, withdrawn_at TEXT)'
+        )
+    conn.close()
+
+    sink = SqliteSink(path)
+    sink.write(BILLS)
+    with sqlite3.connect(sink.close()) as conn:
+        conn.row_factory = sqlite3.Row
+        assert_stored([dict(row) for row in conn.execute('SELECT * FROM bills')])